@@ -0,0 +1,356 @@
+"""
+지지선/저항선 분석기 벤치마크
+
+네트워크 없이 시드 고정 합성 주가 데이터로 주요 단계의 실행 시간을 측정하고
+JSON으로 저장합니다. 기준(baseline) 결과를 주면 허용 비율보다 느려진 항목이 있을 때
+종료 코드 1로 실패합니다.
+
+사용 예시:
+  python benchmark.py --quick                              # 작은 크기만 빠르게
+  python benchmark.py --output bench.json                  # 전체 (250 ~ 5,000,000봉)
+  python benchmark.py --baseline bench.json --threshold 15 # 15% 넘게 느려지면 실패
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import support_resistance_analyzer as sra
+
+
+DEFAULT_SIZES = (250, 2_500, 25_000, 250_000, 1_000_000, 5_000_000)
+QUICK_SIZES = (250, 2_500, 25_000)
+DEFAULT_ORDERS = (3, 10, 30, 100)
+PLOT_MAX_BARS = 250_000
+# 짧은 항목은 누적 시간이 이 값(초)이 될 때까지 반복 횟수를 늘림 (최대 MAX_REPEAT번)
+MIN_TOTAL_TIME = 0.2
+MAX_REPEAT = 200
+# 패널 엔진 비교용 종목 수 (KRX 전체 종목 규모), 원소 수가 이 값 이하인 크기만 측정
+PANEL_SYMBOLS = 2_800
+PANEL_MAX_CELLS = 10_000_000
+# 로그 가격 AR(1) 계수 (1에 가까울수록 랜덤워크에 가까움)
+MEAN_REVERSION = 1 - 1e-3
+
+
+def synthetic_ohlcv(n_bars, seed=0, start='2000-01-03'):
+    """
+    시드 고정 합성 OHLCV 데이터 생성
+
+    로그 수익률 랜덤워크에 다음을 섞습니다.
+    - 국면 전환: 일정하지 않은 간격마다 추세(drift)와 변동성이 바뀜
+    - 횡보(plateau): 종가가 여러 봉 동안 그대로인 구간 (같은 값 피봇 처리 확인용)
+    - 갭: 드물게 큰 폭으로 뛰거나 빠지는 봉
+    - 로그 가격은 아주 느리게 평균 회귀하여 긴 데이터에서도 가격이 발산하지 않음
+
+    Parameters:
+    -----------
+    n_bars : int
+        봉 개수
+    seed : int
+        난수 시드 (같은 시드면 같은 데이터)
+    start : str
+        시작 시각
+
+    Returns:
+    --------
+    DataFrame : Open/High/Low/Close/Volume
+    """
+    from scipy.signal import lfilter
+
+    rng = np.random.default_rng(seed)
+
+    # 국면 전환: 평균 500봉 길이의 구간마다 추세/변동성 재설정
+    n_regimes = max(1, n_bars // 500 + 1)
+    lengths = rng.geometric(1 / 500, n_regimes)
+    regime = np.repeat(np.arange(n_regimes), lengths)[:n_bars]
+    if len(regime) < n_bars:
+        regime = np.concatenate([regime, np.full(n_bars - len(regime), n_regimes - 1)])
+    drift = rng.normal(0, 0.0008, n_regimes)[regime]
+    vol = rng.uniform(0.005, 0.03, n_regimes)[regime]
+
+    returns = drift + vol * rng.standard_normal(n_bars)
+
+    # 갭: 약 0.2% 봉에서 ±3~10% 점프
+    gaps = rng.random(n_bars) < 0.002
+    returns[gaps] += rng.choice([-1, 1], gaps.sum()) * rng.uniform(0.03, 0.10, gaps.sum())
+
+    # 로그 가격은 아주 느리게 평균 회귀 (수백만 봉에서도 가격대가 현실적인 범위에 머묾)
+    log_price = lfilter([1.0], [1.0, -MEAN_REVERSION], returns)
+    close = 100.0 * np.exp(log_price)
+
+    # 횡보: 약 1% 봉에서 시작해 2~20봉 동안 종가 유지
+    plateau_starts = np.flatnonzero(rng.random(n_bars) < 0.01)
+    plateau_lengths = rng.integers(2, 21, len(plateau_starts))
+    flat = np.zeros(n_bars + 1, dtype=np.int64)
+    np.add.at(flat, np.minimum(plateau_starts + 1, n_bars), 1)
+    np.add.at(flat, np.minimum(plateau_starts + plateau_lengths, n_bars), -1)
+    close = pd.Series(close).mask(np.cumsum(flat[:n_bars]) > 0).ffill().values
+
+    close = np.round(close, 2)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.5, n_bars)) * vol * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(12, 1, n_bars).round()
+
+    # 영업일 인덱스는 약 5만 봉을 넘으면 pandas 날짜 범위를 벗어나므로 분 단위 사용
+    freq = 'B' if n_bars <= 50_000 else 'min'
+    index = pd.date_range(start, periods=n_bars, freq=freq)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=index)
+
+
+def time_call(func, repeat, min_total=MIN_TOTAL_TIME, max_repeat=MAX_REPEAT):
+    """
+    func를 최소 repeat번 실행하여 (최소, 중앙값) 시간(초)과 실제 반복 횟수 반환
+
+    몇 ms 이하의 짧은 항목은 한두 번의 측정이 스케줄링/캐시 상태에 크게 흔들리므로,
+    누적 시간이 min_total초가 될 때까지(최대 max_repeat번) 더 반복합니다.
+    """
+    timings = []
+    total = 0.0
+    while len(timings) < repeat or (total < min_total and len(timings) < max_repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+        total += timings[-1]
+    return min(timings), float(np.median(timings)), len(timings)
+
+
+def default_repeat(n_bars):
+    """데이터 크기별 반복 횟수 (큰 데이터는 적게)"""
+    if n_bars <= 25_000:
+        return 5
+    if n_bars <= 1_000_000:
+        return 3
+    return 1
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, orders=DEFAULT_ORDERS, seed=0, repeat=None,
+                   plot_max_bars=PLOT_MAX_BARS):
+    """
+    크기 × order 조합별로 find_pivots / cluster_levels / analyze / plot / render_chart 시간 측정
+    (analyze[volume]은 크기별 한 번, 작은 크기는 PANEL_SYMBOLS개 종목 symbol_loop / panel_levels 비교)
+
+    Parameters:
+    -----------
+    sizes : list of int
+        데이터 크기 (봉 개수)
+    orders : list of int
+        피봇 order
+    seed : int
+        합성 데이터 시드
+    repeat : int, optional
+        반복 횟수 (기본값: 크기별 default_repeat())
+    plot_max_bars : int
+        이 크기 이하에서만 plot, render_chart 측정
+
+    Returns:
+    --------
+    list : {'name', 'bars', 'order', 'best', 'median', 'repeat'} 결과 목록
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    results = []
+
+    def record(name, n_bars, order, func, reps):
+        best, median, reps = time_call(func, reps)
+        results.append({'name': name, 'bars': n_bars, 'order': order,
+                        'best': best, 'median': median, 'repeat': reps})
+        print(f"  {name:<28} bars={n_bars:>9,} order={order:>3} | "
+              f"best {best * 1000:10.2f}ms | median {median * 1000:10.2f}ms")
+
+    for n_bars in sizes:
+        df = synthetic_ohlcv(n_bars, seed=seed)
+        reps = repeat or default_repeat(n_bars)
+        analyzer = sra.SupportResistanceAnalyzer('BENCH', str(df.index[0].date()), cache=False,
+                                                 ticker_name='Benchmark', currency='USD')
+        analyzer.use_frame(df)
+
+        for order in orders:
+            if 2 * order + 1 > n_bars:
+                continue
+
+            for engine in sra.PIVOT_ENGINES:
+                record(f'find_pivots[{engine}]', n_bars, order,
+                       lambda: analyzer.find_pivots(order=order, engine=engine), reps)
+
+            local_min, local_max, _, _ = analyzer.find_pivots(order=order, engine='window')
+            levels = np.concatenate([local_min, local_max])
+            record('cluster_levels', n_bars, order, lambda: sra.cluster_levels(levels, 0.015), reps)
+
+            def analyze():
+                with redirect_stdout(io.StringIO()):
+                    analyzer.analyze(order=order, tolerance=0.015, max_levels=5)
+            record('analyze', n_bars, order, analyze, reps)
+
+            if n_bars <= plot_max_bars:
+                def plot():
+                    with redirect_stdout(io.StringIO()):
+                        analyzer.plot()
+                    plt.close('all')
+                # plot()이 현재 디렉터리에 PNG를 저장하므로 임시 디렉터리에서 실행
+                cwd = os.getcwd()
+                with tempfile.TemporaryDirectory() as tmp:
+                    os.chdir(tmp)
+                    try:
+                        record('plot', n_bars, order, plot, reps)
+                    finally:
+                        os.chdir(cwd)
+
+                # 배치 렌더링: 그림 템플릿 재사용, 메모리 버퍼에 저장
+                renderer = sra.get_chart_renderer()
+                for fmt in sra.CHART_FORMATS:
+                    record(f'render_chart[{fmt}]', n_bars, order,
+                           lambda: renderer.render(sra.chart_series(analyzer), io.BytesIO(), fmt), reps)
+
+        # 볼륨 프로파일은 order와 무관 (order=0으로 기록)
+        def analyze_volume():
+            with redirect_stdout(io.StringIO()):
+                analyzer.analyze(tolerance=0.015, max_levels=5, method='volume')
+        record('analyze[volume]', n_bars, 0, analyze_volume, reps)
+
+        # 여러 종목: 패널 엔진 한 번 vs 종목별 반복 (상장일이 다른 종목은 앞부분 NaN)
+        if n_bars * PANEL_SYMBOLS <= PANEL_MAX_CELLS:
+            rng = np.random.default_rng(seed)
+            close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (PANEL_SYMBOLS, n_bars)), axis=1)), 2)
+            for row, listed in zip(close, rng.integers(0, n_bars // 5, PANEL_SYMBOLS)):
+                row[:listed] = np.nan
+            rows = [row[~np.isnan(row)] for row in close]
+
+            for order in orders:
+                if 2 * order + 1 > n_bars:
+                    continue
+
+                def symbol_loop():
+                    for row in rows:
+                        min_idx, max_idx = sra.find_pivot_indices(row, order)
+                        sra.cluster_levels(row[min_idx], 0.015)
+                        sra.cluster_levels(row[max_idx], 0.015)
+                record(f'symbol_loop[{PANEL_SYMBOLS}]', n_bars, order, symbol_loop, reps)
+                record(f'panel_levels[{PANEL_SYMBOLS}]', n_bars, order,
+                       lambda: sra.panel_levels(close, order=order, tolerance=0.015), reps)
+
+    return results
+
+
+def environment_info(seed):
+    """결과 JSON에 함께 기록할 실행 환경 정보"""
+    import scipy
+    import matplotlib
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'matplotlib': matplotlib.__version__,
+        'seed': seed,
+    }
+
+
+def compare_to_baseline(results, baseline, threshold_pct, noise_floor=0.01, min_delta=0.002):
+    """
+    기준 결과 대비 느려진 항목 찾기
+
+    최소 시간(best)을 비교하며, 기준 시간이 noise_floor(초)보다 짧은 항목은
+    측정 오차가 커서 제외합니다. 비율이 threshold_pct를 넘어도 늘어난 시간이
+    min_delta(초) 이하이면 측정 오차로 봅니다.
+
+    Parameters:
+    -----------
+    results : list
+        이번 측정 결과
+    baseline : list
+        기준 측정 결과
+    threshold_pct : float
+        허용 비율 (%) - 이보다 더 느려지면 회귀로 판단
+    noise_floor : float
+        비교 대상 최소 기준 시간 (초)
+    min_delta : float
+        회귀로 판단할 최소 증가 시간 (초)
+
+    Returns:
+    --------
+    list : (항목 이름, bars, order, 기준 시간, 현재 시간, 변화율 %) 회귀 목록
+    """
+    base = {(r['name'], r['bars'], r['order']): r['best'] for r in baseline}
+    regressions = []
+    for r in results:
+        key = (r['name'], r['bars'], r['order'])
+        if key not in base or base[key] < noise_floor:
+            continue
+        change = (r['best'] / base[key] - 1) * 100
+        if change > threshold_pct and r['best'] - base[key] > min_delta:
+            regressions.append((*key, base[key], r['best'], change))
+    return regressions
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='지지선/저항선 분석기 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                        help=f'데이터 크기 목록 (기본값: {", ".join(map(str, DEFAULT_SIZES))})')
+    parser.add_argument('--orders', type=int, nargs='+', default=list(DEFAULT_ORDERS),
+                        help='피봇 order 목록')
+    parser.add_argument('--quick', action='store_true',
+                        help=f'작은 크기만 측정 ({", ".join(map(str, QUICK_SIZES))})')
+    parser.add_argument('--seed', type=int, default=0, help='합성 데이터 시드')
+    parser.add_argument('--repeat', type=int, default=None, help='반복 횟수 (기본값: 크기별 자동)')
+    parser.add_argument('--plot-max-bars', type=int, default=PLOT_MAX_BARS,
+                        help='plot을 측정할 최대 데이터 크기')
+    parser.add_argument('--output', type=str, default='benchmark_results.json',
+                        help='결과 JSON 파일')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='허용 회귀 비율 (%%) (기본값: 10)')
+    parser.add_argument('--noise-floor-ms', type=float, default=10.0,
+                        help='기준 시간이 이보다 짧은 항목은 비교하지 않음 (ms) (기본값: 10)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                        help='늘어난 시간이 이 값 이하이면 비율과 관계없이 회귀로 보지 않음 (ms) (기본값: 2)')
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+
+    print("="*60)
+    print(f"벤치마크: 크기 {list(sizes)}, order {args.orders}")
+    print("="*60)
+    results = run_benchmarks(sizes, args.orders, seed=args.seed, repeat=args.repeat,
+                             plot_max_bars=args.plot_max_bars)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment_info(args.seed), 'results': results}, f, indent=2)
+    print(f"\n결과 저장 완료: {args.output} ({len(results)}개 항목)")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare_to_baseline(results, baseline, args.threshold,
+                                          noise_floor=args.noise_floor_ms / 1000,
+                                          min_delta=args.min_delta_ms / 1000)
+        if regressions:
+            print(f"\n✗ 기준 대비 {args.threshold:g}% 넘게 느려진 항목 {len(regressions)}개:")
+            for name, n_bars, order, before, after, change in regressions:
+                print(f"  {name:<28} bars={n_bars:>9,} order={order:>3} | "
+                      f"{before * 1000:.2f}ms → {after * 1000:.2f}ms (+{change:.1f}%)")
+            sys.exit(1)
+        print(f"\n✓ 기준 대비 {args.threshold:g}% 넘게 느려진 항목 없음")
+
+
+if __name__ == "__main__":
+    main()
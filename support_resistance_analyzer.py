@@ -6,27 +6,322 @@ Support and Resistance Level Analyzer
 """
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import yfinance as yf
-from scipy.signal import argrelextrema
 from datetime import datetime, timedelta
 import warnings
 import argparse
-import requests
 import re
-import FinanceDataReader as fdr
+import os
+import json
 warnings.filterwarnings('ignore')
 
+# matplotlib, yfinance, scipy, FinanceDataReader는 사용하는 함수 안에서 import
+# (분석 함수만 쓰는 워커/헤드리스 실행의 시작 시간을 줄이기 위함)
+
 # 한국 주식 종목 리스트 캐시 (초기에 한번만 로드)
 _KRX_STOCK_LIST = None
+_KRX_DIRECTORY = None
+
+# 종목 리스트 로컬 파일 유효 기간 (초)
+KRX_LISTING_TTL = 24 * 60 * 60
+
+# 로컬 캐시 디렉토리 (환경변수 SR_ANALYZER_CACHE_DIR로 변경 가능)
+CACHE_DIR = os.environ.get('SR_ANALYZER_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'support_resistance_analyzer'))
+
+# 데이터 소스 (get_data_provider(), 환경변수 SR_ANALYZER_REPLAY_DIR이 있으면 로컬 파일 재생)
+_DATA_PROVIDER = None
+
+# 그래프 설정 완료 여부 (첫 그래프를 그릴 때 한 번만 설정)
+_PLOT_READY = False
+
+
+# 단계별 계측
+# 계측 대상 단계 중 --profile 시 cProfile/tracemalloc으로 분석할 단계
+PROFILED_STAGES = ('get_ticker_info', 'fetch_data', 'find_pivots', 'cluster_levels', 'plot')
+METRIC_PERCENTILES = (50, 90, 99)
+
+
+class StageMetrics:
+    """
+    단계별 소요 시간과 카운터(수집 바이트, 행, 피봇, 클러스터 수 등) 수집기
+
+    모듈 전역 인스턴스 METRICS를 사용합니다. 훅(add_metrics_hook)을 등록하면
+    단계가 끝나거나 카운터가 늘 때마다 hook(kind, name, value)가 호출됩니다.
+    - kind='stage': value는 소요 시간 (초)
+    - kind='count': value는 증가량
+    """
+
+    def __init__(self):
+        import threading
+
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+        self.hooks = []
+        self._profiler = None
+
+    @property
+    def profiling(self):
+        """start_profiling() 이후 프로파일링 중인지 여부"""
+        return self._profiler is not None
+
+    def reset(self):
+        """수집한 값 초기화 (훅과 프로파일러 설정은 유지)"""
+        with self._lock:
+            self.timings = {}
+            self.counters = {}
+
+    def stage(self, name):
+        """
+        단계 시간 측정 컨텍스트
+
+        사용 예:
+            with METRICS.stage('fetch_data'):
+                ...
+        """
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds):
+        """단계 소요 시간 기록"""
+        with self._lock:
+            self.timings.setdefault(name, []).append(seconds)
+        self._emit('stage', name, seconds)
+
+    def count(self, name, value=1):
+        """카운터 증가"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        self._emit('count', name, value)
+
+    def _emit(self, kind, name, value):
+        for hook in list(self.hooks):
+            try:
+                hook(kind, name, value)
+            except Exception as e:
+                warnings.warn(f"계측 훅 오류: {type(e).__name__}: {e}")
+
+    def snapshot(self):
+        """현재까지 수집한 값 (다른 프로세스로 보내 merge() 가능한 dict)"""
+        with self._lock:
+            return {'timings': {name: list(values) for name, values in self.timings.items()},
+                    'counters': dict(self.counters)}
+
+    def since(self, previous):
+        """snapshot() 이후 새로 수집된 값만 snapshot 형식으로 반환"""
+        current = self.snapshot()
+        timings = {}
+        for name, values in current['timings'].items():
+            new = values[len(previous['timings'].get(name, [])):]
+            if new:
+                timings[name] = new
+        counters = {name: value - previous['counters'].get(name, 0)
+                    for name, value in current['counters'].items()
+                    if value != previous['counters'].get(name, 0)}
+        return {'timings': timings, 'counters': counters}
+
+    def merge(self, snapshot):
+        """다른 수집기(워커 프로세스 등)의 snapshot 합치기 (훅은 호출하지 않음)"""
+        with self._lock:
+            for name, values in snapshot.get('timings', {}).items():
+                self.timings.setdefault(name, []).extend(values)
+            for name, value in snapshot.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self, percentiles=METRIC_PERCENTILES):
+        """
+        단계별 호출 수/합계/평균/백분위수/최대 시간과 카운터 요약
+
+        Returns:
+        --------
+        dict : {'stages': {단계: {'calls', 'total_sec', 'mean_sec', 'p50_sec', ..., 'max_sec'}},
+                'counters': {이름: 값}}
+        """
+        snapshot = self.snapshot()
+        stages = {}
+        for name, values in snapshot['timings'].items():
+            values = np.asarray(values, dtype=np.float64)
+            stats = {'calls': int(len(values)), 'total_sec': float(values.sum()),
+                     'mean_sec': float(values.mean())}
+            for q, value in zip(percentiles, np.percentile(values, percentiles)):
+                stats[f'p{q:g}_sec'] = float(value)
+            stats['max_sec'] = float(values.max())
+            stages[name] = stats
+        counters = {name: (int(value) if float(value).is_integer() else float(value))
+                    for name, value in snapshot['counters'].items()}
+        return {'stages': stages, 'counters': counters}
+
+    def format_summary(self, percentiles=METRIC_PERCENTILES):
+        """summary()를 표 형태 문자열로 변환"""
+        summary = self.summary(percentiles)
+        labels = [f'p{q:g}' for q in percentiles]
+        lines = [f"{'단계':<20}{'호출':>7}{'합계(s)':>11}{'평균(ms)':>11}"
+                 + ''.join(f"{label + '(ms)':>11}" for label in labels) + f"{'최대(ms)':>11}"]
+        for name, stats in summary['stages'].items():
+            lines.append(f"{name:<20}{stats['calls']:>7}{stats['total_sec']:>11.3f}"
+                         f"{stats['mean_sec'] * 1000:>11.2f}"
+                         + ''.join(f"{stats[label + '_sec'] * 1000:>11.2f}" for label in labels)
+                         + f"{stats['max_sec'] * 1000:>11.2f}")
+        for name, value in summary['counters'].items():
+            lines.append(f"{name:<20}{value:>18,}")
+        return '\n'.join(lines)
+
+    def start_profiling(self, output_dir, stages=PROFILED_STAGES):
+        """
+        지정한 단계를 cProfile/tracemalloc으로 분석 시작
+
+        같은 단계의 여러 호출은 하나의 프로파일로 누적되며, 중첩된 단계는
+        바깥 단계 프로파일에 포함됩니다. stop_profiling()에서 파일로 저장합니다.
+
+        Parameters:
+        -----------
+        output_dir : str
+            결과 저장 디렉토리 (<단계>.prof, <단계>.txt, memory.txt)
+        stages : tuple
+            분석할 단계 이름
+        """
+        import tracemalloc
+
+        os.makedirs(output_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._profiler = {'dir': output_dir, 'stages': set(stages), 'profiles': {},
+                          'peaks': {}, 'active': None}
+
+    def stop_profiling(self):
+        """프로파일 결과 저장 후 분석 종료, 저장한 파일 목록 반환"""
+        import tracemalloc
+
+        written = self.write_profiles(allocations=True)
+        if self._profiler is not None:
+            self._profiler = None
+            tracemalloc.stop()
+        return written
+
+    def write_profiles(self, allocations=False):
+        """
+        현재까지 누적된 프로파일 결과를 파일로 저장 (분석은 계속), 저장한 파일 목록 반환
+
+        allocations=True이면 현재 할당 상위 위치(tracemalloc 스냅샷, 비용이 큼)도 기록
+        """
+        import io
+        import pstats
+        import tracemalloc
+
+        profiler = self._profiler
+        if profiler is None:
+            return []
+
+        written = []
+        for name, profile in profiler['profiles'].items():
+            prof_path = os.path.join(profiler['dir'], f'{name}.prof')
+            profile.dump_stats(prof_path)
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(30)
+            text_path = os.path.join(profiler['dir'], f'{name}.txt')
+            with open(text_path, 'w', encoding='utf-8') as f:
+                f.write(stream.getvalue())
+            written += [prof_path, text_path]
+
+        memory_path = os.path.join(profiler['dir'], 'memory.txt')
+        with open(memory_path, 'w', encoding='utf-8') as f:
+            f.write("단계별 최대 메모리 사용량 (tracemalloc, 단계 시작 시점 대비)\n")
+            for name, peak in profiler['peaks'].items():
+                f.write(f"  {name:<20}{peak / 1024 / 1024:>10.2f} MB\n")
+            if allocations:
+                f.write("\n현재 할당 상위 30개 위치\n")
+                for stat in tracemalloc.take_snapshot().statistics('lineno')[:30]:
+                    f.write(f"  {stat}\n")
+        written.append(memory_path)
+        return written
+
+
+class _StageTimer:
+    """StageMetrics.stage() 컨텍스트 (프로파일링 중이면 해당 단계 cProfile/메모리 측정)"""
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.profile = None
+
+    def __enter__(self):
+        import time
+
+        profiler = self.metrics._profiler
+        if (profiler is not None and profiler['active'] is None
+                and self.name in profiler['stages']):
+            import cProfile
+            import tracemalloc
+
+            profile = profiler['profiles'].setdefault(self.name, cProfile.Profile())
+            try:
+                profile.enable()
+            except ValueError:
+                # 다른 프로파일러가 이미 동작 중이면 시간만 측정
+                pass
+            else:
+                profiler['active'] = self.name
+                self.profile = profile
+                self.base_memory = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        import time
+
+        elapsed = time.perf_counter() - self.started
+        if self.profile is not None:
+            import tracemalloc
+
+            self.profile.disable()
+            profiler = self.metrics._profiler
+            peak = tracemalloc.get_traced_memory()[1] - self.base_memory
+            profiler['peaks'][self.name] = max(profiler['peaks'].get(self.name, 0), peak)
+            profiler['active'] = None
+        self.metrics.record(self.name, elapsed)
+        return False
+
+
+METRICS = StageMetrics()
+
+
+def timed_stage(name):
+    """함수 전체를 METRICS.stage(name)으로 측정하는 데코레이터"""
+    import functools
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_metrics_hook(hook):
+    """
+    계측 훅 등록
+
+    Parameters:
+    -----------
+    hook : callable
+        hook(kind, name, value) - kind는 'stage'(value=초) 또는 'count'(value=증가량)
+    """
+    METRICS.hooks.append(hook)
+    return hook
+
+
+def remove_metrics_hook(hook):
+    """계측 훅 해제"""
+    if hook in METRICS.hooks:
+        METRICS.hooks.remove(hook)
+
 
 # 한글 폰트 설정
 def setup_korean_font():
     """시스템에서 사용 가능한 한글 폰트 찾아서 설정"""
-    import os
-    from pathlib import Path
+    import matplotlib
+    import matplotlib.font_manager as fm
 
     # 일반적인 한글 폰트 경로들
     font_paths = [
@@ -46,8 +341,8 @@ def setup_korean_font():
                 font_prop = fm.FontProperties(fname=font_path)
                 font_name = font_prop.get_name()
 
-                plt.rcParams['font.family'] = font_name
-                plt.rcParams['axes.unicode_minus'] = False
+                matplotlib.rcParams['font.family'] = font_name
+                matplotlib.rcParams['axes.unicode_minus'] = False
 
                 # 폰트 매니저에 추가
                 fm.fontManager.addfont(font_path)
@@ -57,12 +352,18 @@ def setup_korean_font():
 
     # 폰트를 찾지 못한 경우 기본 설정
     print("⚠ 한글 폰트를 찾을 수 없습니다. 그래프에서 한글이 깨질 수 있습니다.")
-    plt.rcParams['font.family'] = 'DejaVu Sans'
-    plt.rcParams['axes.unicode_minus'] = False
+    matplotlib.rcParams['font.family'] = 'DejaVu Sans'
+    matplotlib.rcParams['axes.unicode_minus'] = False
     return False
 
-# 한글 폰트 설정 실행
-setup_korean_font()
+
+def _ensure_plot_setup():
+    """첫 그래프를 그리기 전에 한글 폰트 설정 (프로세스당 한 번)"""
+    global _PLOT_READY
+
+    if not _PLOT_READY:
+        setup_korean_font()
+        _PLOT_READY = True
 
 # 주요 종목 로컬 매핑 (폴백용)
 # API 검색 실패 시 또는 빠른 접근을 위해 사용
@@ -151,577 +452,5741 @@ COMMON_TICKERS = {
 }
 
 
-def search_ticker_yahoo(query):
-    """
-    Yahoo Finance를 통해 종목 검색 (yfinance.Search 사용)
+# 원격 요청 스케줄러
+# 초당 요청 수와 한 번에 몰아서 보낼 수 있는 요청 수 (--fetch-rate, 0이면 제한 없음)
+FETCH_RATE = 10.0
+FETCH_BURST = 20
+# 요청 제한/일시적 오류 재시도 횟수와 지수 백오프 (초)
+FETCH_RETRIES = 4
+FETCH_BACKOFF = 1.0
+FETCH_BACKOFF_MAX = 30.0
+# 요청 제한을 받으면 속도를 절반으로 낮추되 이 비율 아래로는 낮추지 않음
+FETCH_MIN_RATE_RATIO = 0.1
+# 여러 종목을 한 번에 받을 때 묶는 종목 수 (--fetch-batch)
+FETCH_BATCH = 20
+_FETCH_SCHEDULER = None
 
-    Parameters:
-    -----------
-    query : str
-        검색어 (종목명, 티커 등) - 영문 검색어 권장
+
+class RateLimitError(RuntimeError):
+    """재시도 후에도 데이터 소스의 요청 제한이 풀리지 않음"""
+
+
+def classify_fetch_error(error):
+    """
+    원격 요청 예외 분류
 
     Returns:
     --------
-    list : 검색 결과 리스트
+    str or None : 'throttled'(요청 제한), 'transient'(서버/네트워크 오류, 재시도),
+                  None(재시도해도 같은 결과)
     """
-    try:
-        # yfinance Search 기능 사용
-        search = yf.Search(query, max_results=5)
-        quotes = search.quotes
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if isinstance(error, RateLimitError) or 'YFRateLimitError' in names:
+        return 'throttled'
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return 'throttled'
+    if status is not None:
+        return 'transient' if status >= 500 else None
+    if names & {'ConnectionError', 'Timeout', 'TimeoutError', 'ChunkedEncodingError'}:
+        return 'transient'
+    return None
 
-        results = []
-        for quote in quotes:
-            symbol = quote.get('symbol', '')
-            name = quote.get('shortname') or quote.get('longname', '')
-            exchange = quote.get('exchange', '')
-            quote_type = quote.get('quoteType', '')
 
-            # 주식만 필터링
-            if quote_type in ['EQUITY', 'ETF']:
-                results.append({
-                    'symbol': symbol,
-                    'name': name,
-                    'exchange': exchange,
-                    'type': quote_type
-                })
+class TokenBucket:
+    """
+    토큰 버킷 요청 속도 제한 (스레드 안전)
 
-        return results
-    except Exception as e:
-        print(f"Yahoo Finance 검색 오류: {e}")
-        return []
+    초당 rate개씩 토큰이 쌓이고(최대 burst개), 요청마다 토큰을 씁니다.
+    요청 제한 응답을 받으면 throttle()로 모든 요청을 잠시 멈추고 속도를 절반으로 낮추며,
+    요청이 성공할 때마다 원래 속도까지 조금씩 되돌립니다.
+    """
 
+    def __init__(self, rate=FETCH_RATE, burst=FETCH_BURST, clock=None, sleep=None):
+        """
+        Parameters:
+        -----------
+        rate : float or None
+            초당 요청 수 (None 또는 0이면 제한 없음, throttle()만 적용)
+        burst : int
+            쉬고 난 뒤 한 번에 보낼 수 있는 최대 요청 수
+        clock, sleep : callable, optional
+            시각/대기 함수 (기본값: time.monotonic, time.sleep, 테스트용)
+        """
+        import threading
+        import time
 
-def get_krx_stock_list():
-    """
-    한국 주식 종목 리스트 가져오기 (캐시 사용)
+        self.max_rate = float(rate) if rate else None
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = self._clock()
+        self._paused_until = self._updated
 
-    Returns:
-    --------
-    DataFrame : 한국 주식 종목 리스트
-    """
-    global _KRX_STOCK_LIST
+    def acquire(self, tokens=1):
+        """
+        토큰을 받을 때까지 대기
 
-    if _KRX_STOCK_LIST is None:
-        try:
-            print("한국 주식 종목 리스트 로딩 중...")
-            _KRX_STOCK_LIST = fdr.StockListing('KRX')
-            print(f"✓ {len(_KRX_STOCK_LIST)}개 종목 로드 완료")
-        except Exception as e:
-            print(f"종목 리스트 로딩 실패: {e}")
-            _KRX_STOCK_LIST = pd.DataFrame()
+        burst보다 많은 토큰(여러 종목 묶음 요청)은 burst개가 쌓이면 보내고 모자란 만큼 빚으로 남깁니다.
 
-    return _KRX_STOCK_LIST
+        Returns:
+        --------
+        float : 기다린 시간 (초)
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now > self._updated:
+                    if self.rate:
+                        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if not self.rate:
+                        return waited
+                    needed = min(tokens, self.burst)
+                    if self._tokens >= needed:
+                        self._tokens -= tokens
+                        return waited
+                    wait = (needed - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
 
+    def throttle(self, delay):
+        """요청 제한을 받음: delay초 동안 모든 요청을 멈추고 속도를 절반으로 (멈춘 동안 토큰은 쌓이지 않음)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+            self._updated = max(self._updated, self._paused_until)
+            if self.rate:
+                self.rate = max(self.max_rate * FETCH_MIN_RATE_RATIO, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
 
-def search_korean_stock(query):
-    """
-    한국 주식 검색 (FinanceDataReader 활용)
+    def success(self):
+        """요청 성공: 낮춘 속도를 원래 속도의 5%씩 회복"""
+        if self.rate and self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
 
-    Parameters:
-    -----------
-    query : str
-        검색어 (한글 종목명 또는 종목코드)
 
-    Returns:
-    --------
-    list : 검색 결과 리스트
+class RequestCoalescer:
     """
-    try:
-        krx = get_krx_stock_list()
+    같은 키의 동시 요청을 하나로 합치기
 
-        if krx.empty:
-            return []
+    먼저 들어온 요청만 실제로 계산하고, 계산 중에 들어온 같은 키의 요청은
+    그 결과(또는 예외)를 함께 받습니다.
+    """
 
-        results = []
+    def __init__(self):
+        import threading
 
-        # 종목명으로 검색 (부분 일치)
-        matched = krx[krx['Name'].str.contains(query, na=False, case=False)]
-
-        # 종목코드로도 검색
-        if query.isdigit():
-            code_matched = krx[krx['Code'] == query]
-            matched = pd.concat([matched, code_matched]).drop_duplicates()
-
-        # 결과를 리스트로 변환
-        for _, row in matched.head(5).iterrows():
-            code = row['Code']
-            name = row['Name']
-            market = row['Market']
-
-            # Yahoo Finance 형식으로 변환
-            if market == 'KOSPI':
-                symbol = f"{code}.KS"
-            elif market == 'KOSDAQ':
-                symbol = f"{code}.KQ"
-            else:
-                symbol = f"{code}.KS"  # 기본값
+        self._lock = threading.Lock()
+        self._in_flight = {}
 
-            results.append({
-                'symbol': symbol,
-                'name': name,
-                'code': code,
-                'market': market
-            })
+    def run(self, key, func):
+        from concurrent.futures import Future
 
-        return results
-    except Exception as e:
-        print(f"한국 주식 검색 오류: {e}")
-        return []
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
 
+        if not leader:
+            METRICS.count('coalesced_requests')
+            return future.result()
 
-def verify_ticker(symbol):
-    """
-    종목 코드가 유효한지 확인
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
 
-    Parameters:
-    -----------
-    symbol : str
-        종목 코드
 
-    Returns:
-    --------
-    bool : 유효 여부
+class FetchScheduler:
     """
-    try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.history(period='5d')
-        return not info.empty
-    except:
-        return False
+    모든 원격 요청(주가/종목 정보/검색/종목 리스트/차트 API) 앞에 두는 스케줄러
 
-
-def get_ticker_info(ticker_input):
+    - 같은 키의 동시 요청은 하나만 보내고 결과를 나눔 (RequestCoalescer)
+    - 요청마다 TokenBucket 토큰을 받아 초당 요청 수 제한
+    - 요청 제한(HTTP 429, YFRateLimitError)은 모든 요청을 멈추고 속도를 낮춘 뒤 재시도,
+      서버/네트워크 오류는 해당 요청만 지수 백오프(지터 포함) 후 재시도
+    - 계측: remote_calls, fetch_retries, throttled 카운터와 throttle_wait 대기 시간
     """
-    종목명 또는 코드를 입력받아 종목 정보 반환
 
-    Parameters:
-    -----------
-    ticker_input : str
-        종목명(한글/영문) 또는 종목 코드
+    def __init__(self, rate=FETCH_RATE, burst=FETCH_BURST, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF,
+                 max_backoff=FETCH_BACKOFF_MAX, clock=None, sleep=None):
+        """
+        Parameters:
+        -----------
+        rate, burst :
+            TokenBucket 파라미터 (rate가 None 또는 0이면 속도 제한 없음)
+        retries : int
+            재시도 횟수
+        backoff, max_backoff : float
+            첫 재시도 대기 시간과 최대 대기 시간 (초), 재시도마다 두 배
+        """
+        import random
+        import time
 
-    Returns:
-    --------
-    tuple : (종목코드, 종목명, 통화)
-    """
-    # 1. 로컬 매핑에서 정확히 일치하는 것 찾기
-    if ticker_input in COMMON_TICKERS:
-        symbol = COMMON_TICKERS[ticker_input]
-        print(f"\n✓ '{ticker_input}' 발견: {symbol}")
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep or time.sleep
+        self._random = random.Random()
+        self._coalescer = RequestCoalescer()
 
-        # 지수인지 확인
-        if symbol.startswith('^'):
-            # 지수 정보 가져오기
-            try:
-                ticker_obj = yf.Ticker(symbol)
-                info = ticker_obj.info
-                name = info.get('longName', info.get('shortName', ticker_input))
-                # 한국 지수는 KRW (포인트), 미국 지수는 USD (포인트)
-                if symbol in ['^KS11', '^KQ11']:
-                    return symbol, name, 'KRW'
-                elif symbol in ['^GSPC', '^IXIC', '^DJI']:
-                    return symbol, name, 'USD'
-                else:
-                    currency = info.get('currency', 'USD')
-                    return symbol, name, currency
-            except:
-                if symbol in ['^KS11', '^KQ11']:
-                    return symbol, ticker_input, 'KRW'
-                elif symbol in ['^GSPC', '^IXIC', '^DJI']:
-                    return symbol, ticker_input, 'USD'
-                else:
-                    return symbol, ticker_input, 'USD'
+    @property
+    def rate(self):
+        """설정한 초당 요청 수 (None이면 제한 없음)"""
+        return self.bucket.max_rate
 
-        # 한국 주식인지 확인
-        elif symbol.endswith('.KS') or symbol.endswith('.KQ'):
-            return symbol, ticker_input, 'KRW'
-        else:
-            # 티커 정보 가져오기
-            try:
-                ticker_obj = yf.Ticker(symbol)
-                info = ticker_obj.info
-                name = info.get('longName', info.get('shortName', ticker_input))
-                currency = info.get('currency', 'USD')
-                return symbol, name, currency
-            except:
-                return symbol, ticker_input, 'USD'
+    def delay(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (지수 백오프의 절반 + 나머지 절반 안에서 무작위)"""
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return delay / 2 + self._random.uniform(0, delay / 2)
 
-    # 1-2. 부분 매칭 시도 (예: '우리금융' -> '우리금융지주')
-    matches = []
-    for key in COMMON_TICKERS:
-        if ticker_input in key or key in ticker_input:
-            matches.append((key, COMMON_TICKERS[key]))
+    def call(self, key, func, cost=1):
+        """
+        func()를 속도 제한/재시도를 적용하여 실행
 
-    if matches:
-        # 가장 짧은 이름을 선택 (정확도가 높음)
-        matches.sort(key=lambda x: len(x[0]))
-        matched_name, symbol = matches[0]
-        print(f"\n✓ '{ticker_input}' -> '{matched_name}' 발견: {symbol}")
-        # 한국 주식인지 확인
-        if symbol.endswith('.KS') or symbol.endswith('.KQ'):
-            return symbol, matched_name, 'KRW'
-        else:
-            try:
-                ticker_obj = yf.Ticker(symbol)
-                info = ticker_obj.info
-                name = info.get('longName', info.get('shortName', matched_name))
-                currency = info.get('currency', 'USD')
-                return symbol, name, currency
-            except:
-                return symbol, matched_name, 'USD'
+        Parameters:
+        -----------
+        key : hashable or None
+            같은 키의 동시 요청은 하나로 합침 (None이면 합치지 않음)
+        func : callable
+            원격 요청 함수
+        cost : int
+            요청이 쓰는 토큰 수 (여러 종목 묶음 요청은 종목 수)
+        """
+        if key is None:
+            return self._attempt(func, cost)
+        return self._coalescer.run(key, lambda: self._attempt(func, cost))
 
-    # 2. 이미 올바른 형식의 종목 코드인지 확인
-    # (예: 005930.KS, AAPL 등)
-    if re.match(r'^[A-Z0-9]+(\.(KS|KQ))?$', ticker_input):
-        print(f"\n종목 코드 확인 중: {ticker_input}")
-        if verify_ticker(ticker_input):
-            print(f"✓ 유효한 종목 코드입니다.")
-            # 종목 정보 가져오기
+    def _attempt(self, func, cost):
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire(cost)
+            if waited:
+                METRICS.record('throttle_wait', waited)
+            METRICS.count('remote_calls')
             try:
-                ticker_obj = yf.Ticker(ticker_input)
-                info = ticker_obj.info
-                name = info.get('longName', info.get('shortName', ticker_input))
-                currency = info.get('currency', 'KRW' if ticker_input.endswith(('.KS', '.KQ')) else 'USD')
-                return ticker_input, name, currency
-            except:
-                currency = 'KRW' if ticker_input.endswith(('.KS', '.KQ')) else 'USD'
-                return ticker_input, ticker_input, currency
-        else:
-            print(f"⚠ 유효하지 않은 종목 코드입니다.")
+                result = func()
+            except Exception as e:
+                kind = classify_fetch_error(e)
+                if kind is None:
+                    raise
+                if attempt >= self.retries:
+                    if kind == 'throttled':
+                        METRICS.count('throttle_failures')
+                        raise RateLimitError(f"요청 제한으로 {attempt + 1}번 실패했습니다: {e}") from e
+                    raise
+                delay = self.delay(attempt)
+                attempt += 1
+                METRICS.count('fetch_retries')
+                if kind == 'throttled':
+                    METRICS.count('throttled')
+                    self.bucket.throttle(delay)
+                else:
+                    self._sleep(delay)
+                continue
+            self.bucket.success()
+            return result
 
-    # 3. 한글이 포함되어 있으면 한국 주식 검색 (FinanceDataReader)
-    if re.search(r'[가-힣]', ticker_input):
-        print(f"\n'{ticker_input}' 한국 주식 검색 중...")
-        kr_results = search_korean_stock(ticker_input)
 
-        if kr_results:
-            print("\n검색 결과:")
-            for i, result in enumerate(kr_results, 1):
-                print(f"  {i}. {result['name']} ({result['code']}) - {result['market']}")
+def get_fetch_scheduler():
+    """현재 원격 요청 스케줄러 (처음 호출 시 FETCH_RATE로 생성)"""
+    global _FETCH_SCHEDULER
 
-            # 첫 번째 결과 사용
-            result = kr_results[0]
-            symbol = result['symbol']
-            name = result['name']
-            print(f"\n✓ '{name}' 발견: {symbol}")
-            return symbol, name, 'KRW'
-        else:
-            print(f"\n✗ '{ticker_input}' 검색 결과 없음")
-            print("\n해결 방법:")
-            print("  1. 정확한 종목명 입력 (예: 삼성전자, 카카오)")
-            print("  2. 종목 코드 직접 입력 (예: 005930.KS)")
-            raise ValueError(f"종목을 찾을 수 없습니다: {ticker_input}")
+    if _FETCH_SCHEDULER is None:
+        _FETCH_SCHEDULER = FetchScheduler()
+    return _FETCH_SCHEDULER
 
-    # 4. 영문 검색 (Yahoo Finance - yfinance.Search)
-    print(f"\n'{ticker_input}' 검색 중...")
-    yahoo_results = search_ticker_yahoo(ticker_input)
 
-    if yahoo_results:
-        print("검색 결과:")
-        for i, result in enumerate(yahoo_results, 1):
-            print(f"  {i}. {result['name']} ({result['symbol']}) - {result['exchange']}")
+def set_fetch_scheduler(scheduler):
+    """원격 요청 스케줄러 교체 (None이면 다음 get_fetch_scheduler() 호출 시 기본값으로 생성)"""
+    global _FETCH_SCHEDULER
 
-        # 첫 번째 결과 사용
-        result = yahoo_results[0]
-        symbol = result['symbol']
-        name = result['name']
-        print(f"\n✓ '{name}' 발견: {symbol}")
+    _FETCH_SCHEDULER = scheduler
 
-        # 통화 정보 가져오기
-        try:
-            ticker_obj = yf.Ticker(symbol)
-            info = ticker_obj.info
-            currency = info.get('currency', 'USD')
-        except:
-            currency = 'KRW' if symbol.endswith(('.KS', '.KQ')) else 'USD'
 
-        return symbol, name, currency
+# 데이터 소스
+class DataProvider:
+    """
+    주가/종목 데이터 소스 인터페이스
 
-    # 5. 모든 검색 실패 시 에러 메시지
-    print(f"\n✗ '{ticker_input}' 검색 결과 없음")
-    print("\n해결 방법:")
-    print("  1. 정확한 영문 종목명 사용 (예: Apple, Microsoft)")
-    print("  2. 종목 코드 직접 입력 (예: AAPL, MSFT)")
-    print("  3. 한국 주식은 영문명 사용 (예: Samsung, Hyundai)")
+    SupportResistanceAnalyzer.fetch_data(), verify_ticker(), search_ticker_yahoo(),
+    get_krx_stock_list(), get_ticker_info()는 모두 get_data_provider()를 통해 데이터를 받습니다.
+    remote가 True인 소스(네트워크)만 주가 데이터 캐시, 종목 검색 결과 저장,
+    비동기 선수집(--fetch-concurrency)을 사용합니다.
+    """
 
-    raise ValueError(f"종목을 찾을 수 없습니다: {ticker_input}")
+    name = 'base'
+    remote = False
 
+    def history(self, symbol, start_date=None, end_date=None, interval='1d', period=None):
+        """
+        [start_date, end_date) 주가 데이터 (yfinance history()와 같은 형식, 없으면 빈 DataFrame)
 
-class SupportResistanceAnalyzer:
-    """지지선/저항선 분석 클래스"""
+        period('5d' 등)를 주면 기간 대신 최근 데이터
+        """
+        raise NotImplementedError
 
-    def __init__(self, ticker, start_date, end_date=None, ticker_name=None, currency=None):
+    def history_many(self, symbols, start_date=None, end_date=None, interval='1d', batch=FETCH_BATCH):
         """
-        초기화
+        여러 종목 주가 데이터를 받아 (종목코드, DataFrame 또는 예외)를 받는 대로 반환 (generator)
+
+        기본 구현은 종목마다 history() 호출, 한 번에 여러 종목(batch개)을 받을 수 있는 소스는 재정의
+        """
+        for symbol in symbols:
+            try:
+                yield symbol, self.history(symbol, start_date, end_date, interval=interval)
+            except Exception as e:
+                yield symbol, e
+
+    def ticker_info(self, symbol):
+        """종목 정보 dict (longName, shortName, currency 중 아는 것), 실패하면 예외"""
+        raise NotImplementedError
+
+    def search(self, query, max_results=5):
+        """종목 검색 결과 (quote dict 리스트: symbol, shortname/longname, exchange, quoteType)"""
+        raise NotImplementedError
+
+    def stock_listing(self):
+        """한국 주식 종목 리스트 (Code, Name, Market 컬럼 DataFrame)"""
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    """
+    Yahoo Finance(yfinance)와 FinanceDataReader에서 데이터를 받는 기본 소스
+
+    모든 요청은 get_fetch_scheduler()를 거칩니다 (속도 제한, 재시도, 같은 요청 합치기).
+    """
+
+    name = 'yahoo'
+    remote = True
+
+    def history(self, symbol, start_date=None, end_date=None, interval='1d', period=None):
+        import yfinance as yf
+
+        if period is not None:
+            return get_fetch_scheduler().call(
+                ('history', symbol, period, interval),
+                lambda: yf.Ticker(symbol).history(period=period, interval=interval))
+        return get_fetch_scheduler().call(
+            ('history', symbol, start_date, end_date, interval),
+            lambda: yf.Ticker(symbol).history(start=start_date, end=end_date, interval=interval))
+
+    def history_many(self, symbols, start_date=None, end_date=None, interval='1d', batch=FETCH_BATCH):
+        """
+        yf.download()로 batch개씩 묶어 받기
+
+        같은 접미사(거래소, 즉 같은 타임존)끼리 묶어 인덱스를 종목별 history()와 같게 맞춥니다.
+        묶음에서 빠진 종목(요청 제한 등)은 history()로 하나씩 다시 받습니다.
+        yfinance는 묶음 안에서도 종목마다 요청을 보내므로 토큰은 종목 수만큼 씁니다.
+        """
+        import yfinance as yf
+
+        groups = {}
+        for symbol in dict.fromkeys(symbols):
+            groups.setdefault(symbol.rpartition('.')[2] if '.' in symbol else '', []).append(symbol)
+
+        for group in groups.values():
+            for i in range(0, len(group), batch):
+                chunk = group[i:i + batch]
+                try:
+                    data = get_fetch_scheduler().call(
+                        None, lambda: yf.download(chunk, start=start_date, end=end_date, interval=interval,
+                                                  group_by='ticker', auto_adjust=True, actions=True,
+                                                  threads=False, progress=False, ignore_tz=False,
+                                                  multi_level_index=True),
+                        cost=len(chunk))
+                except Exception:
+                    data = None
+                for symbol in chunk:
+                    df = None
+                    if data is not None and symbol in data.columns.get_level_values(0):
+                        df = data[symbol].dropna(how='all')
+                        df.columns.name = None
+                    if df is None or df.empty:
+                        METRICS.count('batch_fallbacks')
+                        try:
+                            df = self.history(symbol, start_date, end_date, interval=interval)
+                        except Exception as e:
+                            yield symbol, e
+                            continue
+                    yield symbol, df
 
+    def ticker_info(self, symbol):
+        import yfinance as yf
+
+        return get_fetch_scheduler().call(('info', symbol), lambda: yf.Ticker(symbol).info)
+
+    def search(self, query, max_results=5):
+        import yfinance as yf
+
+        return get_fetch_scheduler().call(('search', query, max_results),
+                                          lambda: yf.Search(query, max_results=max_results).quotes)
+
+    def stock_listing(self):
+        import FinanceDataReader as fdr
+
+        return get_fetch_scheduler().call(('listing',), lambda: fdr.StockListing('KRX'))
+
+
+# ReplayProvider가 읽는 파일 확장자 (앞쪽 우선)
+REPLAY_EXTENSIONS = ('.parquet', '.arrow', '.feather', '.csv')
+
+
+class ReplayProvider(DataProvider):
+    """
+    로컬 디렉토리의 파일을 재생하는 데이터 소스 (네트워크 없음)
+
+    디렉토리 구성:
+        <종목코드>.parquet|.arrow|.feather|.csv   일봉 (분봉은 <종목코드>@<간격>.*)
+        listing.csv                               한국 주식 종목 리스트 (Code, Name, Market), 선택
+        info.json                                 {종목코드: {"name": ..., "currency": ...}}, 선택
+
+    파일 이름은 OHLCVCache와 같은 규칙이므로 주가 데이터 캐시 디렉토리도 그대로 재생할 수 있습니다.
+    Parquet은 메모리 매핑으로, Arrow IPC는 pyarrow.memory_map으로 읽고, 한 번 읽은 파일은
+    프로세스 안에서 재사용합니다. 같은 파일이면 항상 같은 결과이므로 백테스트/벤치마크가 재현됩니다.
+    """
+
+    name = 'replay'
+    remote = False
+
+    def __init__(self, directory):
+        """
         Parameters:
         -----------
-        ticker : str
-            종목 코드 (예: '005930.KS', 'AAPL')
-        start_date : str
-            시작 날짜 (YYYY-MM-DD)
-        end_date : str, optional
-            종료 날짜 (YYYY-MM-DD), 기본값은 오늘
-        ticker_name : str, optional
-            종목명 (예: '삼성전자', 'Apple Inc.')
-        currency : str, optional
-            통화 (예: 'KRW', 'USD')
+        directory : str
+            재생할 파일 디렉토리
         """
-        self.ticker = ticker
-        self.ticker_name = ticker_name or ticker
-        self.currency = currency or 'KRW'
-        self.start_date = start_date
-        self.end_date = end_date or datetime.now().strftime('%Y-%m-%d')
-        self.df = None
-        self.support_levels = []
-        self.resistance_levels = []
-        
-    def fetch_data(self):
-        """주가 데이터 가져오기"""
-        print(f"데이터 수집 중: {self.ticker} ({self.start_date} ~ {self.end_date})")
-        ticker_obj = yf.Ticker(self.ticker)
-        self.df = ticker_obj.history(start=self.start_date, end=self.end_date)
-        if self.df.empty:
-            raise ValueError(f"데이터를 가져올 수 없습니다. 종목 코드를 확인하세요: {self.ticker}")
-        print(f"데이터 수집 완료: {len(self.df)}개 데이터")
-        return self.df
-    
-    def find_pivots(self, column='Close', order=5):
+        if not os.path.isdir(directory):
+            raise ValueError(f"재생 데이터 디렉토리가 없습니다: {directory}")
+        self.directory = directory
+        self._frames = {}
+        self._info = None
+        self._listing = None
+
+    def __getstate__(self):
+        # 워커 프로세스로 보낼 때 읽어 둔 데이터는 보내지 않음
+        return {'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'])
+
+    def path(self, symbol, interval='1d'):
+        """종목 데이터 파일 경로 (없으면 None)"""
+        base = os.path.join(self.directory, _symbol_key(symbol, interval))
+        for ext in REPLAY_EXTENSIONS:
+            if os.path.exists(base + ext):
+                return base + ext
+        return None
+
+    def symbols(self, interval='1d'):
+        """재생할 수 있는 종목 코드 목록 (파일 이름 기준)"""
+        symbols = set()
+        for filename in os.listdir(self.directory):
+            key, ext = os.path.splitext(filename)
+            if ext not in REPLAY_EXTENSIONS or key == 'listing':
+                continue
+            symbol, _, key_interval = key.partition('@')
+            if (key_interval or '1d') == interval:
+                symbols.add(symbol)
+        return sorted(symbols)
+
+    def _read(self, path):
+        import pandas as pd
+
+        ext = os.path.splitext(path)[1]
+        if ext == '.csv':
+            df = pd.read_csv(path, index_col=0)
+            df.index = _parse_replay_index(df.index)
+            return df
+        import pyarrow as pa
+
+        if ext == '.parquet':
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path, memory_map=True)
+        else:
+            table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.to_pandas()
+
+    def frame(self, symbol, interval='1d'):
+        """종목 전체 데이터 (파일이 없으면 빈 DataFrame)"""
+        import pandas as pd
+
+        key = (symbol, interval)
+        df = self._frames.get(key)
+        if df is None:
+            path = self.path(symbol, interval)
+            if path is None:
+                return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+            with METRICS.stage('replay_read'):
+                df = self._read(path).sort_index()
+            METRICS.count('replay_files')
+            self._frames[key] = df
+        return df
+
+    def preload(self, symbols=None, interval='1d', workers=None):
+        """
+        여러 종목 파일을 스레드 풀에서 한 번에 읽어 두기
+
+        Returns:
+        --------
+        int : 읽은 종목 수
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        symbols = self.symbols(interval) if symbols is None else list(symbols)
+        with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 2)) as pool:
+            frames = list(pool.map(lambda symbol: self.frame(symbol, interval), symbols))
+        return sum(not df.empty for df in frames)
+
+    def history(self, symbol, start_date=None, end_date=None, interval='1d', period=None):
+        df = self.frame(symbol, interval)
+        if period is not None:
+            return df.tail(int(re.sub(r'\D', '', period) or 5))
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        return slice_dates(df, start_date or '1900-01-01', end_date) if not df.empty else df
+
+    def _load_info(self):
+        if self._info is None:
+            try:
+                with open(os.path.join(self.directory, 'info.json'), encoding='utf-8') as f:
+                    self._info = json.load(f)
+            except FileNotFoundError:
+                self._info = {}
+        return self._info
+
+    def ticker_info(self, symbol):
+        entry = self._load_info().get(symbol)
+        if entry is None:
+            if self.path(symbol) is None:
+                raise ValueError(f"재생 데이터에 없는 종목입니다: {symbol}")
+            return {}
+        info = {'longName': entry.get('name', symbol)}
+        if entry.get('currency'):
+            info['currency'] = entry['currency']
+        return info
+
+    def search(self, query, max_results=5):
+        needle = query.lower()
+        info = self._load_info()
+        quotes = []
+        for symbol in sorted(set(info) | set(self.symbols())):
+            name = info.get(symbol, {}).get('name', symbol)
+            if needle in symbol.lower() or needle in name.lower():
+                quotes.append({'symbol': symbol, 'shortname': name, 'exchange': '', 'quoteType': 'EQUITY'})
+                if len(quotes) >= max_results:
+                    break
+        return quotes
+
+    def stock_listing(self):
+        import pandas as pd
+
+        if self._listing is None:
+            path = os.path.join(self.directory, 'listing.csv')
+            if os.path.exists(path):
+                self._listing = pd.read_csv(path, dtype={'Code': str})
+            else:
+                self._listing = pd.DataFrame(columns=['Code', 'Name', 'Market'])
+        return self._listing
+
+
+def _parse_replay_index(values):
+    """CSV 날짜 컬럼을 DatetimeIndex로 변환 (시간대 오프셋이 섞여 있으면 현지 시각 기준)"""
+    import pandas as pd
+
+    values = pd.Index(values).astype(str)
+    try:
+        index = pd.to_datetime(values, format='ISO8601')
+    except (ValueError, TypeError):
+        index = None
+    if not isinstance(index, pd.DatetimeIndex):
+        # 서머타임 등으로 오프셋이 섞인 경우 오프셋을 떼고 현지 시각만 사용
+        index = pd.to_datetime(values.str.slice(0, 19), format='ISO8601')
+    index.name = 'Date'
+    return index
+
+
+def get_data_provider():
+    """
+    현재 데이터 소스 (처음 호출 시 생성)
+
+    환경변수 SR_ANALYZER_REPLAY_DIR이 있으면 그 디렉토리의 ReplayProvider,
+    없으면 YahooProvider를 사용합니다 (워커 프로세스도 같은 환경변수로 같은 소스 사용).
+    """
+    global _DATA_PROVIDER
+
+    if _DATA_PROVIDER is None:
+        replay_dir = os.environ.get('SR_ANALYZER_REPLAY_DIR')
+        _DATA_PROVIDER = ReplayProvider(replay_dir) if replay_dir else YahooProvider()
+    return _DATA_PROVIDER
+
+
+def set_data_provider(provider):
+    """
+    데이터 소스 교체 (종목 리스트/검색 인덱스/확인용 데이터는 새 소스로 다시 읽음)
+
+    Parameters:
+    -----------
+    provider : DataProvider or None
+        None이면 다음 get_data_provider() 호출 시 기본 소스 생성
+    """
+    global _DATA_PROVIDER, _KRX_STOCK_LIST, _KRX_DIRECTORY
+
+    _DATA_PROVIDER = provider
+    _KRX_STOCK_LIST = None
+    _KRX_DIRECTORY = None
+    _VERIFIED_HISTORY.clear()
+
+
+def search_ticker_yahoo(query):
+    """
+    Yahoo Finance를 통해 종목 검색 (yfinance.Search 사용)
+
+    Parameters:
+    -----------
+    query : str
+        검색어 (종목명, 티커 등) - 영문 검색어 권장
+
+    Returns:
+    --------
+    list : 검색 결과 리스트
+    """
+    try:
+        # 데이터 소스 검색 (기본값: yfinance Search)
+        quotes = get_data_provider().search(query, max_results=5)
+
+        results = []
+        for quote in quotes:
+            symbol = quote.get('symbol', '')
+            name = quote.get('shortname') or quote.get('longname', '')
+            exchange = quote.get('exchange', '')
+            quote_type = quote.get('quoteType', '')
+
+            # 주식만 필터링
+            if quote_type in ['EQUITY', 'ETF']:
+                results.append({
+                    'symbol': symbol,
+                    'name': name,
+                    'exchange': exchange,
+                    'type': quote_type
+                })
+
+        return results
+    except RateLimitError:
+        raise
+    except Exception as e:
+        print(f"Yahoo Finance 검색 오류: {e}")
+        return []
+
+
+def _krx_listing_path():
+    return os.path.join(CACHE_DIR, 'krx_listing.pkl')
+
+
+def get_krx_stock_list(refresh=False, ttl=None):
+    """
+    한국 주식 종목 리스트 가져오기 (캐시 사용)
+
+    프로세스 안에서는 한 번만 로드하고, 내려받은 리스트는 로컬 파일에 저장하여
+    유효 기간(ttl) 안에는 새 프로세스에서도 네트워크 없이 읽습니다.
+
+    Parameters:
+    -----------
+    refresh : bool
+        True면 로컬 파일을 무시하고 새로 내려받음
+    ttl : int, optional
+        로컬 파일 유효 기간 (초) (기본값: KRX_LISTING_TTL)
+
+    Returns:
+    --------
+    DataFrame : 한국 주식 종목 리스트 (로컬 재생 소스는 로컬 파일에 저장하지 않음)
+    """
+    import pandas as pd
+
+    global _KRX_STOCK_LIST, _KRX_DIRECTORY
+
+    if refresh:
+        _KRX_STOCK_LIST = None
+        _KRX_DIRECTORY = None
+
+    provider = get_data_provider()
+    if _KRX_STOCK_LIST is None and provider.remote:
+        import time
+
+        path = _krx_listing_path()
+        ttl = KRX_LISTING_TTL if ttl is None else ttl
+        if not refresh and os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+            try:
+                _KRX_STOCK_LIST = pd.read_pickle(path)
+            except Exception:
+                _KRX_STOCK_LIST = None
+
+    if _KRX_STOCK_LIST is None:
+        try:
+            print("한국 주식 종목 리스트 로딩 중...")
+            _KRX_STOCK_LIST = provider.stock_listing()
+            print(f"✓ {len(_KRX_STOCK_LIST)}개 종목 로드 완료")
+            if not provider.remote:
+                return _KRX_STOCK_LIST
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                _write_atomic(_krx_listing_path(), _KRX_STOCK_LIST.to_pickle)
+            except OSError as e:
+                print(f"⚠ 종목 리스트 저장 실패: {e}")
+        except RateLimitError:
+            # 빈 리스트를 기억하지 않고 다음 호출에서 다시 시도
+            raise
+        except Exception as e:
+            print(f"종목 리스트 로딩 실패: {e}")
+            _KRX_STOCK_LIST = pd.DataFrame()
+
+    return _KRX_STOCK_LIST
+
+
+# 한글 초성 (유니코드 한글 음절 순서)
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+
+
+def to_choseong(text):
+    """
+    한글 음절을 초성으로 변환 (예: '삼성전자' -> 'ㅅㅅㅈㅈ'), 그 외 문자는 그대로
+
+    Parameters:
+    -----------
+    text : str
+        변환할 문자열
+
+    Returns:
+    --------
+    str : 초성 문자열
+    """
+    chars = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            chars.append(CHOSEONG[code // 588])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+def is_choseong_query(query):
+    """검색어가 초성(ㄱ~ㅎ)으로만 이루어져 있는지 확인"""
+    return bool(query) and all(ch in CHOSEONG for ch in query if not ch.isspace())
+
+
+class _NgramIndex:
+    """부분 문자열 검색용 1/2-gram 역색인 (문자열 → 행 번호, 행 순서 유지)"""
+
+    def __init__(self, strings):
+        self.strings = strings
+        postings = {}
+        for row, text in enumerate(strings):
+            grams = set(text)
+            grams.update(text[i:i + 2] for i in range(len(text) - 1))
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.asarray(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def search(self, query, limit=None):
+        """query를 부분 문자열로 포함하는 행 번호 (오름차순, 최대 limit개)"""
+        if not query:
+            rows = np.arange(len(self.strings), dtype=np.int32)
+            return rows if limit is None else rows[:limit]
+
+        grams = {query[i:i + 2] for i in range(len(query) - 1)} or {query}
+        lists = []
+        for gram in grams:
+            rows = self.postings.get(gram)
+            if rows is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(rows)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return candidates
+
+        if len(query) <= 2:
+            return candidates if limit is None else candidates[:limit]
+
+        # 2-gram이 모두 있어도 연속 부분 문자열이 아닐 수 있으므로 확인
+        matched = []
+        for row in candidates:
+            if query in self.strings[row]:
+                matched.append(row)
+                if limit is not None and len(matched) >= limit:
+                    break
+        return np.asarray(matched, dtype=np.int32)
+
+
+class KRXSymbolDirectory:
+    """
+    한국 주식 종목 검색 인덱스
+
+    종목명(대소문자 무시), 종목코드, 초성 검색을 지원합니다. 종목명과 초성 문자열에
+    대한 1/2-gram 역색인을 미리 만들어 두므로 검색마다 전체 종목을 훑지 않습니다.
+    """
+
+    def __init__(self, listing):
         """
-        피봇 포인트(극값) 찾기
-        
         Parameters:
         -----------
-        column : str
-            분석할 컬럼 (기본값: 'Close')
-        order : int
-            피봇을 찾을 때 비교할 주변 데이터 개수
-        
+        listing : DataFrame
+            get_krx_stock_list() 결과 (Code, Name, Market 컬럼)
+        """
+        self.codes = listing['Code'].astype(str).tolist()
+        self.names = listing['Name'].astype(str).tolist()
+        self.markets = listing['Market'].astype(str).tolist()
+        self.code_rows = {}
+        for row, code in enumerate(self.codes):
+            self.code_rows.setdefault(code, row)
+        self.name_index = _NgramIndex([name.lower() for name in self.names])
+        self.choseong_index = _NgramIndex([to_choseong(name.lower()) for name in self.names])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _result(self, row):
+        code = self.codes[row]
+        market = self.markets[row]
+        return {
+            'symbol': krx_to_yahoo_symbol(code, market),
+            'name': self.names[row],
+            'code': code,
+            'market': market
+        }
+
+    def search(self, query, limit=5):
+        """
+        종목 검색
+
+        Parameters:
+        -----------
+        query : str
+            종목명 일부, 6자리 종목코드 또는 초성 (예: 'ㅅㅅㅈㅈ')
+        limit : int
+            최대 결과 개수
+
         Returns:
         --------
-        local_min : array
-            지지선 후보 (로컬 최소값)
-        local_max : array
-            저항선 후보 (로컬 최대값)
+        list : search_korean_stock()과 같은 형식의 결과 리스트
+               (종목명 일치 결과를 리스트 순서대로, 그 다음 종목코드 일치 결과)
         """
-        # 로컬 최소값 (지지선 후보)
-        local_min_idx = argrelextrema(self.df[column].values, np.less_equal, order=order)[0]
-        local_min = self.df[column].iloc[local_min_idx].values
-        
-        # 로컬 최대값 (저항선 후보)
-        local_max_idx = argrelextrema(self.df[column].values, np.greater_equal, order=order)[0]
-        local_max = self.df[column].iloc[local_max_idx].values
-        
-        return local_min, local_max, local_min_idx, local_max_idx
-    
-    def cluster_levels(self, levels, tolerance=0.02):
+        if is_choseong_query(query):
+            rows = list(self.choseong_index.search(query.replace(' ', ''), limit))
+        else:
+            rows = list(self.name_index.search(query.lower(), limit))
+
+        if query.isdigit() and query in self.code_rows:
+            code_row = self.code_rows[query]
+            if code_row not in rows:
+                rows.append(code_row)
+
+        return [self._result(int(row)) for row in rows[:limit]]
+
+
+def get_symbol_directory():
+    """
+    한국 주식 종목 검색 인덱스 가져오기 (프로세스당 한 번 생성)
+
+    Returns:
+    --------
+    KRXSymbolDirectory or None : 종목 리스트를 가져오지 못하면 None
+    """
+    global _KRX_DIRECTORY
+
+    if _KRX_DIRECTORY is None:
+        krx = get_krx_stock_list()
+        if krx.empty:
+            return None
+        _KRX_DIRECTORY = KRXSymbolDirectory(krx)
+    return _KRX_DIRECTORY
+
+
+def krx_to_yahoo_symbol(code, market):
+    """
+    KRX 종목코드를 Yahoo Finance 심볼로 변환
+
+    Parameters:
+    -----------
+    code : str
+        6자리 종목코드 (예: '005930')
+    market : str
+        시장 구분 (KOSPI, KOSDAQ, KOSDAQ GLOBAL, KONEX 등)
+
+    Returns:
+    --------
+    str : Yahoo Finance 심볼 (예: '005930.KS')
+    """
+    if str(market).startswith('KOSDAQ'):
+        return f"{code}.KQ"
+    return f"{code}.KS"  # KOSPI 및 기타 시장 기본값
+
+
+def search_korean_stock(query):
+    """
+    한국 주식 검색 (데이터 소스의 종목 리스트 활용)
+
+    Parameters:
+    -----------
+    query : str
+        검색어 (한글 종목명, 종목코드 또는 초성)
+
+    Returns:
+    --------
+    list : 검색 결과 리스트
+    """
+    try:
+        directory = get_symbol_directory()
+
+        if directory is None:
+            return []
+
+        return directory.search(query, limit=5)
+    except Exception as e:
+        print(f"한국 주식 검색 오류: {e}")
+        return []
+
+
+# 확인 과정에서 받은 주가 데이터 (fetch_data()에서 한 번만 재사용하고 버림)
+# {종목코드: (시작일, 종료일, DataFrame)}
+_VERIFIED_HISTORY = {}
+
+
+def verify_ticker(symbol, start_date=None, end_date=None):
+    """
+    종목 코드가 유효한지 확인
+
+    분석 기간을 주면 그 기간의 데이터로 확인하고, 받은 데이터를 보관해 두었다가
+    fetch_data()에서 다시 요청하지 않고 사용합니다.
+
+    Parameters:
+    -----------
+    symbol : str
+        종목 코드
+    start_date, end_date : str, optional
+        분석 기간 (YYYY-MM-DD), 생략하면 최근 5일로 확인
+
+    Returns:
+    --------
+    bool : 유효 여부
+    """
+    try:
+        provider = get_data_provider()
+        if start_date:
+            end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+            info = provider.history(symbol, start_date, end_date)
+            if not info.empty:
+                _VERIFIED_HISTORY[symbol] = (start_date, end_date, info)
+        else:
+            info = provider.history(symbol, period='5d')
+        return not info.empty
+    except RateLimitError:
+        # 요청 제한은 종목이 없다는 뜻이 아니므로 그대로 전달
+        raise
+    except Exception:
+        return False
+
+
+def take_verified_history(symbol, start_date, end_date):
+    """
+    verify_ticker()가 받아 둔 데이터 중 [start_date, end_date) 구간 꺼내기
+
+    꺼낸 항목은 보관소에서 지우므로(구간이 맞지 않아도) 긴 배치/감시 실행에서 데이터가 쌓이지 않습니다.
+
+    Returns:
+    --------
+    DataFrame or None : 보관된 데이터가 요청 구간을 모두 포함하지 않으면 None
+    """
+    stored = _VERIFIED_HISTORY.pop(symbol, None)
+    if stored is None:
+        return None
+    stored_start, stored_end, df = stored
+    if stored_start <= start_date and end_date <= stored_end:
+        return slice_dates(df, start_date, end_date)
+    return None
+
+
+# 종목 검색 결과 저장 파일과 유효 기간 (초)
+RESOLVE_TTL = 7 * 24 * 60 * 60
+_RESOLVE_MEMO = None
+
+# 접미사/지수로 알 수 있는 통화 (.info 요청 생략)
+SUFFIX_CURRENCIES = {
+    '.KS': 'KRW', '.KQ': 'KRW', '.T': 'JPY', '.HK': 'HKD', '.SS': 'CNY', '.SZ': 'CNY',
+    '.TW': 'TWD', '.L': 'GBP', '.DE': 'EUR', '.PA': 'EUR', '.AS': 'EUR', '.TO': 'CAD', '.AX': 'AUD',
+}
+INDEX_CURRENCIES = {
+    '^KS11': 'KRW', '^KQ11': 'KRW', '^GSPC': 'USD', '^IXIC': 'USD', '^DJI': 'USD',
+}
+# Yahoo Finance 검색 결과의 거래소 코드별 통화
+EXCHANGE_CURRENCIES = {
+    'NMS': 'USD', 'NYQ': 'USD', 'NGM': 'USD', 'NCM': 'USD', 'ASE': 'USD', 'PCX': 'USD', 'BTS': 'USD',
+    'KSC': 'KRW', 'KOE': 'KRW', 'JPX': 'JPY', 'HKG': 'HKD', 'LSE': 'GBP',
+}
+
+
+def currency_from_suffix(symbol):
+    """
+    종목 코드 접미사나 지수 코드로 통화 판단
+
+    Returns:
+    --------
+    str or None : 알 수 없으면 None
+    """
+    if symbol in INDEX_CURRENCIES:
+        return INDEX_CURRENCIES[symbol]
+    if '.' in symbol:
+        return SUFFIX_CURRENCIES.get(symbol[symbol.rindex('.'):])
+    return None
+
+
+def _resolve_memo_path():
+    return os.path.join(CACHE_DIR, 'resolve.json')
+
+
+def _load_resolve_memo():
+    """저장된 종목 검색 결과 읽기 (프로세스당 한 번)"""
+    global _RESOLVE_MEMO
+
+    if _RESOLVE_MEMO is None:
+        try:
+            with open(_resolve_memo_path(), encoding='utf-8') as f:
+                _RESOLVE_MEMO = json.load(f)
+        except (OSError, ValueError):
+            _RESOLVE_MEMO = {}
+    return _RESOLVE_MEMO
+
+
+def _save_resolve_memo(memo):
+    """
+    종목 검색 결과 저장
+
+    다른 프로세스(유니버스 워커 등)가 그 사이에 저장한 결과를 잃지 않도록
+    디스크의 내용과 합친 뒤(입력값별로 더 최근 결과 사용) 교체합니다.
+    """
+    try:
+        with open(_resolve_memo_path(), encoding='utf-8') as f:
+            on_disk = json.load(f)
+    except (OSError, ValueError):
+        on_disk = {}
+    for key, entry in on_disk.items():
+        if key not in memo or memo[key].get('time', 0) < entry.get('time', 0):
+            memo[key] = entry
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+
+        def write_memo(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(memo, f, ensure_ascii=False)
+
+        _write_atomic(_resolve_memo_path(), write_memo)
+    except OSError as e:
+        print(f"⚠ 종목 검색 결과 저장 실패: {e}")
+
+
+def clear_resolve_memo():
+    """저장된 종목 검색 결과 삭제"""
+    global _RESOLVE_MEMO
+
+    _RESOLVE_MEMO = {}
+    try:
+        os.remove(_resolve_memo_path())
+    except OSError:
+        pass
+
+
+def get_ticker_info(ticker_input, start_date=None, end_date=None, use_memo=True):
+    """
+    종목명 또는 코드를 입력받아 종목 정보 반환
+
+    검색 결과는 입력값별로 로컬 파일에 저장하여 유효 기간(RESOLVE_TTL) 동안
+    네트워크 요청 없이 재사용합니다.
+
+    Parameters:
+    -----------
+    ticker_input : str
+        종목명(한글/영문) 또는 종목 코드
+    start_date, end_date : str, optional
+        분석 기간, 종목 코드 확인에 받은 데이터를 fetch_data()에서 재사용
+    use_memo : bool
+        저장된 검색 결과 사용 여부
+
+    Returns:
+    --------
+    tuple : (종목코드, 종목명, 통화)
+    """
+    import time
+
+    # 로컬 재생 소스의 결과는 저장하지도, 저장된 결과를 쓰지도 않음
+    remote = get_data_provider().remote
+    use_memo = use_memo and remote
+
+    with METRICS.stage('get_ticker_info'):
+        memo = _load_resolve_memo()
+        hit = memo.get(ticker_input)
+        if use_memo and hit and time.time() - hit['time'] < RESOLVE_TTL:
+            METRICS.count('resolve_memo_hits')
+            print(f"\n✓ '{ticker_input}' 발견: {hit['symbol']} (저장된 검색 결과)")
+            return hit['symbol'], hit['name'], hit['currency']
+
+        symbol, name, currency, confident = _resolve_ticker(ticker_input, start_date, end_date)
+        # 요청 실패로 추정한 결과는 저장하지 않음 (다음 실행에서 다시 확인)
+        if confident and remote:
+            memo[ticker_input] = {'symbol': symbol, 'name': name, 'currency': currency,
+                                  'time': time.time()}
+            _save_resolve_memo(memo)
+        return symbol, name, currency
+
+
+def _ticker_info(symbol, default_name):
+    """
+    데이터 소스(기본값: yfinance .info)로 종목명과 통화 가져오기
+
+    Returns:
+    --------
+    tuple : (종목명, 통화), 요청이 실패하거나 통화가 없으면 (default_name 등, None)
+    """
+    try:
+        info = get_data_provider().ticker_info(symbol)
+    except RateLimitError:
+        # 통화를 추측하지 않고 요청 제한 오류를 그대로 전달
+        raise
+    except Exception:
+        return default_name, None
+    name = info.get('longName', info.get('shortName', default_name)) or default_name
+    return name, info.get('currency')
+
+
+def _resolve_ticker(ticker_input, start_date=None, end_date=None):
+    """
+    get_ticker_info()의 실제 검색 (네트워크 사용)
+
+    Returns:
+    --------
+    tuple : (종목코드, 종목명, 통화, 확정 여부)
+            확정 여부는 통화를 접미사/거래소/지수 매핑이나 .info 응답으로 알아냈으면 True,
+            요청 실패로 기본값(USD 등)을 추정했으면 False (저장하지 않음)
+    """
+    # 1. 로컬 매핑에서 정확히 일치하는 것 찾기
+    if ticker_input in COMMON_TICKERS:
+        symbol = COMMON_TICKERS[ticker_input]
+        print(f"\n✓ '{ticker_input}' 발견: {symbol}")
+
+        # 통화를 알 수 있는 지수/종목은 추가 요청 없이 반환
+        currency = currency_from_suffix(symbol)
+        if currency:
+            return symbol, ticker_input, currency, True
+
+        # 티커(지수 포함) 정보 가져오기
+        name, currency = _ticker_info(symbol, ticker_input)
+        return symbol, name, currency or 'USD', currency is not None
+
+    # 1-2. 부분 매칭 시도 (예: '우리금융' -> '우리금융지주')
+    matches = []
+    for key in COMMON_TICKERS:
+        if ticker_input in key or key in ticker_input:
+            matches.append((key, COMMON_TICKERS[key]))
+
+    if matches:
+        # 가장 짧은 이름을 선택 (정확도가 높음)
+        matches.sort(key=lambda x: len(x[0]))
+        matched_name, symbol = matches[0]
+        print(f"\n✓ '{ticker_input}' -> '{matched_name}' 발견: {symbol}")
+        # 통화를 알 수 있으면 추가 요청 없이 반환
+        currency = currency_from_suffix(symbol)
+        if currency:
+            return symbol, matched_name, currency, True
+        name, currency = _ticker_info(symbol, matched_name)
+        return symbol, name, currency or 'USD', currency is not None
+
+    # 1-3. 6자리 숫자는 KRX 종목코드로 보고 종목 리스트에서 찾기 (예: '005930' -> 005930.KS)
+    if re.fullmatch(r'\d{6}', ticker_input):
+        for result in search_korean_stock(ticker_input):
+            if result['code'] == ticker_input:
+                print(f"\n✓ '{ticker_input}' -> '{result['name']}' 발견: {result['symbol']}")
+                return result['symbol'], result['name'], 'KRW', True
+
+    # 2. 이미 올바른 형식의 종목 코드인지 확인
+    # (예: 005930.KS, AAPL 등)
+    if re.match(r'^[A-Z0-9]+(\.(KS|KQ))?$', ticker_input):
+        print(f"\n종목 코드 확인 중: {ticker_input}")
+        if verify_ticker(ticker_input, start_date, end_date):
+            print(f"✓ 유효한 종목 코드입니다.")
+            currency = currency_from_suffix(ticker_input)
+            if currency:
+                return ticker_input, ticker_input, currency, True
+            # 종목 정보 가져오기
+            name, currency = _ticker_info(ticker_input, ticker_input)
+            return ticker_input, name, currency or 'USD', currency is not None
+        else:
+            print(f"⚠ 유효하지 않은 종목 코드입니다.")
+
+    # 3. 한글(초성 포함)이 있으면 한국 주식 검색 (FinanceDataReader)
+    if re.search(r'[가-힣ㄱ-ㅎ]', ticker_input):
+        print(f"\n'{ticker_input}' 한국 주식 검색 중...")
+        kr_results = search_korean_stock(ticker_input)
+
+        if kr_results:
+            print("\n검색 결과:")
+            for i, result in enumerate(kr_results, 1):
+                print(f"  {i}. {result['name']} ({result['code']}) - {result['market']}")
+
+            # 첫 번째 결과 사용
+            result = kr_results[0]
+            symbol = result['symbol']
+            name = result['name']
+            print(f"\n✓ '{name}' 발견: {symbol}")
+            return symbol, name, 'KRW', True
+        else:
+            print(f"\n✗ '{ticker_input}' 검색 결과 없음")
+            print("\n해결 방법:")
+            print("  1. 정확한 종목명 입력 (예: 삼성전자, 카카오)")
+            print("  2. 종목 코드 직접 입력 (예: 005930.KS)")
+            raise ValueError(f"종목을 찾을 수 없습니다: {ticker_input}")
+
+    # 4. 영문 검색 (Yahoo Finance - yfinance.Search)
+    print(f"\n'{ticker_input}' 검색 중...")
+    yahoo_results = search_ticker_yahoo(ticker_input)
+
+    if yahoo_results:
+        print("검색 결과:")
+        for i, result in enumerate(yahoo_results, 1):
+            print(f"  {i}. {result['name']} ({result['symbol']}) - {result['exchange']}")
+
+        # 첫 번째 결과 사용
+        result = yahoo_results[0]
+        symbol = result['symbol']
+        name = result['name']
+        print(f"\n✓ '{name}' 발견: {symbol}")
+
+        # 통화 정보 (접미사/거래소로 알 수 없을 때만 요청)
+        currency = currency_from_suffix(symbol) or EXCHANGE_CURRENCIES.get(result['exchange'])
+        if currency:
+            return symbol, name, currency, True
+        _, currency = _ticker_info(symbol, name)
+        return symbol, name, currency or 'USD', currency is not None
+
+    # 5. 모든 검색 실패 시 에러 메시지
+    print(f"\n✗ '{ticker_input}' 검색 결과 없음")
+    print("\n해결 방법:")
+    print("  1. 정확한 영문 종목명 사용 (예: Apple, Microsoft)")
+    print("  2. 종목 코드 직접 입력 (예: AAPL, MSFT)")
+    print("  3. 한국 주식은 영문명 사용 (예: Samsung, Hyundai)")
+
+    raise ValueError(f"종목을 찾을 수 없습니다: {ticker_input}")
+
+
+def _naive_index(index):
+    """타임존 정보를 제거한 DatetimeIndex (현지 시각 기준 날짜 비교용)"""
+    if getattr(index, 'tz', None) is not None:
+        return index.tz_localize(None)
+    return index
+
+
+def _symbol_key(symbol, interval='1d'):
+    """종목 데이터 파일 이름 (OHLCVCache, ReplayProvider 공통, 분봉은 '@간격' 추가)"""
+    key = re.sub(r'[^A-Za-z0-9.\-]', '_', symbol)
+    return key if interval == '1d' else f"{key}@{interval}"
+
+
+def slice_dates(df, start_date, end_date):
+    """
+    [start_date, end_date) 구간의 행만 선택 (yfinance와 같이 종료일 미포함)
+
+    Parameters:
+    -----------
+    df : DataFrame
+        DatetimeIndex를 가진 주가 데이터
+    start_date, end_date : str
+        YYYY-MM-DD
+
+    Returns:
+    --------
+    DataFrame : 선택된 구간
+    """
+    import pandas as pd
+
+    index = _naive_index(df.index)
+    mask = (index >= pd.Timestamp(start_date)) & (index < pd.Timestamp(end_date))
+    return df[mask]
+
+
+class OHLCVCache:
+    """
+    종목별 주가 데이터 로컬 캐시
+
+    종목마다 컬럼 형식 파일(Parquet, pyarrow가 없으면 pickle)과 수집 구간을
+    기록한 메타데이터(JSON)를 저장합니다. 요청 구간 중 캐시에 없는 앞/뒤 구간만
+    새로 받아 병합하므로, 매일 실행할 때는 마지막 며칠만 네트워크에서 가져옵니다.
+    파일 단위로 저장하므로 여러 워커 프로세스가 동시에 사용해도 안전합니다.
+    """
+
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Parameters:
+        -----------
+        cache_dir : str, optional
+            캐시 디렉토리 (기본값: CACHE_DIR/ohlcv)
+        max_bytes : int, optional
+            캐시 최대 크기 (바이트), 초과 시 오래 사용하지 않은 종목부터 삭제
+        """
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'ohlcv')
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        # 캐시 전체 크기 (처음 저장할 때 한 번 계산한 뒤 저장할 때마다 증감)
+        self._total_bytes = None
+        try:
+            import pyarrow  # noqa: F401
+            self.ext = '.parquet'
+        except ImportError:
+            self.ext = '.pkl'
+
+    def _key(self, symbol, interval='1d'):
+        """파일 이름으로 쓸 수 있는 캐시 키"""
+        return _symbol_key(symbol, interval)
+
+    def _paths(self, symbol, interval='1d'):
+        base = os.path.join(self.cache_dir, self._key(symbol, interval))
+        return base + self.ext, base + '.json'
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_meta(self, symbol, interval='1d'):
+        """
+        수집 구간 메타데이터만 읽기 (데이터 파일을 읽지 않고 최근 사용 시각도 바꾸지 않음)
+
+        Returns:
+        --------
+        dict or None : {'start', 'end'} 수집 구간
+        """
+        data_path, meta_path = self._paths(symbol, interval)
+        if not os.path.exists(data_path):
+            return None
+        return self._read_meta(meta_path)
+
+    def load(self, symbol, interval='1d'):
+        """
+        캐시된 데이터와 수집 구간 읽기
+
+        Returns:
+        --------
+        tuple : (DataFrame 또는 None, 메타데이터 dict 또는 None)
+        """
+        import pandas as pd
+
+        data_path, meta_path = self._paths(symbol, interval)
+        meta = self._read_meta(meta_path)
+        if meta is None or not os.path.exists(data_path):
+            return None, None
+        try:
+            if self.ext == '.parquet':
+                df = pd.read_parquet(data_path)
+            else:
+                df = pd.read_pickle(data_path)
+        except Exception:
+            return None, None
+        if df.empty:
+            return None, None
+        # LRU 정리를 위해 최근 사용 시각 갱신
+        os.utime(meta_path)
+        return df, meta
+
+    def missing_ranges(self, meta, start_date, end_date):
+        """
+        요청 구간 중 캐시에 없는 구간 계산
+
+        Parameters:
+        -----------
+        meta : dict or None
+            load()가 반환한 메타데이터
+        start_date, end_date : str
+            요청 구간 [start_date, end_date)
+
+        Returns:
+        --------
+        list : (시작일, 종료일) 튜플 리스트
+        """
+        if meta is None:
+            return [(start_date, end_date)]
+
+        gaps = []
+        if start_date < meta['start']:
+            gaps.append((start_date, meta['start']))
+        if end_date > meta['end']:
+            gaps.append((meta['end'], end_date))
+        return gaps
+
+    def fetch(self, symbol, start_date, end_date, fetcher, interval='1d'):
+        """
+        캐시를 이용해 [start_date, end_date) 데이터 가져오기
+
+        Parameters:
+        -----------
+        symbol : str
+            종목 코드
+        start_date, end_date : str
+            YYYY-MM-DD
+        fetcher : callable
+            fetcher(start, end) -> DataFrame, 빠진 구간을 네트워크에서 가져오는 함수
+        interval : str
+            봉 간격 (캐시 키 구분용)
+
+        Returns:
+        --------
+        DataFrame : 요청 구간 데이터
+        """
+        import pandas as pd
+
+        cached, meta = self.load(symbol, interval)
+        gaps = self.missing_ranges(meta, start_date, end_date)
+        if not gaps:
+            return slice_dates(cached, start_date, end_date)
+
+        # yfinance는 요청 제한/네트워크 오류 시 예외 대신 빈 데이터를 돌려주므로,
+        # 데이터가 온 구간만 수집 완료로 기록. 단, 이미 받은 첫 봉이 기록된 시작일보다
+        # 일주일 넘게 늦으면 상장 전이므로 그 앞 구간은 비어 있어도 완료로 봄
+        frames = [] if cached is None else [cached]
+        covered_start = meta['start'] if meta else None
+        covered_end = meta['end'] if meta else None
+        listed_later = (cached is not None and
+                        _naive_index(cached.index)[0] - pd.Timestamp(meta['start']) > pd.Timedelta(days=7))
+        for gap_start, gap_end in gaps:
+            part = fetcher(gap_start, gap_end)
+            received = part is not None and not part.empty
+            if received:
+                frames.append(part)
+            if meta is None:
+                if received:
+                    covered_start, covered_end = gap_start, gap_end
+            elif gap_end <= meta['start']:
+                if received or listed_later:
+                    covered_start = gap_start
+            elif received:
+                covered_end = gap_end
+
+        if not frames:
+            return pd.DataFrame()
+
+        merged = pd.concat(frames)
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+        if covered_start is not None:
+            # 오늘 봉은 장중에 바뀌므로 수집 구간은 오늘 이전까지만 기록
+            today = datetime.now().strftime('%Y-%m-%d')
+            new_meta = {'start': covered_start, 'end': min(covered_end, today)}
+            if new_meta != meta or len(frames) > 1:
+                self._store(symbol, interval, merged, new_meta)
+
+        return slice_dates(merged, start_date, end_date)
+
+    def _store(self, symbol, interval, df, meta):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, meta_path = self._paths(symbol, interval)
+        old_size = self._entry_size(data_path, meta_path)
+        if self.ext == '.parquet':
+            _write_atomic(data_path, df.to_parquet)
+        else:
+            _write_atomic(data_path, df.to_pickle)
+
+        def write_meta(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        _write_atomic(meta_path, write_meta)
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(e[3] for e in self.entries())
+        else:
+            self._total_bytes += self._entry_size(data_path, meta_path) - old_size
+        if self._total_bytes > self.max_bytes:
+            self.enforce_limit()
+
+    @staticmethod
+    def _entry_size(data_path, meta_path):
+        size = 0
+        for path in (data_path, meta_path):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def entries(self):
+        """
+        캐시 항목 목록
+
+        Returns:
+        --------
+        list : (키, 데이터 파일, 메타 파일, 크기, 최근 사용 시각) 튜플 리스트
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        result = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            key = entry.name[:-len('.json')]
+            data_path = os.path.join(self.cache_dir, key + self.ext)
+            size = entry.stat().st_size
+            if os.path.exists(data_path):
+                size += os.path.getsize(data_path)
+            result.append((key, data_path, entry.path, size, entry.stat().st_mtime))
+        return result
+
+    def enforce_limit(self):
+        """
+        캐시 크기가 max_bytes를 넘으면 오래 사용하지 않은 종목부터 삭제
+
+        디렉토리 전체를 훑으므로 저장할 때마다가 아니라 추적 중인 크기가
+        max_bytes를 넘었을 때만 호출됩니다.
+        """
+        entries = sorted(self.entries(), key=lambda e: e[4])
+        total = sum(e[3] for e in entries)
+        for key, data_path, meta_path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (data_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        self._total_bytes = total
+
+    def clear(self, symbols=None):
+        """
+        캐시 삭제
+
+        Parameters:
+        -----------
+        symbols : list, optional
+            삭제할 종목 코드 목록 (기본값: 전체)
+
+        Returns:
+        --------
+        int : 삭제한 항목 수
+        """
+        if symbols:
+            keys = {self._key(symbol) for symbol in symbols}
+            keys |= {key for key, *_ in self.entries()
+                     if key.split('@')[0] in keys}
+        else:
+            keys = None
+
+        removed = 0
+        for key, data_path, meta_path, _, _ in self.entries():
+            if keys is not None and key not in keys:
+                continue
+            for path in (data_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            removed += 1
+        return removed
+
+
+def _near_tolerance(ratio, tolerance, count):
+    """
+    누적합 평균으로 구한 비율이 허용 오차 경계에 너무 가까워 판정을 믿을 수 없는지
+
+    누적합 평균과 np.mean()(쌍별 덧셈)의 상대 오차는 count * eps 정도이므로
+    그 몇 배 안쪽이면 _joins_exact()로 다시 판정합니다.
+    """
+    return np.abs(ratio - tolerance) <= 4 * np.finfo(np.float64).eps * (count + 8)
+
+
+def _joins_exact(levels_sorted, start, pos, tolerance):
+    """levels_sorted[pos]가 levels_sorted[start:pos] 클러스터에 속하는지 np.mean()으로 판정 (기존 방식과 같은 값)"""
+    mean = levels_sorted[start:pos].mean()
+    return abs(levels_sorted[pos] - mean) / mean <= tolerance
+
+
+def _cluster_end(levels_sorted, start, tolerance):
+    """
+    start에서 시작하는 클러스터의 끝 인덱스(미포함) 계산
+
+    클러스터 평균은 누적합으로 유지하고, 다음 후보들을 블록 단위(크기를 두 배씩
+    늘림)로 한 번에 비교하므로 클러스터 크기에 대해 선형 시간입니다.
+    허용 오차 경계에 걸친 후보만 np.mean()으로 다시 판정하므로 결과는 기존 방식과 같습니다.
+    """
+    n = len(levels_sorted)
+    running_sum = levels_sorted[start]
+    count = 1
+    pos = start + 1
+    width = 8
+
+    while pos < n:
+        block = levels_sorted[pos:pos + width]
+        # sums[k]: block[k]를 비교하기 직전까지의 누적합 (순차 덧셈 순서 유지)
+        sums = np.cumsum(np.concatenate(([running_sum], block)))
+        counts = count + np.arange(len(block))
+        means = sums[:-1] / counts
+        ratio = np.abs(block - means) / means
+        unsure = _near_tolerance(ratio, tolerance, counts)
+        stop = (ratio > tolerance) | unsure
+        if stop.any():
+            k = int(np.argmax(stop))
+            if not (unsure[k] and _joins_exact(levels_sorted, start, pos + k, tolerance)):
+                return pos + k
+            # 경계 후보가 포함되면 그 다음부터 다시 비교
+            running_sum = sums[k + 1]
+            count += k + 1
+            pos += k + 1
+            continue
+        running_sum = sums[-1]
+        count += len(block)
+        pos += len(block)
+        width *= 2
+
+    return n
+
+
+def _cluster_means(levels_sorted, starts, counts, means=None):
+    """
+    클러스터별 평균 레벨 (np.mean()과 같은 값)
+
+    np.add.reduceat()과 np.mean()은 덧셈 순서가 달라(쌍별/SIMD 덧셈) 마지막 자릿수가 다를 수 있으므로,
+    덧셈 순서가 결과에 영향을 주는 3개 이상인 클러스터만 np.mean()으로 다시 계산합니다.
+    means(reduceat으로 구한 평균)를 주면 starts는 일부 클러스터만이어도 됩니다.
+    """
+    if means is None:
+        means = np.add.reduceat(levels_sorted, starts) / counts
+    else:
+        means = means.copy()
+    for i in np.flatnonzero(counts >= 3):
+        means[i] = levels_sorted[starts[i]:starts[i] + counts[i]].mean()
+    return means
+
+
+def _summarize_clusters(levels_sorted, starts):
+    """클러스터 시작 인덱스로부터 (평균 레벨, 빈도수) 리스트를 빈도수 내림차순으로 생성"""
+    if len(starts) == 0:
+        return []
+    counts = np.diff(np.append(starts, len(levels_sorted)))
+    means = _cluster_means(levels_sorted, starts, counts)
+    # 빈도수가 같으면 가격 오름차순 (안정 정렬)
+    order = np.argsort(-counts, kind='stable')
+    return [(means[i], int(counts[i])) for i in order]
+
+
+def cluster_levels(levels, tolerance=0.02):
+    """
+    비슷한 가격대를 클러스터링하여 주요 지지/저항선 찾기
+
+    정렬된 레벨을 앞에서부터 훑으며, 현재 클러스터 평균과의 차이가
+    tolerance 이내이면 같은 클러스터에 포함합니다. 클러스터 평균을 누적합으로
+    유지하므로 전체 O(n log n) (정렬) + O(n) 입니다.
+
+    Parameters:
+    -----------
+    levels : array
+        가격 레벨들
+    tolerance : float
+        클러스터링 허용 오차 (2% = 0.02)
+
+    Returns:
+    --------
+    clustered_levels : list
+        (평균 레벨, 빈도수) 리스트, 빈도수 내림차순
+    """
+    levels_sorted = np.sort(np.asarray(levels, dtype=np.float64))
+    if len(levels_sorted) == 0:
+        return []
+
+    starts = []
+    start = 0
+    while start < len(levels_sorted):
+        starts.append(start)
+        start = _cluster_end(levels_sorted, start, tolerance)
+
+    return _summarize_clusters(levels_sorted, np.asarray(starts, dtype=np.intp))
+
+
+def cluster_levels_batch(level_arrays, tolerance=0.02):
+    """
+    여러 레벨 배열을 한 번에 클러스터링
+
+    모든 배열을 이어 붙인 뒤 배열마다 '다음 후보' 위치를 하나씩 두고 모든 배열을
+    동시에 한 칸씩 진행합니다. 반복 횟수는 가장 긴 배열의 길이이며, 각 반복은
+    배열 개수만큼의 벡터 연산입니다. 결과는 배열마다 cluster_levels()와 같습니다.
+
+    Parameters:
+    -----------
+    level_arrays : list of array
+        가격 레벨 배열 목록 (예: 종목별 피봇, 또는 같은 피봇을 허용 오차별로 반복)
+    tolerance : float or sequence
+        클러스터링 허용 오차, 배열마다 다르게 주려면 같은 길이의 시퀀스
+
+    Returns:
+    --------
+    list : 배열별 cluster_levels() 결과 리스트
+    """
+    arrays = [np.sort(np.asarray(levels, dtype=np.float64)) for levels in level_arrays]
+    n_arrays = len(arrays)
+    if n_arrays == 0:
+        return []
+
+    tolerances = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), (n_arrays,))
+    if n_arrays == 1:
+        return [cluster_levels(arrays[0], tolerances[0])]
+
+    flat, starts, offsets = _cluster_starts_batch(arrays, tolerances)
+    results = []
+    bounds = np.searchsorted(starts, np.append(offsets, len(flat)))
+    for i in range(n_arrays):
+        seg_starts = starts[bounds[i]:bounds[i + 1]] - offsets[i]
+        results.append(_summarize_clusters(arrays[i], seg_starts))
+    return results
+
+
+def _cluster_starts_batch(arrays, tolerances):
+    """
+    정렬된 레벨 배열들을 이어 붙이고 lockstep으로 클러스터 시작 위치 계산
+
+    Returns:
+    --------
+    tuple : (이어 붙인 레벨, 클러스터 시작 인덱스, 배열별 시작 오프셋)
+    """
+    lengths = np.array([len(a) for a in arrays], dtype=np.intp)
+    flat = np.concatenate(arrays)
+    starts, offsets = _cluster_starts_flat(flat, lengths, tolerances)
+    return flat, starts, offsets
+
+
+def _cluster_starts_flat(flat, lengths, tolerances):
+    """
+    배열별로 정렬된 레벨을 이어 붙인 flat에서 lockstep으로 클러스터 시작 위치 계산
+
+    Parameters:
+    -----------
+    flat : ndarray
+        배열별 정렬된 레벨을 이어 붙인 배열
+    lengths : ndarray
+        배열별 길이 (0 가능)
+    tolerances : ndarray
+        배열별 허용 오차
+
+    Returns:
+    --------
+    tuple : (클러스터 시작 인덱스, 배열별 시작 오프셋)
+    """
+    ends = np.cumsum(lengths)
+    offsets = ends - lengths
+
+    is_start = np.zeros(len(flat), dtype=bool)
+    nonempty = np.flatnonzero(lengths > 0)
+    is_start[offsets[nonempty]] = True
+
+    # 배열별 상태: 다음 후보 위치, 현재 클러스터 시작 위치/누적합/개수
+    pos = offsets[nonempty] + 1
+    seg_end = ends[nonempty]
+    seg_tol = tolerances[nonempty]
+    cluster_start = offsets[nonempty].copy()
+    running_sum = flat[offsets[nonempty]].copy()
+    count = np.ones(len(nonempty))
+
+    active = np.flatnonzero(pos < seg_end)
+    while len(active):
+        p = pos[active]
+        x = flat[p]
+        tol = seg_tol[active]
+        mean = running_sum[active] / count[active]
+        ratio = np.abs(x - mean) / mean
+        joined = ratio <= tol
+        # 허용 오차 경계에 걸친 후보만 np.mean()으로 다시 판정 (_cluster_end()와 같음)
+        for k in np.flatnonzero(_near_tolerance(ratio, tol, count[active])):
+            joined[k] = _joins_exact(flat, cluster_start[active[k]], p[k], tol[k])
+
+        running_sum[active] = np.where(joined, running_sum[active] + x, x)
+        count[active] = np.where(joined, count[active] + 1, 1)
+        cluster_start[active[~joined]] = p[~joined]
+        is_start[p[~joined]] = True
+
+        pos[active] += 1
+        active = active[pos[active] < seg_end[active]]
+
+    return np.flatnonzero(is_start), offsets
+
+
+def top_clusters_flat(flat, starts, offsets, max_levels):
+    """
+    _cluster_starts_batch() 결과에서 배열별 상위 max_levels개 클러스터를 한 번에 선택
+
+    배열마다 _summarize_clusters()와 같은 순서(빈도수 내림차순, 같으면 가격 오름차순)로
+    자른 결과를 평탄한 배열로 돌려줍니다.
+
+    Returns:
+    --------
+    tuple : (배열 번호, 평균 레벨, 빈도수) 배열
+    """
+    if len(starts) == 0:
+        empty = np.array([], dtype=np.intp)
+        return empty, np.array([], dtype=np.float64), empty
+    counts = np.diff(np.append(starts, len(flat)))
+    means = np.add.reduceat(flat, starts) / counts
+    owner = np.searchsorted(offsets, starts, side='right') - 1
+
+    order = np.lexsort((means, -counts, owner))
+    owner, means, counts = owner[order], means[order], counts[order]
+    first = np.searchsorted(owner, owner)
+    keep = np.arange(len(owner)) - first < max_levels
+    # 선택한 클러스터만 np.mean()과 같은 값으로 다시 계산 (_cluster_means())
+    return owner[keep], _cluster_means(flat, starts[order[keep]], counts[keep], means[keep]), counts[keep]
+
+
+# 피봇 탐지 엔진
+PIVOT_ENGINES = ('argrelextrema', 'window')
+
+
+def sliding_pivot_indices(values, order):
+    """
+    슬라이딩 윈도우 최소/최대 기반 피봇 탐지
+
+    scipy.ndimage의 1차원 최소/최대 필터(단조 덱 알고리즘, O(n))로 [i-order, i+order]
+    구간의 최소/최대를 구한 뒤 자기 자신과 같은 위치를 피봇으로 선택합니다.
+    경계는 가장자리 값으로 확장하므로 argrelextrema(mode='clip')와 결과가 같고,
+    같은 값이 이어지는 구간(plateau)도 모두 피봇으로 잡습니다.
+
+    Parameters:
+    -----------
+    values : array
+        가격 배열
+    order : int
+        양쪽으로 비교할 데이터 개수
+
+    Returns:
+    --------
+    tuple : (로컬 최소값 인덱스, 로컬 최대값 인덱스)
+    """
+    from scipy.ndimage import minimum_filter1d, maximum_filter1d
+
+    if int(order) != order or order < 1:
+        raise ValueError('Order must be an int >= 1')
+
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    n = len(values)
+    if n == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    size = 2 * order + 1
+    nan_mask = np.isnan(values)
+    has_nan = nan_mask.any()
+    if has_nan:
+        win_min = minimum_filter1d(np.where(nan_mask, np.inf, values), size, mode='nearest')
+        win_max = maximum_filter1d(np.where(nan_mask, -np.inf, values), size, mode='nearest')
+    else:
+        win_min = minimum_filter1d(values, size, mode='nearest')
+        win_max = maximum_filter1d(values, size, mode='nearest')
+
+    is_min = values == win_min
+    is_max = values == win_max
+
+    if has_nan:
+        # argrelextrema와 같이 윈도우에 NaN이 있으면 피봇이 아님
+        nan_count = np.concatenate(([0], np.cumsum(nan_mask)))
+        idx = np.arange(n)
+        window_nan = nan_count[np.minimum(idx + order + 1, n)] - nan_count[np.maximum(idx - order, 0)]
+        is_min &= window_nan == 0
+        is_max &= window_nan == 0
+
+    return np.flatnonzero(is_min), np.flatnonzero(is_max)
+
+
+def find_pivot_indices(values, order=5, engine='argrelextrema'):
+    """
+    피봇 포인트 인덱스 찾기
+
+    Parameters:
+    -----------
+    values : array
+        가격 배열
+    order : int
+        피봇을 찾을 때 비교할 주변 데이터 개수
+    engine : str
+        'argrelextrema' (scipy.signal, O(n·order)) 또는
+        'window' (슬라이딩 윈도우 최소/최대, O(n)) - 결과는 동일
+
+    Returns:
+    --------
+    tuple : (로컬 최소값 인덱스, 로컬 최대값 인덱스)
+    """
+    if engine == 'window':
+        return sliding_pivot_indices(values, order)
+    if engine != 'argrelextrema':
+        raise ValueError(f"지원하지 않는 피봇 엔진입니다: {engine} ({', '.join(PIVOT_ENGINES)})")
+
+    from scipy.signal import argrelextrema
+
+    values = np.asarray(values)
+    local_min_idx = argrelextrema(values, np.less_equal, order=order)[0]
+    local_max_idx = argrelextrema(values, np.greater_equal, order=order)[0]
+    return local_min_idx, local_max_idx
+
+
+# 피봇 탐지 시 한 번에 처리할 최대 봉 개수 (메모리 사용량 상한)
+PIVOT_CHUNK_SIZE = 1_000_000
+
+
+def find_pivot_indices_chunked(values, order=5, engine='argrelextrema', chunk_size=PIVOT_CHUNK_SIZE):
+    """
+    긴 배열의 피봇을 겹치는 구간(chunk)으로 나누어 찾기
+
+    각 구간을 양쪽으로 order개씩 겹쳐 계산하므로 구간 경계의 피봇도
+    find_pivot_indices()와 같고, 임시 메모리는 chunk_size에 비례합니다.
+
+    Parameters:
+    -----------
+    values : array
+        가격 배열
+    order : int
+        피봇을 찾을 때 비교할 주변 데이터 개수
+    engine : str
+        피봇 탐지 엔진 ('argrelextrema' 또는 'window')
+    chunk_size : int
+        구간 크기 (봉 개수)
+
+    Returns:
+    --------
+    tuple : (로컬 최소값 인덱스, 로컬 최대값 인덱스)
+    """
+    n = len(values)
+    if n <= chunk_size:
+        return find_pivot_indices(values, order=order, engine=engine)
+
+    mins, maxs = [], []
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        lo = max(start - order, 0)
+        hi = min(stop + order, n)
+        chunk_min, chunk_max = find_pivot_indices(values[lo:hi], order=order, engine=engine)
+        chunk_min += lo
+        chunk_max += lo
+        mins.append(chunk_min[(chunk_min >= start) & (chunk_min < stop)])
+        maxs.append(chunk_max[(chunk_max >= start) & (chunk_max < stop)])
+    return np.concatenate(mins), np.concatenate(maxs)
+
+
+# 패널 분석 (여러 종목을 (종목 수, 봉 수) 2차원 배열로 한 번에)
+def pack_panel(close):
+    """
+    행마다 유효한(NaN이 아닌) 값을 왼쪽으로 모으고 나머지 칸을 마지막 유효 값으로 채우기
+
+    상장 전/거래 정지/상장 폐지로 비어 있는 날을 빼고 종목별 시리즈를 이어 붙인 것과 같습니다.
+    마지막 값으로 채운 칸은 필터의 mode='nearest' 경계와 같으므로 피봇 판정에 영향을 주지 않습니다.
+
+    Parameters:
+    -----------
+    close : ndarray
+        (종목 수, 봉 수) 가격 행렬
+
+    Returns:
+    --------
+    tuple : (채운 행렬, 행별 유효 봉 수, 원래 열 번호 행렬 또는 None(NaN이 없을 때))
+    """
+    close = np.asarray(close, dtype=np.float64)
+    valid = ~np.isnan(close)
+    counts = valid.sum(axis=1)
+    if counts.sum() == close.size:
+        return close, counts, None
+
+    columns = np.argsort(~valid, axis=1, kind='stable')
+    packed = np.take_along_axis(close, columns, axis=1)
+    last = packed[np.arange(len(counts)), np.maximum(counts - 1, 0)]
+    packed = np.where(np.arange(close.shape[1]) < counts[:, None], packed, last[:, None])
+    return packed, counts, columns
+
+
+def panel_pivot_masks(close, order=5, chunk_size=PIVOT_CHUNK_SIZE):
+    """
+    (종목 수, 봉 수) 가격 행렬의 피봇 마스크를 모든 종목에 대해 한 번에 계산
+
+    pack_panel()로 행마다 빈 날을 뺀 뒤 scipy.ndimage 최소/최대 필터를 axis=1로 적용합니다.
+    각 행의 결과는 그 종목의 NaN을 뺀 시리즈로 find_pivot_indices()를 실행한 것과 같습니다.
+
+    Parameters:
+    -----------
+    close : ndarray
+        (종목 수, 봉 수) 가격 행렬, 빈 날은 NaN
+    order : int
+        피봇을 찾을 때 비교할 주변 데이터 개수
+    chunk_size : int
+        한 번에 처리할 최대 원소 수 (행 단위로 나눔, 메모리 사용량 상한)
+
+    Returns:
+    --------
+    tuple : (로컬 최소 마스크, 로컬 최대 마스크), 원래 행렬과 같은 모양 (NaN 칸은 False)
+    """
+    from scipy.ndimage import minimum_filter1d, maximum_filter1d
+
+    if int(order) != order or order < 1:
+        raise ValueError('Order must be an int >= 1')
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim != 2:
+        raise ValueError(f"(종목 수, 봉 수) 2차원 배열이어야 합니다: {close.shape}")
+
+    n_symbols, n_bars = close.shape
+    is_min = np.zeros(close.shape, dtype=bool)
+    is_max = np.zeros(close.shape, dtype=bool)
+    if close.size == 0:
+        return is_min, is_max
+
+    size = 2 * order + 1
+    rows = max(1, chunk_size // n_bars)
+    for start in range(0, n_symbols, rows):
+        stop = min(start + rows, n_symbols)
+        packed, counts, columns = pack_panel(close[start:stop])
+        valid = np.arange(n_bars) < counts[:, None]
+        mins = (packed == minimum_filter1d(packed, size, axis=1, mode='nearest')) & valid
+        maxs = (packed == maximum_filter1d(packed, size, axis=1, mode='nearest')) & valid
+        if columns is None:
+            is_min[start:stop] = mins
+            is_max[start:stop] = maxs
+        else:
+            np.put_along_axis(is_min[start:stop], columns, mins, axis=1)
+            np.put_along_axis(is_max[start:stop], columns, maxs, axis=1)
+    return is_min, is_max
+
+
+def panel_levels(close, order=5, tolerance=0.02, max_levels=5, chunk_size=PIVOT_CHUNK_SIZE):
+    """
+    (종목 수, 봉 수) 가격 행렬의 종목별 지지/저항선을 한 번에 계산
+
+    panel_pivot_masks()로 피봇을 찾고, 모든 종목의 지지/저항 후보를 (종목, 가격) 순으로 정렬해
+    이어 붙인 뒤 cluster_levels_batch()와 같은 lockstep 클러스터링을 한 번 실행합니다.
+    종목마다 Python 호출이 없으며, 각 행의 결과는 NaN을 뺀 시리즈로 analyze()를 실행한 것과 같습니다.
+
+    Parameters:
+    -----------
+    close : ndarray
+        (종목 수, 봉 수) 가격 행렬, 빈 날은 NaN
+    order, tolerance, max_levels :
+        analyze() 파라미터 (tolerance는 행별 배열도 가능)
+    chunk_size : int
+        panel_pivot_masks() 참고
+
+    Returns:
+    --------
+    dict : 'current_price' (행별 마지막 유효 가격, 없으면 NaN), 'bars' (행별 유효 봉 수),
+           'support', 'resistance' (행 번호, 순위, 레벨, 빈도수) 배열 튜플 - 행 번호, 순위 순
+    """
+    close = np.asarray(close, dtype=np.float64)
+    is_min, is_max = panel_pivot_masks(close, order, chunk_size)
+    n_symbols, n_bars = close.shape
+
+    valid = ~np.isnan(close)
+    bars = valid.sum(axis=1)
+    last = n_bars - 1 - np.argmax(valid[:, ::-1], axis=1) if n_bars else np.zeros(n_symbols, dtype=np.intp)
+    current_price = np.where(bars > 0, close[np.arange(n_symbols), last] if n_bars else np.nan, np.nan)
+
+    # 지지선 후보는 세그먼트 0..n-1, 저항선 후보는 n..2n-1
+    min_rows, min_cols = np.nonzero(is_min)
+    max_rows, max_cols = np.nonzero(is_max)
+    owner = np.concatenate((min_rows, max_rows + n_symbols))
+    values = np.concatenate((close[min_rows, min_cols], close[max_rows, max_cols]))
+    order_ = np.lexsort((values, owner))
+    flat = values[order_]
+    lengths = np.bincount(owner, minlength=2 * n_symbols)
+    tolerances = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), (n_symbols,))
+
+    with METRICS.stage('cluster_levels'):
+        starts, offsets = _cluster_starts_flat(flat, lengths, np.concatenate((tolerances, tolerances)))
+        segment, means, counts = top_clusters_flat(flat, starts, offsets, max_levels)
+    rank = np.arange(len(segment)) - np.searchsorted(segment, segment) + 1
+    support = segment < n_symbols
+    resistance = ~support
+    return {
+        'current_price': current_price,
+        'bars': bars,
+        'support': (segment[support], rank[support], means[support], counts[support]),
+        'resistance': (segment[resistance] - n_symbols, rank[resistance], means[resistance], counts[resistance]),
+    }
+
+
+def panel_table(panel, symbols):
+    """
+    panel_levels() 결과를 레벨별 행 테이블로 변환 (level_rows()와 같은 컬럼, 종목별 저항선 -> 지지선 순)
+
+    Returns:
+    --------
+    DataFrame : symbol, bars, current_price, kind, rank, level, count, distance_pct
+    """
+    import pandas as pd
+
+    symbols = np.asarray(symbols, dtype=object)
+    parts = []
+    for kind in ('resistance', 'support'):
+        row, rank, level, count = panel[kind]
+        parts.append(pd.DataFrame({'row': row, 'kind': kind, 'rank': rank, 'level': level, 'count': count}))
+    table = pd.concat(parts, ignore_index=True).sort_values(['row', 'kind', 'rank'], kind='stable')
+    row = table.pop('row').to_numpy()
+    price = panel['current_price'][row]
+    table.insert(0, 'symbol', symbols[row])
+    table.insert(1, 'bars', panel['bars'][row])
+    table.insert(2, 'current_price', price)
+    table['distance_pct'] = (table['level'].to_numpy() - price) / price * 100
+    return table.reset_index(drop=True)
+
+
+# 레벨 탐지 방법 (pivot: 피봇 클러스터링, volume: 가격대별 거래량)
+LEVEL_METHODS = ('pivot', 'volume')
+# 볼륨 프로파일 가격 구간 수
+VOLUME_PROFILE_BINS = 200
+
+
+def volume_profile(high, low, volume, bins=VOLUME_PROFILE_BINS, price_range=None):
+    """
+    가격대별 거래량 분포 (볼륨 프로파일)
+
+    각 봉의 거래량을 저가~고가 구간에 고르게 나누어 가격 구간에 더합니다.
+    구간 단위 좌표에서 봉 i의 거래량 밀도를 d_i, 범위를 [a_i, b_i]라 하면 누적 거래량은
+    G(x) = Σ d_i·((x - a_i)+ - (x - b_i)+) 이고, 정수 경계에서의 값은 a_i, b_i 위치별
+    bincount와 누적합으로 구해집니다. 봉마다의 반복 없이 O(봉 수 + 구간 수)입니다.
+    고가와 저가가 같은 봉은 해당 구간에 거래량을 모두 더합니다.
+
+    Parameters:
+    -----------
+    high, low, volume : array
+        봉별 고가, 저가, 거래량 (NaN이 있는 봉은 제외)
+    bins : int
+        가격 구간 수
+    price_range : tuple, optional
+        (최저가, 최고가) (기본값: 저가 최솟값 ~ 고가 최댓값)
+
+    Returns:
+    --------
+    tuple : (구간 경계 (bins + 1), 구간별 거래량 (bins), 구간별 거래된 봉 수 (bins))
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    valid = ~(np.isnan(high) | np.isnan(low) | np.isnan(volume))
+    if not valid.all():
+        high, low, volume = high[valid], low[valid], volume[valid]
+    low, high = np.minimum(low, high), np.maximum(low, high)
+    if len(high) == 0:
+        raise ValueError("볼륨 프로파일을 계산할 데이터가 없습니다")
+
+    lo, hi = price_range if price_range is not None else (low.min(), high.max())
+    if hi <= lo:
+        hi = lo * (1 + 1e-9) + 1e-9
+    edges = np.linspace(lo, hi, bins + 1)
+    scale = bins / (hi - lo)
+    a = np.clip((low - lo) * scale, 0, bins)
+    b = np.clip((high - lo) * scale, 0, bins)
+
+    flat = b - a < 1e-12
+    ranged = ~flat
+    density = volume[ranged] / (b[ranged] - a[ranged])
+    grid = np.arange(bins + 1)
+
+    def ramp(pos, weight):
+        # Σ weight·(x - pos)+ (x = 0..bins)
+        idx = np.floor(pos).astype(np.intp)
+        below = np.bincount(idx, weights=weight, minlength=bins + 1)[:bins + 1]
+        moment = np.bincount(idx, weights=weight * pos, minlength=bins + 1)[:bins + 1]
+        below = np.concatenate(([0.0], np.cumsum(below)[:-1]))
+        moment = np.concatenate(([0.0], np.cumsum(moment)[:-1]))
+        return grid * below - moment
+
+    cumulative = ramp(a[ranged], density) - ramp(b[ranged], density)
+    hist = np.maximum(np.diff(cumulative), 0.0)
+    if flat.any():
+        hist += np.bincount(np.minimum(a[flat].astype(np.intp), bins - 1), weights=volume[flat],
+                            minlength=bins)
+
+    first = np.minimum(a.astype(np.intp), bins - 1)
+    last = np.minimum(b.astype(np.intp), bins - 1)
+    touches = np.cumsum(np.bincount(first, minlength=bins + 1) - np.bincount(last + 1, minlength=bins + 1))
+    return edges, hist, touches[:bins]
+
+
+def volume_levels(high, low, volume, current_price, tolerance=0.02, max_levels=5,
+                  bins=VOLUME_PROFILE_BINS):
+    """
+    볼륨 프로파일의 고거래량 구간(노드)을 지지/저항선으로 선택
+
+    현재가 기준 ±tolerance 폭 안에서 거래량이 가장 많고 평균 이상인 구간을 노드로 고른 뒤,
+    현재가 아래 노드는 지지선, 위 노드는 저항선으로 나눕니다.
+
+    Parameters:
+    -----------
+    high, low, volume : array
+        봉별 고가, 저가, 거래량
+    current_price : float
+        현재가
+    tolerance : float
+        노드 사이 최소 간격 (현재가 대비 비율)
+    max_levels : int
+        최대 지지/저항선 개수
+    bins : int
+        가격 구간 수
+
+    Returns:
+    --------
+    tuple : (지지선, 저항선), 각각 (구간 중앙 가격, 거래된 봉 수, 거래량 비중 %) 리스트,
+            거래량 내림차순
+    """
+    from scipy.ndimage import maximum_filter1d
+
+    with METRICS.stage('volume_profile'):
+        edges, hist, touches = volume_profile(high, low, volume, bins=bins)
+    total = hist.sum()
+    if total <= 0:
+        raise ValueError("거래량 데이터가 없어 볼륨 프로파일을 계산할 수 없습니다")
+
+    width = edges[1] - edges[0]
+    radius = max(1, int(round(tolerance * current_price / width)))
+    peaks = np.flatnonzero((hist == maximum_filter1d(hist, 2 * radius + 1, mode='constant'))
+                           & (hist >= hist.mean()) & (hist > 0))
+    # 거래량 내림차순 (같으면 가격 오름차순), 같은 값이 이어진 구간은 첫 구간만
+    peaks = peaks[np.argsort(-hist[peaks], kind='stable')]
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    support, resistance = [], []
+    taken = []
+    for peak in peaks:
+        if len(support) >= max_levels and len(resistance) >= max_levels:
+            break
+        if any(abs(peak - other) <= radius for other in taken):
+            continue
+        taken.append(peak)
+        node = (float(centers[peak]), int(touches[peak]), float(hist[peak] / total * 100))
+        side = support if centers[peak] < current_price else resistance
+        if len(side) < max_levels:
+            side.append(node)
+    METRICS.count('clusters', len(support) + len(resistance))
+    return support, resistance
+
+
+# 분봉 간격별 한 번에 요청할 수 있는 최대 기간 (일, Yahoo Finance 제한)
+INTRADAY_MAX_DAYS = {
+    '1m': 7, '2m': 60, '5m': 60, '15m': 60, '30m': 60, '60m': 730, '90m': 60, '1h': 730,
+}
+INTERVALS = ('1d', '1h', '60m', '90m', '30m', '15m', '5m', '2m', '1m')
+# 분봉 모드에서 유지하는 컬럼
+COMPACT_COLUMNS = ('Close', 'High', 'Low', 'Volume')
+
+
+def compact_ohlcv(df):
+    """
+    분석에 필요한 컬럼(Close/High/Low/Volume)만 float32로 남긴 데이터
+
+    봉 하나에 16바이트로, 수년치 분봉(수백만 행)도 메모리에 올릴 수 있습니다.
+    """
+    columns = [column for column in COMPACT_COLUMNS if column in df.columns]
+    return df[columns].astype(np.float32)
+
+
+def history_windows(start_date, end_date, interval):
+    """
+    요청 기간을 간격별 최대 요청 기간 이하의 구간으로 나누기
+
+    Returns:
+    --------
+    list : (시작일, 종료일) 튜플 리스트
+    """
+    import pandas as pd
+
+    max_days = INTRADAY_MAX_DAYS.get(interval)
+    if max_days is None:
+        return [(start_date, end_date)]
+
+    windows = []
+    current = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    while current < end:
+        window_end = min(current + pd.Timedelta(days=max_days), end)
+        windows.append((current.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+        current = window_end
+    return windows
+
+
+# 다중 시간 프레임 분석용 봉 길이 (분)
+TIMEFRAME_MINUTES = {
+    '1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60,
+    '1d': 1440, '1wk': 7 * 1440, '1mo': 30 * 1440,
+}
+# resample_ohlcv()로 만들 수 있는 시간 프레임
+RESAMPLE_TIMEFRAMES = ('1h', '1d', '1wk', '1mo')
+MTF_TIMEFRAMES = ('1d', '1wk', '1mo')
+# 긴 시간 프레임은 봉 수가 적으므로 작은 order 사용 (기본 시간 프레임은 analyze()의 order)
+MTF_ORDERS = {'1wk': 3, '1mo': 2}
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    주가 데이터를 더 긴 봉으로 변환 (네트워크 요청 없이)
+
+    현지 시각 기준으로 시간/일/주(월요일 시작)/월 구간을 정하고, 구간마다
+    Open은 첫 값, High는 최댓값, Low는 최솟값, Close는 마지막 값, Volume은 합계로 계산합니다.
+    구간 경계를 한 번에 구해 reduceat으로 집계하므로 pandas 버전별 resample 규칙에 의존하지 않습니다.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        시간 순으로 정렬된 주가 데이터 (Open/High/Low/Close/Volume 중 있는 컬럼만 사용)
+    timeframe : str
+        '1h', '1d', '1wk', '1mo'
+
+    Returns:
+    --------
+    DataFrame : 구간별 봉 (인덱스는 구간의 마지막 봉 시각)
+    """
+    import pandas as pd
+
+    times = _naive_index(df.index).values
+    if timeframe == '1h':
+        keys = times.astype('datetime64[h]').astype(np.int64)
+    elif timeframe == '1d':
+        keys = times.astype('datetime64[D]').astype(np.int64)
+    elif timeframe == '1wk':
+        # 1970-01-05가 월요일
+        keys = (times.astype('datetime64[D]').astype(np.int64) - 4) // 7
+    elif timeframe == '1mo':
+        keys = times.astype('datetime64[M]').astype(np.int64)
+    else:
+        raise ValueError(f"지원하지 않는 시간 프레임입니다: {timeframe} ({', '.join(RESAMPLE_TIMEFRAMES)})")
+
+    if len(keys) == 0:
+        return df.iloc[:0]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    columns = {}
+    for column in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        if column not in df.columns:
+            continue
+        values = df[column].to_numpy()
+        if column == 'Open':
+            columns[column] = values[starts]
+        elif column == 'High':
+            columns[column] = np.maximum.reduceat(values, starts)
+        elif column == 'Low':
+            columns[column] = np.minimum.reduceat(values, starts)
+        elif column == 'Volume':
+            columns[column] = np.add.reduceat(values, starts)
+        else:
+            columns[column] = values[ends]
+    return pd.DataFrame(columns, index=df.index[ends])
+
+
+def confluence_levels(levels, tolerance, current_price, min_timeframes=2):
+    """
+    여러 시간 프레임의 레벨이 tolerance 이내로 겹치는 구간 찾기
+
+    모든 레벨을 가격순으로 정렬해 cluster_levels()와 같은 기준(구간 평균과의 차이)으로
+    묶고, 서로 다른 시간 프레임이 min_timeframes개 이상 모인 구간만 남깁니다.
+
+    Parameters:
+    -----------
+    levels : list
+        (레벨, 터치 수, 시간 프레임) 튜플 리스트
+    tolerance : float
+        허용 오차 (2% = 0.02)
+    current_price : float
+        현재가 (레벨이 현재가 아래면 지지, 위면 저항)
+    min_timeframes : int
+        최소 시간 프레임 수
+
+    Returns:
+    --------
+    list : level(터치 수 가중 평균), kind, timeframes, touches, distance_pct dict 리스트,
+           시간 프레임 수 → 터치 수 내림차순
+    """
+    if not levels:
+        return []
+    order = np.argsort([level for level, _, _ in levels], kind='stable')
+    items = [levels[i] for i in order]
+    prices = np.array([level for level, _, _ in items], dtype=np.float64)
+
+    zones = []
+    start = 0
+    while start < len(prices):
+        end = _cluster_end(prices, start, tolerance)
+        group = items[start:end]
+        timeframes = list(dict.fromkeys(timeframe for _, _, timeframe in group))
+        if len(timeframes) >= min_timeframes:
+            touches = sum(count for _, count, _ in group)
+            level = sum(price * count for price, count, _ in group) / touches
+            zones.append({
+                'level': float(level),
+                'kind': 'support' if level < current_price else 'resistance',
+                'timeframes': timeframes,
+                'touches': int(touches),
+                'distance_pct': (float(level) - current_price) / current_price * 100,
+            })
+        start = end
+
+    zones.sort(key=lambda zone: (-len(zone['timeframes']), -zone['touches'], abs(zone['distance_pct'])))
+    return zones
+
+
+def sweep_pivot_indices(values, orders):
+    """
+    여러 order의 피봇을 한 번에 찾기
+
+    order가 k인 윈도우 최소/최대는 order가 k-d인 결과 두 개(±d 이동)의 최소/최대로
+    구할 수 있으므로(d <= k-d), 작은 order의 결과에서 큰 order를 이어서 계산합니다.
+    또한 큰 order의 피봇은 항상 작은 order 피봇의 부분집합이므로, 이전 order의
+    피봇만 후보로 검사합니다. 결과는 order마다 find_pivot_indices()와 같습니다.
+
+    Parameters:
+    -----------
+    values : array
+        가격 배열
+    orders : list of int
+        피봇 order 목록
+
+    Returns:
+    --------
+    dict : {order: (로컬 최소값 인덱스, 로컬 최대값 인덱스)}
+    """
+    from scipy.ndimage import minimum_filter1d, maximum_filter1d
+
+    orders = sorted({int(order) for order in orders})
+    if not orders or orders[0] < 1:
+        raise ValueError('Order must be an int >= 1')
+
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    n = len(values)
+    if n == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return {order: (empty, empty) for order in orders}
+
+    # 가장자리 값으로 패딩하면 잘린(clip) 윈도우와 같은 최소/최대
+    pad = orders[-1]
+    nan_mask = np.isnan(values)
+    low_src = np.pad(np.where(nan_mask, np.inf, values), pad, mode='edge')
+    high_src = np.pad(np.where(nan_mask, -np.inf, values), pad, mode='edge')
+    nan_count = np.concatenate(([0], np.cumsum(nan_mask)))
+
+    def select(cand, window, order):
+        """후보 중 윈도우 최소/최대와 같고 윈도우에 NaN이 없는 위치"""
+        if not len(cand):
+            return cand
+        ok = values[cand] == window[cand + pad]
+        window_nan = (nan_count[np.minimum(cand + order + 1, n)]
+                      - nan_count[np.maximum(cand - order, 0)])
+        return cand[ok & (window_nan == 0)]
+
+    result = {}
+    prev = None
+    cand_min = cand_max = np.arange(n)
+    for order in orders:
+        if prev is not None and order - prev[0] <= prev[0]:
+            d = order - prev[0]
+            win_min, win_max = prev[1].copy(), prev[2].copy()
+            win_min[d:-d] = np.minimum(prev[1][:-2 * d], prev[1][2 * d:])
+            win_max[d:-d] = np.maximum(prev[2][:-2 * d], prev[2][2 * d:])
+        else:
+            size = 2 * order + 1
+            win_min = minimum_filter1d(low_src, size, mode='nearest')
+            win_max = maximum_filter1d(high_src, size, mode='nearest')
+        prev = (order, win_min, win_max)
+
+        cand_min = select(cand_min, win_min, order)
+        cand_max = select(cand_max, win_max, order)
+        result[order] = (cand_min, cand_max)
+
+    return result
+
+
+def window_pivot_indices(values, pivots, start, stop, order, engine='argrelextrema'):
+    """
+    전체 데이터에서 구한 피봇으로 [start, stop) 구간만 분석했을 때의 피봇 구하기
+
+    구간 안쪽(양끝에서 order개 이상 떨어진 위치)의 피봇 여부는 전체 데이터 기준과
+    같으므로 그대로 쓰고, 양끝 order개 위치만 다시 판정합니다.
+    결과는 find_pivot_indices(values[start:stop])에 start를 더한 것과 같습니다.
+
+    Parameters:
+    -----------
+    values : array
+        전체 가격 배열
+    pivots : tuple
+        전체 배열의 (로컬 최소값 인덱스, 로컬 최대값 인덱스)
+    start, stop : int
+        구간
+    order : int
+        피봇 order
+    engine : str
+        양끝 재판정에 쓸 피봇 탐지 엔진
+
+    Returns:
+    --------
+    tuple : (로컬 최소값 인덱스, 로컬 최대값 인덱스) (전체 배열 기준)
+    """
+    if stop - start < 4 * order:
+        local_min, local_max = find_pivot_indices(values[start:stop], order=order, engine=engine)
+        return local_min + start, local_max + start
+
+    left = find_pivot_indices(values[start:start + 2 * order], order=order, engine=engine)
+    right_base = stop - 2 * order
+    right = find_pivot_indices(values[right_base:stop], order=order, engine=engine)
+
+    result = []
+    for side, global_idx in enumerate(pivots):
+        lo, hi = np.searchsorted(global_idx, (start + order, stop - order))
+        result.append(np.concatenate((
+            left[side][left[side] < order] + start,
+            global_idx[lo:hi],
+            right[side][right[side] >= order] + right_base,
+        )))
+    return tuple(result)
+
+
+class _LevelClusterState:
+    """
+    증분 갱신이 가능한 레벨 클러스터 상태
+
+    정렬된 레벨 배열과 클러스터 시작 인덱스를 보관합니다. 레벨이 추가/삭제되면
+    바뀐 위치를 포함하는 클러스터부터 다시 묶다가, 이후 구간이 기존 클러스터
+    경계와 다시 맞아떨어지는 지점에서 나머지를 그대로 재사용합니다.
+    결과는 같은 레벨로 cluster_levels()를 호출한 것과 같습니다.
+    """
+
+    def __init__(self, levels, tolerance):
+        self.tolerance = tolerance
+        self.levels = np.sort(np.asarray(levels, dtype=np.float64))
+        self.starts = self._recluster(0, len(self.levels), np.empty(0, dtype=np.intp))
+
+    def _recluster(self, start, resync_from, old_starts):
+        """start부터 다시 묶되, resync_from 이후 기존 시작점(old_starts)과 만나면 재사용"""
+        starts = []
+        n = len(self.levels)
+        while start < n:
+            if start >= resync_from:
+                k = np.searchsorted(old_starts, start)
+                if k < len(old_starts) and old_starts[k] == start:
+                    return np.concatenate((np.asarray(starts, dtype=np.intp), old_starts[k:]))
+            starts.append(start)
+            start = _cluster_end(self.levels, start, self.tolerance)
+        return np.asarray(starts, dtype=np.intp)
+
+    def update(self, removed=(), added=()):
+        """
+        레벨 삭제/추가 후 영향받는 클러스터만 갱신
+
+        Parameters:
+        -----------
+        removed : array
+            삭제할 레벨 값 (현재 상태에 있어야 함, 같은 값은 하나씩 삭제)
+        added : array
+            추가할 레벨 값
+        """
+        removed = np.sort(np.asarray(removed, dtype=np.float64))
+        added = np.sort(np.asarray(added, dtype=np.float64))
+        if len(removed) == 0 and len(added) == 0:
+            return
+
+        old = self.levels
+        n_old = len(old)
+        first_changed = n_old
+        resync_from = 0
+
+        # 삭제: 같은 값이 여러 번 삭제되면 같은 값 구간 안에서 앞에서부터 하나씩
+        keep = np.ones(n_old, dtype=bool)
+        if len(removed):
+            rank = np.arange(len(removed)) - np.searchsorted(removed, removed, side='left')
+            rem_pos = np.searchsorted(old, removed, side='left') + rank
+            if np.any(rem_pos >= n_old) or np.any(old[np.minimum(rem_pos, n_old - 1)] != removed):
+                raise ValueError("삭제할 레벨이 클러스터 상태에 없습니다.")
+            keep[rem_pos] = False
+            first_changed = int(rem_pos[0])
+        mid = old[keep]
+
+        # 추가: np.insert 위치 (mid 기준)
+        ins = np.searchsorted(mid, added, side='right')
+        if len(added):
+            first_changed = min(first_changed, int(ins[0]))
+            # 마지막으로 추가된 값 다음부터는 기존 원소
+            resync_from = int(ins[-1]) + len(added)
+        if len(removed):
+            # 마지막 삭제 위치의 다음 원소 (mid 기준 → 최종 인덱스)
+            succ = int(rem_pos[-1]) - len(removed) + 1
+            resync_from = max(resync_from, succ + int(np.searchsorted(ins, succ, side='right')))
+
+        self.levels = np.insert(mid, ins, added)
+
+        # 기존 클러스터 시작점을 새 인덱스로 변환 (삭제된 시작점은 제외)
+        old_starts = self.starts[keep[self.starts]]
+        mid_index = np.cumsum(keep) - 1
+        mid_starts = mid_index[old_starts]
+        mapped = mid_starts + np.searchsorted(ins, mid_starts, side='right')
+
+        # 바뀐 위치 바로 앞 원소가 속한 클러스터부터 다시 묶기
+        anchor = max(first_changed - 1, 0)
+        c = int(np.searchsorted(self.starts, anchor, side='right')) - 1
+        restart = int(self.starts[c]) if c >= 0 else 0
+        prefix = self.starts[:max(c, 0)]
+        tail = self._recluster(restart, resync_from, mapped[mapped >= restart])
+        self.starts = np.concatenate((prefix, tail)).astype(np.intp)
+
+    def result(self):
+        """cluster_levels()와 같은 형식의 (평균 레벨, 빈도수) 리스트"""
+        return _summarize_clusters(self.levels, self.starts)
+
+
+class SupportResistanceAnalyzer:
+    """지지선/저항선 분석 클래스"""
+
+    def __init__(self, ticker, start_date, end_date=None, ticker_name=None, currency=None,
+                 cache=None, interval='1d', provider=None):
+        """
+        초기화
+
+        Parameters:
+        -----------
+        ticker : str
+            종목 코드 (예: '005930.KS', 'AAPL')
+        start_date : str
+            시작 날짜 (YYYY-MM-DD)
+        end_date : str, optional
+            종료 날짜 (YYYY-MM-DD), 기본값은 오늘
+        ticker_name : str, optional
+            종목명 (예: '삼성전자', 'Apple Inc.')
+        currency : str, optional
+            통화 (예: 'KRW', 'USD')
+        cache : OHLCVCache or False, optional
+            주가 데이터 캐시 (기본값: 네트워크 소스면 기본 캐시 디렉토리 사용, False면 사용 안 함)
+        interval : str, optional
+            봉 간격 (기본값: '1d'), 분봉('1m', '5m', '1h' 등)은 기간을 나누어 받고
+            Close/High/Low/Volume만 float32로 보관
+        provider : DataProvider, optional
+            데이터 소스 (기본값: get_data_provider())
+        """
+        self.ticker = ticker
+        self.ticker_name = ticker_name or ticker
+        self.currency = currency or 'KRW'
+        self.start_date = start_date
+        self.end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        self.provider = provider or get_data_provider()
+        if cache is None:
+            # 로컬 재생 데이터는 캐시에 섞지 않음
+            cache = OHLCVCache() if self.provider.remote else False
+        self.cache = cache
+        self.interval = interval
+        self.df = None
+        self.support_levels = []
+        self.resistance_levels = []
+        self._stream = None
+        
+    def fetch_data(self):
+        """주가 데이터 가져오기 (캐시가 있으면 빠진 구간만 새로 수집)"""
+        import pandas as pd
+
+        interval_label = '' if self.interval == '1d' else f", {self.interval}"
+        print(f"데이터 수집 중: {self.ticker} ({self.start_date} ~ {self.end_date}{interval_label})")
+        provider = self.provider
+
+        def fetch(start, end):
+            if self.interval == '1d':
+                # 종목 확인 과정에서 받은 데이터가 있으면 재사용
+                verified = take_verified_history(self.ticker, start, end)
+                if verified is not None:
+                    return verified
+                return provider.history(self.ticker, start, end)
+
+            if not provider.remote:
+                return compact_ohlcv(provider.history(self.ticker, start, end, interval=self.interval))
+
+            # 분봉은 요청 기간 제한에 맞추어 나누어 받고 압축
+            frames = [compact_ohlcv(provider.history(self.ticker, window_start, window_end,
+                                                     interval=self.interval))
+                      for window_start, window_end in history_windows(start, end, self.interval)]
+            frames = [frame for frame in frames if not frame.empty]
+            if not frames:
+                return pd.DataFrame(columns=list(COMPACT_COLUMNS), dtype=np.float32)
+            merged = pd.concat(frames)
+            return merged[~merged.index.duplicated(keep='last')]
+
+        def counted_fetch(start, end):
+            df = fetch(start, end)
+            METRICS.count('rows_fetched', len(df))
+            METRICS.count('frame_bytes_fetched', int(df.memory_usage(deep=True).sum()))
+            return df
+
+        with METRICS.stage('fetch_data'):
+            if self.cache:
+                self.df = self.cache.fetch(self.ticker, self.start_date, self.end_date, counted_fetch,
+                                           interval=self.interval)
+            else:
+                self.df = counted_fetch(self.start_date, self.end_date)
+        if self.df.empty:
+            raise ValueError(f"데이터를 가져올 수 없습니다. 종목 코드를 확인하세요: {self.ticker}")
+        METRICS.count('rows', len(self.df))
+        print(f"데이터 수집 완료: {len(self.df)}개 데이터")
+        return self.df
+    
+    def use_frame(self, df):
+        """
+        미리 받아 둔 주가 데이터를 분석 데이터로 사용 (fetch_data() 대신)
+
+        캐시를 사용하면 빠진 구간을 이 데이터로 채워 저장합니다.
+
+        Parameters:
+        -----------
+        df : DataFrame
+            [start_date, end_date) 구간 주가 데이터
+        """
+        if self.cache:
+            df = self.cache.fetch(self.ticker, self.start_date, self.end_date,
+                                  lambda start, end: slice_dates(df, start, end),
+                                  interval=self.interval)
+        if df.empty:
+            raise ValueError(f"데이터를 가져올 수 없습니다. 종목 코드를 확인하세요: {self.ticker}")
+        self.df = df
+        return self.df
+
+    def find_pivots(self, column='Close', order=5, engine='argrelextrema', chunk_size=None):
+        """
+        피봇 포인트(극값) 찾기
+        
+        Parameters:
+        -----------
+        column : str
+            분석할 컬럼 (기본값: 'Close')
+        order : int
+            피봇을 찾을 때 비교할 주변 데이터 개수
+        engine : str
+            피봇 탐지 엔진 ('argrelextrema' 또는 'window', find_pivot_indices() 참고)
+        chunk_size : int, optional
+            한 번에 처리할 최대 봉 개수 (기본값: PIVOT_CHUNK_SIZE), 긴 분봉 데이터의
+            메모리 사용량 제한용이며 결과는 같음
+        
+        Returns:
+        --------
+        local_min : array
+            지지선 후보 (로컬 최소값)
+        local_max : array
+            저항선 후보 (로컬 최대값)
+        """
+        values = self.df[column].values
+        with METRICS.stage('find_pivots'):
+            local_min_idx, local_max_idx = find_pivot_indices_chunked(
+                values, order=order, engine=engine, chunk_size=chunk_size or PIVOT_CHUNK_SIZE)
+        METRICS.count('pivots', len(local_min_idx) + len(local_max_idx))
+
+        # 로컬 최소값 (지지선 후보)
+        local_min = values[local_min_idx]
+        
+        # 로컬 최대값 (저항선 후보)
+        local_max = values[local_max_idx]
+        
+        return local_min, local_max, local_min_idx, local_max_idx
+    
+    def cluster_levels(self, levels, tolerance=0.02):
+        """
+        비슷한 가격대를 클러스터링하여 주요 지지/저항선 찾기
+        
+        Parameters:
+        -----------
+        levels : array
+            가격 레벨들
+        tolerance : float
+            클러스터링 허용 오차 (2% = 0.02)
+        
+        Returns:
+        --------
+        clustered_levels : list
+            클러스터링된 주요 레벨과 빈도수 (모듈 함수 cluster_levels() 참고)
+        """
+        with METRICS.stage('cluster_levels'):
+            clusters = cluster_levels(levels, tolerance)
+        METRICS.count('clusters', len(clusters))
+        return clusters
+    
+    @timed_stage('analyze')
+    def analyze(self, order=5, tolerance=0.02, max_levels=5, pivot_engine='argrelextrema', method='pivot',
+                volume_bins=VOLUME_PROFILE_BINS):
+        """
+        지지선/저항선 분석
+        
+        Parameters:
+        -----------
+        order : int
+            피봇 찾기 파라미터
+        tolerance : float
+            클러스터링 허용 오차 (volume: 노드 사이 최소 간격)
+        max_levels : int
+            표시할 최대 지지/저항선 개수
+        pivot_engine : str
+            피봇 탐지 엔진 ('argrelextrema' 또는 'window')
+        method : str
+            'pivot' (종가 피봇 클러스터링) 또는
+            'volume' (고가~저가 구간 볼륨 프로파일의 고거래량 노드, volume_levels() 참고)
+        volume_bins : int
+            method='volume'의 가격 구간 수
+        """
+        if method not in LEVEL_METHODS:
+            raise ValueError(f"지원하지 않는 레벨 탐지 방법입니다: {method} ({', '.join(LEVEL_METHODS)})")
+        if self.df is None:
+            self.fetch_data()
+        
+        print("\n지지선/저항선 분석 중...")
+
+        # 현재가
+        current_price = self.df['Close'].iloc[-1]
+
+        volume_share = None
+        if method == 'volume':
+            # 볼륨 프로파일 (고가/저가가 없으면 종가 사용)
+            close = self.df['Close'].to_numpy()
+            support_nodes, resistance_nodes = volume_levels(
+                self.df['High'].to_numpy() if 'High' in self.df.columns else close,
+                self.df['Low'].to_numpy() if 'Low' in self.df.columns else close,
+                self.df['Volume'].to_numpy() if 'Volume' in self.df.columns else np.zeros(len(close)),
+                current_price, tolerance=tolerance, max_levels=max_levels, bins=volume_bins)
+            print(f"볼륨 프로파일: {volume_bins}개 가격 구간, "
+                  f"고거래량 노드 {len(support_nodes) + len(resistance_nodes)}개")
+            support_clusters = [(level, count) for level, count, _ in support_nodes]
+            resistance_clusters = [(level, count) for level, count, _ in resistance_nodes]
+            volume_share = {'support': [share for _, _, share in support_nodes],
+                            'resistance': [share for _, _, share in resistance_nodes]}
+        else:
+            # 피봇 포인트 찾기
+            local_min, local_max, min_idx, max_idx = self.find_pivots(order=order, engine=pivot_engine)
+
+            print(f"발견된 지지선 후보: {len(local_min)}개")
+            print(f"발견된 저항선 후보: {len(local_max)}개")
+
+            # 지지선/저항선 클러스터링
+            support_clusters = self.cluster_levels(local_min, tolerance)
+            resistance_clusters = self.cluster_levels(local_max, tolerance)
+
+        self.support_levels = [level for level, count in support_clusters[:max_levels]]
+        self.resistance_levels = [level for level, count in resistance_clusters[:max_levels]]
+
+        def strength_text(kind, i, count):
+            if volume_share is not None:
+                return f"거래량: {volume_share[kind][i]:.1f}% (봉 {count}개)"
+            strength = "강함" if count >= 3 else "보통" if count >= 2 else "약함"
+            return f"강도: {strength} (터치 {count}회)"
+
+        # 통화 기호 설정
+        # 지수인지 확인
+        is_index = self.ticker.startswith('^')
+
+        if self.currency == 'USD':
+            currency_symbol = '$'
+            price_format = lambda x: f"${x:,.2f}"
+        elif self.currency == 'KRW':
+            if is_index:
+                currency_symbol = 'pt'
+                price_format = lambda x: f"{x:,.2f}pt"
+            else:
+                currency_symbol = '원'
+                price_format = lambda x: f"{x:,.0f}원"
+        else:
+            currency_symbol = self.currency
+            price_format = lambda x: f"{x:,.2f} {self.currency}"
+
+        # 결과 출력
+        print("\n" + "="*60)
+        print(f"종목: {self.ticker_name} ({self.ticker})")
+        print(f"현재가: {price_format(current_price)}")
+        print("="*60)
+
+        print("\n[주요 저항선 (Resistance Levels)]")
+        print("-" * 60)
+        for i, (level, count) in enumerate(resistance_clusters[:max_levels], 1):
+            distance = ((level - current_price) / current_price) * 100
+            print(f"{i}차 저항선: {price_format(level):>15} | "
+                  f"현재가 대비: {distance:>+6.2f}% | "
+                  f"{strength_text('resistance', i - 1, count)}")
+
+        print("\n[주요 지지선 (Support Levels)]")
+        print("-" * 60)
+        for i, (level, count) in enumerate(support_clusters[:max_levels], 1):
+            distance = ((level - current_price) / current_price) * 100
+            print(f"{i}차 지지선: {price_format(level):>15} | "
+                  f"현재가 대비: {distance:>+6.2f}% | "
+                  f"{strength_text('support', i - 1, count)}")
+
+        print("="*60)
+        
+        results = {
+            'support': support_clusters[:max_levels],
+            'resistance': resistance_clusters[:max_levels],
+            'current_price': current_price
+        }
+        if volume_share is not None:
+            # 레벨별 거래량 비중 (%), support/resistance와 같은 순서
+            results['volume_share'] = volume_share
+        return results
+    
+    def sweep(self, orders, tolerances, max_levels=5, column='Close'):
+        """
+        order/tolerance 조합별 지지/저항선을 한 번에 계산 (파라미터 튜닝용)
+
+        데이터는 한 번만 사용하며, 피봇은 order마다 한 번 (작은 order 결과를 이어서)
+        계산하고, 모든 order × tolerance 조합의 클러스터링은 cluster_levels_batch()
+        한 번으로 처리합니다.
+
+        Parameters:
+        -----------
+        orders : list of int
+            피봇 order 후보
+        tolerances : list of float
+            클러스터링 허용 오차 후보
+        max_levels : int
+            조합별 최대 지지/저항선 개수
+        column : str
+            분석할 컬럼 (기본값: 'Close')
+
+        Returns:
+        --------
+        DataFrame : order, tolerance, kind, rank, level, count, distance_pct 컬럼의 테이블
+        """
+        import pandas as pd
+
+        if self.df is None:
+            self.fetch_data()
+
+        values = self.df[column].values
+        current_price = float(values[-1])
+        orders = sorted({int(order) for order in orders})
+        tolerances = [float(tol) for tol in tolerances]
+        pivots = sweep_pivot_indices(values, orders)
+
+        combos = []
+        arrays = []
+        tols = []
+        for order in orders:
+            min_idx, max_idx = pivots[order]
+            for kind, idx in (('resistance', max_idx), ('support', min_idx)):
+                levels_sorted = np.sort(values[idx].astype(np.float64))
+                for tol in tolerances:
+                    combos.append((order, tol, kind))
+                    arrays.append(levels_sorted)
+                    tols.append(tol)
+
+        rows = []
+        for (order, tol, kind), clusters in zip(combos, cluster_levels_batch(arrays, tols)):
+            for rank, (level, count) in enumerate(clusters[:max_levels], 1):
+                rows.append((order, tol, kind, rank, float(level), count,
+                             (float(level) - current_price) / current_price * 100))
+
+        return pd.DataFrame(rows, columns=['order', 'tolerance', 'kind', 'rank', 'level', 'count',
+                                           'distance_pct'])
+
+    def walk_forward(self, orders, tolerances, window=250, step=20, horizon=20, max_levels=5,
+                     band=0.005, column='Close'):
+        """
+        워크 포워드 방식으로 지지/저항선의 유효성 평가
+
+        step개 봉마다 직전 window개 봉으로 레벨을 다시 계산하고, 이후 horizon개 봉에서
+        각 레벨의 터치/지지(반등)/돌파 여부를 셉니다.
+        - 터치: 지지선은 저가가 레벨 × (1 + band) 이하, 저항선은 고가가 레벨 × (1 - band) 이상
+        - 돌파: 지지선은 종가가 레벨 × (1 - band) 미만, 저항선은 종가가 레벨 × (1 + band) 초과
+        - 지지(반등): 터치했지만 돌파하지 않음
+
+        피봇은 order마다 전체 데이터에서 한 번만 구하고 각 구간은 양끝만 다시 판정하며,
+        구간마다 모든 order × tolerance 조합을 한 번에 클러스터링합니다.
+        평가는 모든 구간의 레벨을 모아 NumPy 브로드캐스팅으로 한 번에 계산합니다.
+
+        Parameters:
+        -----------
+        orders : list of int
+            피봇 order 후보
+        tolerances : list of float
+            클러스터링 허용 오차 후보
+        window : int
+            레벨 계산에 쓰는 봉 개수
+        step : int
+            재계산 간격 (봉 개수)
+        horizon : int
+            평가에 쓰는 이후 봉 개수
+        max_levels : int
+            구간별 최대 지지/저항선 개수
+        band : float
+            터치/돌파 판정 여유 (0.005 = 0.5%)
+        column : str
+            분석할 컬럼 (기본값: 'Close')
+
+        Returns:
+        --------
+        DataFrame : order, tolerance, kind별 levels, touches, bounces, breaks,
+                    hit_rate(반등/터치), break_rate(돌파/레벨) 테이블
+        """
+        import pandas as pd
+
+        if self.df is None:
+            self.fetch_data()
+
+        values = self.df[column].values.astype(np.float64)
+        high = self.df['High'].values.astype(np.float64) if 'High' in self.df else values
+        low = self.df['Low'].values.astype(np.float64) if 'Low' in self.df else values
+        n = len(values)
+
+        ends = np.arange(window, n - horizon + 1, step)
+        if not len(ends):
+            raise ValueError(f"데이터가 부족합니다: {n}개 (window {window} + horizon {horizon} 필요)")
+
+        orders = sorted({int(order) for order in orders})
+        tolerances = [float(tol) for tol in tolerances]
+        pivots = sweep_pivot_indices(values, orders)
+
+        combos = [(order, tol, kind) for order in orders
+                  for kind in ('resistance', 'support') for tol in tolerances]
+        combo_tols = np.array([tol for _, tol, _ in combos])
+
+        window_ids, combo_ids, levels = [], [], []
+        for w, stop in enumerate(ends):
+            start = stop - window
+            arrays = []
+            for order in orders:
+                local_min, local_max = window_pivot_indices(values, pivots[order], start, stop, order,
+                                                            engine='window')
+                for idx in (local_max, local_min):
+                    arrays.extend([np.sort(values[idx])] * len(tolerances))
+
+            owner, means, _ = top_clusters_flat(*_cluster_starts_batch(arrays, combo_tols), max_levels)
+            window_ids.append(np.full(len(owner), w, dtype=np.intp))
+            combo_ids.append(owner)
+            levels.append(means)
+
+        window_ids = np.concatenate(window_ids)
+        combo_ids = np.concatenate(combo_ids)
+        levels = np.concatenate(levels)
+        is_support = np.array([kind == 'support' for _, _, kind in combos])[combo_ids]
+
+        # 구간별 이후 horizon개 봉의 최저/최고 (구간 수 × horizon 브로드캐스팅)
+        view = np.lib.stride_tricks.sliding_window_view
+        fwd_low = view(low, horizon)[ends].min(axis=1)[window_ids]
+        fwd_high = view(high, horizon)[ends].max(axis=1)[window_ids]
+        fwd_close_min = view(values, horizon)[ends].min(axis=1)[window_ids]
+        fwd_close_max = view(values, horizon)[ends].max(axis=1)[window_ids]
+
+        touched = np.where(is_support, fwd_low <= levels * (1 + band), fwd_high >= levels * (1 - band))
+        broken = np.where(is_support, fwd_close_min < levels * (1 - band),
+                          fwd_close_max > levels * (1 + band))
+        bounced = touched & ~broken
+
+        n_combos = len(combos)
+        counts = np.bincount(combo_ids, minlength=n_combos)
+        touches = np.bincount(combo_ids, weights=touched, minlength=n_combos)
+        bounces = np.bincount(combo_ids, weights=bounced, minlength=n_combos)
+        breaks = np.bincount(combo_ids, weights=broken, minlength=n_combos)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table = pd.DataFrame({
+                'order': [order for order, _, _ in combos],
+                'tolerance': combo_tols,
+                'kind': [kind for _, _, kind in combos],
+                'levels': counts,
+                'touches': touches.astype(int),
+                'bounces': bounces.astype(int),
+                'breaks': breaks.astype(int),
+                'hit_rate': bounces / touches,
+                'break_rate': breaks / counts,
+            })
+        table.attrs['windows'] = len(ends)
+        return table
+
+    @timed_stage('multi_timeframe')
+    def multi_timeframe(self, timeframes=MTF_TIMEFRAMES, order=5, tolerance=0.02, max_levels=5,
+                        orders=None, column='Close', pivot_engine='argrelextrema'):
+        """
+        한 번 받은 데이터로 여러 시간 프레임의 지지/저항선과 겹치는 구간(컨플루언스) 분석
+
+        가장 짧은 봉(self.interval)의 데이터만 받고 나머지는 resample_ohlcv()로 만들며,
+        모든 시간 프레임의 피봇은 cluster_levels_batch() 한 번으로 함께 클러스터링합니다.
+
+        Parameters:
+        -----------
+        timeframes : sequence of str
+            분석할 시간 프레임 (self.interval 이상, 예: ('1d', '1wk', '1mo'))
+        order : int
+            기본 시간 프레임(self.interval)의 피봇 order
+        tolerance : float
+            클러스터링 및 컨플루언스 허용 오차
+        max_levels : int
+            시간 프레임별 최대 지지/저항선 개수 (컨플루언스도 이 레벨들로 계산)
+        orders : dict, optional
+            시간 프레임별 order (기본값: MTF_ORDERS, 기본 시간 프레임은 order)
+        column : str
+            분석할 컬럼
+        pivot_engine : str
+            피봇 탐지 엔진
+
+        Returns:
+        --------
+        dict : 'current_price',
+               'timeframes' ({시간 프레임: {'bars', 'order', 'support', 'resistance'}}),
+               'confluence' (confluence_levels() 결과)
+        """
+        if self.df is None:
+            self.fetch_data()
+
+        base_minutes = TIMEFRAME_MINUTES.get(self.interval)
+        frames = {}
+        for timeframe in timeframes:
+            minutes = TIMEFRAME_MINUTES.get(timeframe)
+            if minutes is None:
+                raise ValueError(f"지원하지 않는 시간 프레임입니다: {timeframe} ({', '.join(TIMEFRAME_MINUTES)})")
+            if minutes < base_minutes:
+                raise ValueError(f"시간 프레임 {timeframe}은(는) 데이터 간격 {self.interval}보다 짧습니다")
+            frames[timeframe] = self.df if minutes == base_minutes else resample_ohlcv(self.df, timeframe)
+
+        tf_orders = {**MTF_ORDERS, **(orders or {})}
+        pivots = []
+        used_orders = {}
+        for timeframe, frame in frames.items():
+            tf_order = order if TIMEFRAME_MINUTES[timeframe] == base_minutes else tf_orders.get(timeframe, order)
+            used_orders[timeframe] = tf_order
+            values = frame[column].to_numpy(dtype=np.float64)
+            if len(values) < 2 * tf_order + 1:
+                min_idx = max_idx = np.empty(0, dtype=np.intp)
+            else:
+                with METRICS.stage('find_pivots'):
+                    min_idx, max_idx = find_pivot_indices(values, order=tf_order, engine=pivot_engine)
+            pivots += [values[min_idx], values[max_idx]]
+
+        # 모든 시간 프레임의 지지/저항 후보를 한 번에 클러스터링
+        with METRICS.stage('cluster_levels'):
+            clusters = cluster_levels_batch(pivots, tolerance)
+
+        current_price = float(self.df[column].iloc[-1])
+        result = {'current_price': current_price, 'timeframes': {}, 'confluence': []}
+        levels = []
+        for i, (timeframe, frame) in enumerate(frames.items()):
+            support, resistance = clusters[2 * i][:max_levels], clusters[2 * i + 1][:max_levels]
+            result['timeframes'][timeframe] = {'bars': len(frame), 'order': used_orders[timeframe],
+                                               'support': support, 'resistance': resistance}
+            levels += [(float(level), count, timeframe) for level, count in support + resistance]
+
+        result['confluence'] = confluence_levels(levels, tolerance, current_price)
+        return result
+
+    @timed_stage('append_bars')
+    def append_bars(self, df_new, order=5, tolerance=0.02, max_levels=5, column='Close',
+                    pivot_engine='argrelextrema', keep_from=None):
+        """
+        새 봉을 추가하고 지지/저항선을 증분 갱신
+
+        처음 호출하면(또는 파라미터가 바뀌면) 현재 데이터 전체로 피봇/클러스터 상태를
+        만들고, 이후에는 새로 추가되거나 바뀐 봉의 영향을 받는 마지막 order개 구간의
+        피봇만 다시 판정하여 해당 클러스터만 갱신합니다. 마지막 order개 봉의 피봇은
+        이후 봉이 더 들어오면 바뀔 수 있으며 매번 다시 판정합니다.
+        결과는 같은 데이터로 analyze()를 다시 실행한 것과 같습니다.
+
+        Parameters:
+        -----------
+        df_new : DataFrame
+            새 봉 데이터 (self.df와 같은 컬럼). 첫 봉의 시각이 기존 데이터 안에 있으면
+            그 시각부터의 기존 봉은 새 데이터로 교체 (장중 갱신된 마지막 봉 등)
+        order, tolerance, max_levels, pivot_engine :
+            analyze() 파라미터
+        column : str
+            분석할 컬럼 (기본값: 'Close')
+        keep_from : str or Timestamp, optional
+            이 시각(현지 시각) 이전 봉은 버림 (기간을 고정한 채 계속 추가할 때, 마지막 봉은 항상 유지).
+            버린 뒤 새 첫 order개 봉의 피봇만 다시 판정합니다.
+
+        Returns:
+        --------
+        dict : analyze()와 같은 형식의 결과 (출력 없음)
+        """
+        import pandas as pd
+
+        params = (order, tolerance, column, pivot_engine)
+        if self.df is None:
+            self.df = df_new
+            df_new = None
+
+        state = self._stream
+        if state is None or state['params'] != params or state['df'] is not self.df:
+            state = self._init_stream(params)
+
+        if df_new is not None and len(df_new):
+            keep = self.df.index < df_new.index[0]
+            changed_from = int(keep.sum())
+            self.df = pd.concat([self.df[keep], df_new])
+            self._update_stream(state, changed_from)
+            state['df'] = self.df
+
+        if keep_from is not None:
+            dropped = min(int((_naive_index(self.df.index) < pd.Timestamp(keep_from)).sum()), len(self.df) - 1)
+            if dropped > 0:
+                self.df = self.df.iloc[dropped:]
+                self._trim_stream(state, dropped)
+                state['df'] = self.df
+
+        support_clusters = state['support'].result()
+        resistance_clusters = state['resistance'].result()
+        self.support_levels = [level for level, count in support_clusters[:max_levels]]
+        self.resistance_levels = [level for level, count in resistance_clusters[:max_levels]]
+
+        return {
+            'support': support_clusters[:max_levels],
+            'resistance': resistance_clusters[:max_levels],
+            'current_price': self.df[column].iloc[-1]
+        }
+
+    def _init_stream(self, params):
+        """현재 데이터 전체로 증분 분석 상태 생성"""
+        order, tolerance, column, pivot_engine = params
+        values = self.df[column].values
+        min_idx, max_idx = find_pivot_indices(values, order=order, engine=pivot_engine)
+        self._stream = {
+            'params': params,
+            'df': self.df,
+            'min_idx': min_idx,
+            'min_val': values[min_idx].astype(np.float64),
+            'max_idx': max_idx,
+            'max_val': values[max_idx].astype(np.float64),
+            'support': _LevelClusterState(values[min_idx], tolerance),
+            'resistance': _LevelClusterState(values[max_idx], tolerance),
+        }
+        return self._stream
+
+    def _update_stream(self, state, changed_from):
+        """changed_from 번째 봉부터 바뀌었을 때 영향받는 피봇과 클러스터 갱신"""
+        order, tolerance, column, pivot_engine = state['params']
+        values = self.df[column].values
+
+        # 윈도우가 바뀐 봉에 닿는 위치부터 다시 판정
+        lo = max(changed_from - order, 0)
+        base = max(lo - order, 0)
+        new_min, new_max = find_pivot_indices(values[base:], order=order, engine=pivot_engine)
+        new_min = new_min[new_min + base >= lo] + base
+        new_max = new_max[new_max + base >= lo] + base
+
+        for kind, idx_key, val_key, new_idx in (('support', 'min_idx', 'min_val', new_min),
+                                                  ('resistance', 'max_idx', 'max_val', new_max)):
+            split = np.searchsorted(state[idx_key], lo)
+            removed = state[val_key][split:]
+            added = values[new_idx].astype(np.float64)
+            state[kind].update(removed, added)
+            state[idx_key] = np.concatenate((state[idx_key][:split], new_idx))
+            state[val_key] = np.concatenate((state[val_key][:split], added))
+
+    def _trim_stream(self, state, dropped):
+        """앞쪽 dropped개 봉을 버렸을 때 영향받는 피봇과 클러스터 갱신"""
+        order, tolerance, column, pivot_engine = state['params']
+        values = self.df[column].values
+
+        # 새 첫 order개 봉은 윈도우가 잘려 판정이 바뀔 수 있으므로 다시 판정
+        head = min(order, len(values))
+        new_min, new_max = find_pivot_indices(values[:head + order], order=order, engine=pivot_engine)
+
+        for kind, idx_key, val_key, new_idx in (('support', 'min_idx', 'min_val', new_min[new_min < head]),
+                                                  ('resistance', 'max_idx', 'max_val', new_max[new_max < head])):
+            split = np.searchsorted(state[idx_key], dropped + head)
+            removed = state[val_key][:split]
+            added = values[new_idx].astype(np.float64)
+            state[kind].update(removed, added)
+            state[idx_key] = np.concatenate((new_idx, state[idx_key][split:] - dropped))
+            state[val_key] = np.concatenate((added, state[val_key][split:]))
+
+    @timed_stage('plot')
+    def plot(self, figsize=(14, 8), output=None, show=None, dpi=None):
+        """
+        지지선/저항선 그래프 그리기
+
+        ChartRenderer로 그리며, 저장(및 표시) 후 그림을 닫으므로 여러 종목을 반복해서
+        그려도 메모리가 늘지 않습니다.
+
+        Parameters:
+        -----------
+        figsize : tuple
+            그래프 크기
+        output : str or file-like, optional
+            저장할 파일 경로 또는 바이너리 버퍼 (기본값: '<종목코드>_support_resistance.png'),
+            형식은 확장자(png, svg, json)로 판단하며 버퍼는 PNG
+        show : bool, optional
+            저장 후 창에 표시할지 여부 (기본값: 대화형 백엔드일 때만 표시)
+        dpi : int, optional
+            PNG 해상도 (기본값: CHART_DPI)
+
+        Returns:
+        --------
+        Figure : 그린 그림 (이미 닫혔으므로 다시 저장만 가능)
+        """
+        if self.df is None:
+            print("데이터가 없습니다. analyze()를 먼저 실행하세요.")
+            return
+
+        filename = output if output is not None else f'{self.ticker}_support_resistance.png'
+        if show is None:
+            show = _interactive_backend()
+
+        figure = None
+        if show:
+            import matplotlib.pyplot as plt
+            figure = plt.figure(figsize=figsize)
+
+        max_levels = max(len(self.support_levels), len(self.resistance_levels), 1)
+        renderer = ChartRenderer(figsize=figsize, dpi=dpi or CHART_DPI, max_levels=max_levels,
+                                 figure=figure)
+        renderer.render(chart_series(self), filename)
+        if isinstance(filename, str):
+            print(f"\n그래프 저장 완료: {filename}")
+        if show:
+            plt.show()
+            plt.close(figure)
+
+        return renderer.figure
+
+
+# 그래프 렌더링 (헤드리스 배치용)
+CHART_FORMATS = ('png', 'svg', 'json')
+CHART_DPI = 100
+PNG_COMPRESS_LEVEL = 1
+# 창을 띄울 수 없는 matplotlib 백엔드
+NON_INTERACTIVE_BACKENDS = ('agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template')
+
+
+def _interactive_backend():
+    """현재 matplotlib 백엔드가 창을 띄울 수 있는지 여부"""
+    import matplotlib
+
+    return matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+
+
+def price_formats(symbol, currency):
+    """
+    통화별 가격 라벨/축 눈금 형식
+
+    Returns:
+    --------
+    tuple : (라벨 형식 함수, 축 눈금 형식 함수(x, pos), 축 단위 이름)
+    """
+    if currency == 'USD':
+        return (lambda x: f'${x:,.2f}'), (lambda x, p: f'${x:,.0f}'), 'USD'
+    if currency == 'KRW':
+        if symbol.startswith('^'):
+            return (lambda x: f'{x:,.2f}pt'), (lambda x, p: f'{x:,.1f}'), 'Points'
+        return (lambda x: f'{x:,.0f}'), (lambda x, p: f'{x:,.0f}'), 'KRW'
+    return (lambda x: f'{x:,.2f}'), (lambda x, p: f'{x:,.2f}'), currency
+
+
+def chart_series(analyzer):
+    """
+    그래프에 필요한 데이터만 뽑기 (ChartRenderer.render(), write_chart_json() 입력)
+
+    Parameters:
+    -----------
+    analyzer : SupportResistanceAnalyzer
+        analyze()를 실행한 분석기
+
+    Returns:
+    --------
+    dict : symbol, name, currency, interval, time(현지 시각 epoch ms, int64 배열),
+           close(float64 배열), current_price, support, resistance(레벨 리스트)
+    """
+    index = _naive_index(analyzer.df.index)
+    close = analyzer.df['Close'].to_numpy(dtype=np.float64)
+    return {
+        'symbol': analyzer.ticker,
+        'name': analyzer.ticker_name,
+        'currency': analyzer.currency,
+        'interval': analyzer.interval,
+        'time': index.values.astype('datetime64[ms]').astype(np.int64),
+        'close': close,
+        'current_price': float(close[-1]),
+        'support': [float(level) for level in analyzer.support_levels],
+        'resistance': [float(level) for level in analyzer.resistance_levels],
+    }
+
+
+def write_chart_json(series, output):
+    """
+    chart_series() 결과를 프런트엔드용 JSON으로 저장 (matplotlib 불필요)
+
+    Parameters:
+    -----------
+    series : dict
+        chart_series() 결과
+    output : str or file-like
+        파일 경로 또는 바이너리 버퍼
+    """
+    payload = dict(series, time=series['time'].tolist(), close=series['close'].tolist())
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if hasattr(output, 'write'):
+        output.write(body)
+    else:
+        with open(output, 'wb') as f:
+            f.write(body)
+
+
+def chart_path(output_dir, symbol, fmt='png'):
+    """배치 렌더링 결과 파일 경로 (<output_dir>/<종목코드>_support_resistance.<형식>)"""
+    return os.path.join(output_dir, f'{symbol}_support_resistance.{fmt}')
+
+
+class ChartRenderer:
+    """
+    지지/저항선 그래프를 재사용 가능한 그림 하나로 반복 렌더링
+
+    pyplot을 거치지 않고 matplotlib Figure(Agg 캔버스)를 직접 만들며, 가격선/현재가선/
+    레벨선(최대 max_levels개씩)을 미리 만들어 둔 뒤 종목마다 데이터와 라벨만 바꿉니다.
+    전역 그림 목록에 등록되지 않으므로 수천 개를 그려도 메모리가 쌓이지 않습니다.
+    """
+
+    RESISTANCE_COLORS = ('#A23B72', '#C73E1D', '#F18F01', '#8B4513', '#DC143C')
+    SUPPORT_COLORS = ('#06A77D', '#2E8B57', '#20B2AA', '#3CB371', '#00CED1')
+
+    def __init__(self, figsize=(14, 8), dpi=CHART_DPI, max_levels=5, figure=None):
+        """
+        Parameters:
+        -----------
+        figsize : tuple
+            그래프 크기 (인치)
+        dpi : int
+            PNG 해상도 (SVG는 벡터라 영향 없음)
+        max_levels : int
+            그릴 수 있는 최대 지지/저항선 개수 (각각)
+        figure : Figure, optional
+            그릴 그림 (기본값: pyplot과 무관한 새 Figure, plot()에서 창 표시용으로 전달)
+        """
+        import matplotlib.dates as mdates
+        from matplotlib.figure import Figure
+        from matplotlib.ticker import FuncFormatter
+
+        _ensure_plot_setup()
+        self.dpi = dpi
+        self.figure = figure if figure is not None else Figure(figsize=figsize)
+        self.figure.subplots_adjust(left=0.08, right=0.98, top=0.92, bottom=0.08)
+        ax = self.ax = self.figure.add_subplot()
+
+        self.price_line, = ax.plot([], [], label='Close Price', linewidth=1.5, color='#2E86AB', alpha=0.8)
+        self.current_line = ax.axhline(0, color='black', linestyle='--', linewidth=1, alpha=0.7)
+        self.level_lines = {
+            'resistance': [ax.axhline(0, color=self.RESISTANCE_COLORS[i % len(self.RESISTANCE_COLORS)],
+                                      linewidth=2, alpha=0.6, visible=False) for i in range(max_levels)],
+            'support': [ax.axhline(0, color=self.SUPPORT_COLORS[i % len(self.SUPPORT_COLORS)],
+                                   linewidth=2, alpha=0.6, visible=False) for i in range(max_levels)],
+        }
+        self.title = ax.set_title('', fontsize=16, fontweight='bold', pad=20)
+        ax.set_xlabel('Date', fontsize=12)
+        ax.grid(True, alpha=0.3)
+
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self._y_format = lambda x, p: f'{x:,.2f}'
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: self._y_format(x, p)))
+        self._legend = None
+
+    def render(self, series, output, fmt=None):
+        """
+        한 종목 그래프 저장
+
+        Parameters:
+        -----------
+        series : dict
+            chart_series() 결과
+        output : str or file-like
+            파일 경로 또는 바이너리 버퍼
+        fmt : str, optional
+            'png', 'svg', 'json' (기본값: 파일 확장자, 버퍼는 'png')
+
+        Returns:
+        --------
+        str or file-like : output
+        """
+        import matplotlib.dates as mdates
+
+        if fmt is None:
+            ext = os.path.splitext(output)[1].lstrip('.').lower() if isinstance(output, str) else ''
+            fmt = ext if ext in CHART_FORMATS else 'png'
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"지원하지 않는 그래프 형식입니다: {fmt} ({', '.join(CHART_FORMATS)})")
+        if fmt == 'json':
+            write_chart_json(series, output)
+            return output
+
+        with METRICS.stage('render_chart'):
+            label_format, axis_format, currency_label = price_formats(series['symbol'], series['currency'])
+            ax = self.ax
+
+            self.price_line.set_data(mdates.date2num(series['time'].astype('datetime64[ms]')),
+                                     series['close'])
+            current_price = series['current_price']
+            self.current_line.set_ydata([current_price, current_price])
+            self.current_line.set_label(f'Current: {label_format(current_price)}')
+
+            handles = [self.price_line, self.current_line]
+            for kind, prefix in (('resistance', 'R'), ('support', 'S')):
+                levels = series[kind]
+                for i, line in enumerate(self.level_lines[kind]):
+                    line.set_visible(i < len(levels))
+                    if i < len(levels):
+                        line.set_ydata([levels[i], levels[i]])
+                        line.set_label(f'{prefix}{i + 1}: {label_format(levels[i])}')
+                        handles.append(line)
+
+            self.title.set_text(f"{series['name']} - Support & Resistance Levels")
+            ax.set_ylabel(f'Price ({currency_label})', fontsize=12)
+            self._y_format = axis_format
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+
+            if self._legend is not None:
+                self._legend.remove()
+            self._legend = ax.legend(handles=handles, loc='upper left', fontsize=10, framealpha=0.9)
+
+        # PNG는 압축 수준을 낮춰 인코딩 시간을 줄임 (파일은 조금 커짐)
+        options = {'pil_kwargs': {'compress_level': PNG_COMPRESS_LEVEL}} if fmt == 'png' else {}
+        with METRICS.stage('savefig'):
+            self.figure.savefig(output, dpi=self.dpi, format=fmt, **options)
+        return output
+
+
+# 프로세스별로 재사용하는 ChartRenderer {(figsize, dpi, max_levels): renderer}
+_CHART_RENDERERS = {}
+
+
+def get_chart_renderer(figsize=(14, 8), dpi=CHART_DPI, max_levels=5):
+    """현재 프로세스에서 재사용할 ChartRenderer (같은 설정이면 같은 객체)"""
+    key = (tuple(figsize), dpi, max_levels)
+    renderer = _CHART_RENDERERS.get(key)
+    if renderer is None:
+        renderer = _CHART_RENDERERS[key] = ChartRenderer(figsize=figsize, dpi=dpi, max_levels=max_levels)
+    return renderer
+
+
+def _render_chart_job(series, path, fmt, dpi, max_levels):
+    get_chart_renderer(dpi=dpi, max_levels=max_levels).render(series, path, fmt)
+    return path
+
+
+def render_charts(series_list, output_dir, fmt='png', dpi=CHART_DPI, workers=None, max_levels=5):
+    """
+    여러 종목 그래프를 워커 프로세스에서 병렬 렌더링
+
+    워커마다 ChartRenderer 하나를 재사용하며, 'json' 형식은 matplotlib 없이 현재 프로세스에서 저장합니다.
+
+    Parameters:
+    -----------
+    series_list : list of dict
+        chart_series() 결과 목록
+    output_dir : str
+        저장 디렉토리 (파일 이름은 chart_path() 참고)
+    fmt : str
+        'png', 'svg', 'json'
+    dpi : int
+        PNG 해상도
+    workers : int, optional
+        워커 프로세스 수 (기본값: CPU 코어 수, 1이면 현재 프로세스에서 렌더링)
+    max_levels : int
+        종목별 최대 지지/저항선 개수
+
+    Returns:
+    --------
+    list : 저장한 파일 경로 (series_list 순서)
+    """
+    from itertools import repeat
+
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"지원하지 않는 그래프 형식입니다: {fmt} ({', '.join(CHART_FORMATS)})")
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [chart_path(output_dir, series['symbol'], fmt) for series in series_list]
+
+    workers = workers or os.cpu_count() or 1
+    if fmt == 'json' or workers == 1 or len(series_list) <= 1:
+        for series, path in zip(series_list, paths):
+            _render_chart_job(series, path, fmt, dpi, max_levels)
+        return paths
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(series_list) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_render_chart_job, series_list, paths, repeat(fmt), repeat(dpi),
+                      repeat(max_levels), chunksize=chunksize))
+    return paths
+
+
+# 비동기 데이터 수집
+# Yahoo Finance 차트 API 주소 (환경변수 SR_ANALYZER_CHART_URL로 로컬 테스트 서버 등으로 변경 가능)
+YAHOO_CHART_URL = os.environ.get('SR_ANALYZER_CHART_URL', 'https://query1.finance.yahoo.com')
+
+
+def parse_chart_response(payload, interval='1d'):
+    """
+    Yahoo Finance 차트 API(v8) 응답을 yfinance history()와 같은 형식으로 변환
+
+    Parameters:
+    -----------
+    payload : dict
+        차트 API JSON 응답
+    interval : str
+        봉 간격 ('1d'이면 날짜 단위로 정규화)
+
+    Returns:
+    --------
+    DataFrame : Open/High/Low/Close/Volume (수정주가 반영)
+    """
+    import pandas as pd
+
+    chart = payload.get('chart') or {}
+    if chart.get('error'):
+        raise ValueError(f"차트 API 오류: {chart['error']}")
+    results = chart.get('result') or []
+    if not results or not results[0].get('timestamp'):
+        return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+
+    result = results[0]
+    tz = (result.get('meta') or {}).get('exchangeTimezoneName') or 'UTC'
+    index = pd.to_datetime(result['timestamp'], unit='s', utc=True).tz_convert(tz)
+    if interval == '1d':
+        index = index.normalize()
+
+    quote = result['indicators']['quote'][0]
+    df = pd.DataFrame({
+        'Open': quote.get('open'),
+        'High': quote.get('high'),
+        'Low': quote.get('low'),
+        'Close': quote.get('close'),
+        'Volume': quote.get('volume'),
+    }, index=index, dtype=np.float64)
+    df.index.name = 'Date'
+
+    # yfinance(auto_adjust=True)와 같이 수정주가 비율을 OHLC에 반영
+    adjclose = result['indicators'].get('adjclose')
+    if adjclose and adjclose[0].get('adjclose'):
+        ratio = np.asarray(adjclose[0]['adjclose'], dtype=np.float64) / df['Close'].values
+        for column in ('Open', 'High', 'Low', 'Close'):
+            df[column] = df[column].values * ratio
+
+    df = df[df['Close'].notna()]
+    return df[~df.index.duplicated(keep='last')]
+
+
+class AsyncFetcher:
+    """
+    asyncio 기반 주가 데이터 동시 수집기
+
+    다운로드는 스레드 풀에서 실행되며, 스레드마다 requests.Session 하나를 유지하여
+    HTTP 연결(keep-alive)을 재사용합니다. 동시 요청 수는 세마포어로 제한하고,
+    초당 요청 수와 요청 제한(HTTP 429) 재시도는 get_fetch_scheduler()가 맡습니다.
+
+    사용 예:
+        async with AsyncFetcher(concurrency=16) as fetcher:
+            async for symbol, df, error in fetcher.iter_fetch(symbols, '2024-01-01'):
+                ...
+    """
+
+    def __init__(self, concurrency=8, base_url=None, timeout=30):
+        """
+        Parameters:
+        -----------
+        concurrency : int
+            동시 요청 수
+        base_url : str, optional
+            차트 API 주소 (기본값: YAHOO_CHART_URL)
+        timeout : float
+            요청 타임아웃 (초)
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.concurrency = concurrency
+        self.base_url = (base_url or YAHOO_CHART_URL).rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sessions = []
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fetch')
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """스레드 풀과 HTTP 세션 정리 (대기 중인 요청은 취소)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for session in self._sessions:
+            session.close()
+        self._sessions = []
+
+    def _session(self):
+        """현재 스레드의 HTTP 세션 (연결 재사용)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers['User-Agent'] = 'Mozilla/5.0 (support-resistance-analyzer)'
+            self._local.session = session
+            self._sessions.append(session)
+        return session
+
+    def fetch_sync(self, symbol, start_date, end_date=None, interval='1d'):
+        """한 종목 데이터를 동기적으로 가져오기 ([start_date, end_date))"""
+        import pandas as pd
+
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        params = {
+            'period1': int(pd.Timestamp(start_date, tz='UTC').timestamp()),
+            'period2': int(pd.Timestamp(end_date, tz='UTC').timestamp()),
+            'interval': interval,
+            'events': 'div,splits',
+            'includeAdjustedClose': 'true',
+        }
+
+        def request():
+            with METRICS.stage('fetch_http'):
+                response = self._session().get(f"{self.base_url}/v8/finance/chart/{symbol}",
+                                               params=params, timeout=self.timeout)
+            response.raise_for_status()
+            METRICS.count('http_requests')
+            return response
+
+        response = get_fetch_scheduler().call(('chart', self.base_url, symbol, start_date, end_date, interval),
+                                              request)
+        METRICS.count('bytes_fetched', len(response.content))
+        df = parse_chart_response(response.json(), interval)
+        return slice_dates(df, start_date, end_date) if interval == '1d' else df
+
+    def iter_fetch_sync(self, requests, interval='1d'):
+        """
+        여러 종목을 스레드 풀에서 받아 끝나는 순서대로 반환 (이벤트 루프 없이, 반복 호출용)
+
+        Parameters:
+        -----------
+        requests : list
+            (종목코드, 시작일, 종료일) 목록 (종목마다 기간이 달라도 됨)
+
+        Yields:
+        -------
+        tuple : (종목코드, DataFrame 또는 None, 예외 또는 None)
+        """
+        from concurrent.futures import as_completed
+
+        futures = {self._executor.submit(self.fetch_sync, symbol, start, end, interval): symbol
+                   for symbol, start, end in requests}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def fetch(self, symbol, start_date, end_date=None, interval='1d'):
+        """한 종목 데이터 가져오기 (동시 요청 수 제한)"""
+        import asyncio
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.fetch_sync,
+                                              symbol, start_date, end_date, interval)
+
+    async def iter_fetch(self, symbols, start_date, end_date=None, interval='1d', buffer=None):
+        """
+        여러 종목을 동시에 받아 끝나는 순서대로 반환 (async generator)
+
+        concurrency개의 작업이 종목 목록을 하나씩 가져가 받고, 결과는 크기가 buffer인
+        큐에 넣습니다. 소비가 늦어 큐가 차면 작업들이 멈추므로 메모리에는 최대
+        concurrency + buffer개의 데이터만 존재합니다. 중간에 닫으면 남은 작업을 취소합니다.
+
+        Parameters:
+        -----------
+        buffer : int, optional
+            다 받았지만 아직 소비하지 않은 결과의 최대 개수 (기본값: concurrency)
+
+        Yields:
+        -------
+        tuple : (종목코드, DataFrame 또는 None, 예외 또는 None)
+        """
+        import asyncio
+
+        results = asyncio.Queue(maxsize=buffer or self.concurrency)
+        pending = iter(symbols)
+        finished = object()
+
+        async def worker():
+            for symbol in pending:
+                try:
+                    item = (symbol, await self.fetch(symbol, start_date, end_date, interval), None)
+                except Exception as e:
+                    item = (symbol, None, e)
+                await results.put(item)
+            await results.put(finished)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = await results.get()
+                if item is finished:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def fetch_many(symbols, start_date, end_date=None, concurrency=8, on_frame=None,
+                     base_url=None, interval='1d'):
+    """
+    여러 종목 주가 데이터를 동시에 가져오기
+
+    Parameters:
+    -----------
+    symbols : list
+        종목 코드 목록
+    start_date, end_date : str
+        수집 기간 [start_date, end_date)
+    concurrency : int
+        동시 요청 수
+    on_frame : callable, optional
+        on_frame(symbol, df, error) - 각 종목 다운로드가 끝나는 즉시 호출
+        (코루틴 함수도 가능), 전체 다운로드를 기다리지 않고 분석을 시작할 때 사용
+    base_url : str, optional
+        차트 API 주소 (기본값: YAHOO_CHART_URL)
+    interval : str
+        봉 간격
+
+    Returns:
+    --------
+    dict : {종목코드: DataFrame 또는 예외}
+    """
+    import inspect
+
+    results = {}
+    async with AsyncFetcher(concurrency=concurrency, base_url=base_url) as fetcher:
+        async for symbol, df, error in fetcher.iter_fetch(symbols, start_date, end_date, interval):
+            results[symbol] = df if error is None else error
+            if on_frame is not None:
+                ret = on_frame(symbol, df, error)
+                if inspect.isawaitable(ret):
+                    await ret
+    return results
+
+
+def iter_fetch_many(symbols, start_date, end_date=None, concurrency=8, base_url=None,
+                    interval='1d', buffer=None):
+    """
+    fetch_many()의 동기 버전 generator (백그라운드 스레드에서 이벤트 루프 실행)
+
+    다운로드가 끝나는 순서대로 (종목코드, DataFrame 또는 None, 예외 또는 None)를
+    반환하며, 소비가 늦으면 buffer개까지만 쌓아 두고 다운로드를 멈춥니다.
+    generator를 중간에 닫으면(break, 예외, close()) 남은 다운로드를 취소하고
+    백그라운드 스레드가 끝날 때까지 기다립니다.
+    """
+    import asyncio
+    import queue
+    import threading
+
+    buffer = buffer or concurrency
+    items = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+    done = object()
+
+    def offer(item):
+        """소비자가 가져갈 때까지 넣기 시도 (generator가 닫히면 포기)"""
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def runner():
+        async def pump():
+            async with AsyncFetcher(concurrency=concurrency, base_url=base_url) as fetcher:
+                stream = fetcher.iter_fetch(symbols, start_date, end_date, interval, buffer=buffer)
+                try:
+                    async for item in stream:
+                        # 이벤트 루프를 막지 않도록 짧게 양보하며 대기
+                        while not stop.is_set():
+                            try:
+                                items.put_nowait(item)
+                                break
+                            except queue.Full:
+                                await asyncio.sleep(0.05)
+                        if stop.is_set():
+                            break
+                finally:
+                    await stream.aclose()
+        try:
+            asyncio.run(pump())
+        except Exception as e:
+            offer((None, None, e))
+        finally:
+            offer(done)
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+# 유니버스(전체 종목) 배치 분석
+UNIVERSE_MARKETS = ('KRX', 'KOSPI', 'KOSDAQ')
+
+
+def currency_from_symbol(symbol):
+    """
+    심볼 형식에서 통화 추정
+
+    Parameters:
+    -----------
+    symbol : str
+        종목 코드 (예: '005930.KS', '^KS11', 'AAPL')
+
+    Returns:
+    --------
+    str : 통화 (접미사로 알 수 없으면 'USD')
+    """
+    return currency_from_suffix(symbol) or 'USD'
+
+
+def load_universe(spec):
+    """
+    분석 대상 종목 목록 만들기
+
+    Parameters:
+    -----------
+    spec : str
+        'KRX', 'KOSPI', 'KOSDAQ' 또는 종목 목록 파일 경로
+        (한 줄에 종목명/종목 코드 하나, '#'으로 시작하는 줄은 무시)
+
+    Returns:
+    --------
+    list : (입력값, 종목명, 통화, 시장) 튜플 리스트
+           파일 입력 중 접미사가 붙은 종목 코드(005930.KS 등)와 ^지수가 아닌 항목은
+           종목명이 None이며 워커에서 get_ticker_info()로 해석
+    """
+    market = spec.upper()
+    if market in UNIVERSE_MARKETS:
+        krx = get_krx_stock_list()
+        if krx.empty:
+            raise ValueError("한국 주식 종목 리스트를 가져올 수 없습니다.")
+        if market != 'KRX':
+            krx = krx[krx['Market'].astype(str).str.startswith(market)]
+
+        return [(krx_to_yahoo_symbol(code, mkt), name, 'KRW', mkt)
+                for code, name, mkt in zip(krx['Code'], krx['Name'], krx['Market'])]
+
+    if not os.path.exists(spec):
+        raise ValueError(f"유니버스를 찾을 수 없습니다: {spec} (KRX, KOSPI, KOSDAQ 또는 파일 경로)")
+
+    entries = []
+    with open(spec, encoding='utf-8') as f:
+        for line in f:
+            item = line.strip()
+            if not item or item.startswith('#'):
+                continue
+            # get_ticker_info()가 그대로 통과시킬 입력(통화를 아는 접미사 코드, ^지수)만
+            # 바로 사용하고, 나머지(NAVER, KOSPI, 005930 등)는 워커에서 검색
+            if item not in COMMON_TICKERS and (item.startswith('^') or currency_from_suffix(item)):
+                entries.append((item, item, currency_from_symbol(item), ''))
+            else:
+                entries.append((item, None, None, ''))
+    return entries
+
+
+def level_rows(results):
+    """
+    analyze() 결과를 레벨별 행(dict) 리스트로 변환
+
+    Returns:
+    --------
+    list : kind('resistance'/'support'), rank, level, count, distance_pct(현재가 대비 %) dict 리스트
+           (method='volume' 결과는 거래량 비중 volume_pct 포함)
+    """
+    current_price = float(results['current_price'])
+    volume_share = results.get('volume_share')
+    rows = []
+    for kind in ('resistance', 'support'):
+        for rank, (level, count) in enumerate(results[kind], 1):
+            row = {
+                'kind': kind,
+                'rank': rank,
+                'level': float(level),
+                'count': int(count),
+                'distance_pct': (float(level) - current_price) / current_price * 100,
+            }
+            if volume_share is not None:
+                row['volume_pct'] = volume_share[kind][rank - 1]
+            rows.append(row)
+    return rows
+
+
+def _universe_error_result(entry, error):
+    """워커에서 결과를 받지 못한 종목의 오류 결과 (_analyze_universe_entry() 결과 형식)"""
+    ticker_input, ticker_name, _, market = entry
+    return {'input': ticker_input, 'symbol': ticker_input, 'name': ticker_name or ticker_input,
+            'market': market, 'rows': [], 'bars': 0, 'current_price': np.nan, 'elapsed': 0.0,
+            'error': error}
+
+
+def _init_universe_worker(profile_dir=None, fetch_limits=None):
+    """
+    유니버스 워커 프로세스 초기화
+
+    profile_dir이 주어지면 <profile_dir>/worker-<pid>/에 프로파일링을 시작하고,
+    워커가 끝날 때 한 번만 결과를 저장합니다.
+    fetch_limits((초당 요청 수, burst))가 주어지면 이 워커의 원격 요청 스케줄러를 그 값으로 설정합니다.
+    """
+    if fetch_limits is not None:
+        set_fetch_scheduler(FetchScheduler(*fetch_limits))
+    if not profile_dir:
+        return
+    from multiprocessing import util
+
+    METRICS.start_profiling(os.path.join(profile_dir, f'worker-{os.getpid()}'))
+    util.Finalize(None, METRICS.stop_profiling, exitpriority=10)
+
+
+def _analyze_universe_entry(entry, start_date, end_date, order, tolerance, max_levels, cache=None,
+                            pivot_engine='argrelextrema', frame=None, walk_forward=None,
+                            interval='1d', charts=None, method='pivot'):
+    """
+    유니버스 한 종목 분석 (워커 프로세스에서 실행)
+
+    frame이 주어지면(미리 받아 둔 데이터 또는 다운로드 예외) 네트워크 요청 없이 사용.
+    walk_forward(walk_forward() 인자 dict)가 주어지면 레벨 대신 워크 포워드 평가 결과를 행으로 반환.
+    charts((디렉토리, 형식, dpi))가 주어지면 워커의 ChartRenderer로 그래프를 저장하고 경로를 'chart'로 반환.
+    이 종목의 단계별 계측값은 결과 dict의 'metrics'(METRICS snapshot 형식)로 돌려줌.
+    예외는 모두 결과 dict의 'error'로 돌려주어 다른 종목에 영향을 주지 않음
+    """
+    import io
+    import time
+    from contextlib import redirect_stdout
+
+    ticker_input, ticker_name, currency, market = entry
+    started = time.perf_counter()
+    result = {'input': ticker_input, 'symbol': ticker_input, 'name': ticker_name or ticker_input,
+              'market': market, 'rows': [], 'bars': 0, 'current_price': np.nan, 'error': None,
+              'chart': None}
+
+    before = METRICS.snapshot()
+
+    try:
+        # 종목별 출력은 버림 (배치 진행 상황만 표시)
+        with METRICS.stage('analyze_symbol'), redirect_stdout(io.StringIO()):
+            if ticker_name is None:
+                symbol, ticker_name, currency = get_ticker_info(ticker_input, start_date, end_date)
+            else:
+                symbol = ticker_input
+
+            analyzer = SupportResistanceAnalyzer(symbol, start_date, end_date,
+                                                 ticker_name=ticker_name, currency=currency,
+                                                 cache=cache, interval=interval)
+            if isinstance(frame, Exception):
+                raise frame
+            if frame is not None:
+                analyzer.use_frame(frame)
+            else:
+                analyzer.fetch_data()
+            if walk_forward is not None:
+                table = analyzer.walk_forward(**walk_forward)
+            else:
+                results = analyzer.analyze(order=order, tolerance=tolerance, max_levels=max_levels,
+                                           pivot_engine=pivot_engine, method=method)
+                if charts is not None:
+                    chart_dir, chart_format, chart_dpi = charts
+                    result['chart'] = chart_path(chart_dir, symbol, chart_format)
+                    get_chart_renderer(dpi=chart_dpi, max_levels=max_levels).render(
+                        chart_series(analyzer), result['chart'], chart_format)
+
+        if walk_forward is not None:
+            result.update(symbol=symbol, name=ticker_name, bars=len(analyzer.df),
+                          current_price=float(analyzer.df['Close'].iloc[-1]),
+                          rows=table.to_dict('records'))
+        else:
+            result.update(symbol=symbol, name=ticker_name, bars=len(analyzer.df),
+                          current_price=float(results['current_price']), rows=level_rows(results))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['metrics'] = METRICS.since(before)
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+
+def _prefetched_jobs(entries, start_date, end_date, concurrency, cache=None, interval='1d', batch=None):
+    """
+    (종목, 미리 받은 데이터) 작업을 다운로드가 끝나는 순서대로 생성
+
+    종목명을 아직 모르는 항목(워커에서 검색)과 캐시에 이미 있는 종목은 그대로 넘기고,
+    나머지는 iter_fetch_many()로 동시에 받습니다.
+    batch를 주면 대신 데이터 소스의 history_many()로 batch개씩 묶어 받습니다.
+    분봉은 요청 기간 제한 때문에 나누어 받아야 하므로 미리 받지 않고 워커에서 수집합니다.
+    로컬 재생 소스(--replay)는 워커가 파일을 직접 읽습니다.
+    """
+    if interval != '1d' or not get_data_provider().remote:
+        for entry in entries:
+            yield entry, None
+        return
+    if cache is None:
+        cache = OHLCVCache()
+
+    to_fetch = {}
+    for entry in entries:
+        symbol, ticker_name = entry[0], entry[1]
+        if ticker_name is None:
+            yield entry, None
+            continue
+        if cache:
+            meta = cache.load_meta(symbol)
+            if not cache.missing_ranges(meta, start_date, end_date or datetime.now().strftime('%Y-%m-%d')):
+                yield entry, None
+                continue
+        to_fetch[symbol] = entry
+
+    if batch:
+        stream = get_data_provider().history_many(list(to_fetch), start_date, end_date, batch=batch)
+        try:
+            for symbol, frame in stream:
+                yield to_fetch.pop(symbol), frame
+        finally:
+            stream.close()
+        return
+
+    stream = iter_fetch_many(list(to_fetch), start_date, end_date, concurrency)
+    try:
+        for symbol, df, error in stream:
+            if symbol is None:
+                # 이벤트 루프 자체 오류: 남은 종목은 워커에서 직접 수집
+                for entry in list(to_fetch.values()):
+                    yield entry, None
+                return
+            yield to_fetch.pop(symbol), (error if error is not None else df)
+    finally:
+        # 중간에 중단되면 남은 다운로드 취소
+        stream.close()
+
+
+def run_universe(entries, start_date, end_date=None, order=7, tolerance=0.015, max_levels=5,
+                 workers=None, max_in_flight=None, progress_every=2.0, cache=None,
+                 pivot_engine='argrelextrema', fetch_concurrency=None, walk_forward=None,
+                 profile_dir=None, interval='1d', chart_dir=None, chart_format='png', chart_dpi=CHART_DPI,
+                 method='pivot', fetch_batch=None):
+    """
+    여러 종목을 프로세스 풀에서 병렬 분석하여 하나의 결과 테이블로 반환
+
+    Parameters:
+    -----------
+    entries : list
+        load_universe()가 반환한 종목 목록
+    start_date, end_date : str
+        분석 기간 (YYYY-MM-DD)
+    order, tolerance, max_levels, pivot_engine, method :
+        analyze() 파라미터
+    workers : int, optional
+        워커 프로세스 수 (기본값: CPU 코어 수)
+    max_in_flight : int, optional
+        동시에 제출해 두는 최대 작업 수 (기본값: workers * 4)
+    progress_every : float
+        진행 상황 출력 간격 (초)
+    cache : OHLCVCache or False, optional
+        주가 데이터 캐시 (SupportResistanceAnalyzer와 동일)
+    fetch_concurrency : int, optional
+        지정하면 주가 데이터를 메인 프로세스에서 비동기로 동시에 받아(iter_fetch_many)
+        다운로드가 끝나는 대로 워커에 분석을 맡김 (캐시에 이미 있는 종목은 제외)
+    fetch_batch : int, optional
+        지정하면 주가 데이터를 메인 프로세스에서 fetch_batch개씩 묶어 받음 (history_many())
+    walk_forward : dict, optional
+        지정하면 종목마다 walk_forward(**walk_forward)를 실행하여 평가 결과를 모음
+    profile_dir : str, optional
+        지정하면 워커 프로세스마다 <profile_dir>/worker-<pid>/에 프로파일 저장
+    interval : str
+        데이터 간격 (SupportResistanceAnalyzer와 동일, 기본값: '1d')
+    chart_dir : str, optional
+        지정하면 종목별 그래프를 워커에서 렌더링하여 저장 (chart 컬럼에 경로 기록)
+    chart_format, chart_dpi :
+        그래프 형식('png', 'svg', 'json')과 PNG 해상도
+
+    워커 프로세스는 get_fetch_scheduler()의 초당 요청 수를 워커 수로 나누어 사용하므로
+    전체 요청 속도는 설정한 값을 넘지 않습니다.
+    워커에서 수집한 단계별 계측값은 METRICS에 합쳐지므로, 끝난 뒤
+    METRICS.summary()로 단계별 백분위수를 볼 수 있습니다.
+
+    Returns:
+    --------
+    DataFrame : 종목별 지지/저항선 테이블 (실패 종목은 status='error' 한 줄)
+                walk_forward 지정 시 종목별 order/tolerance/kind 평가 테이블
+    """
+    import time
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    from concurrent.futures.process import BrokenProcessPool
+    from contextlib import closing
+    import pandas as pd
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    total = len(entries)
+
+    print(f"유니버스 분석 시작: {total}개 종목, 워커 {workers}개")
+
+    rows = []
+    done_count = 0
+    failed = []
+    metrics_before = METRICS.snapshot()
+    started = time.perf_counter()
+    last_report = started
+
+    charts = None
+    if chart_dir is not None and walk_forward is None:
+        if chart_format not in CHART_FORMATS:
+            raise ValueError(f"지원하지 않는 그래프 형식입니다: {chart_format} ({', '.join(CHART_FORMATS)})")
+        os.makedirs(chart_dir, exist_ok=True)
+        charts = (chart_dir, chart_format, chart_dpi)
+
+    if fetch_concurrency or fetch_batch:
+        jobs = _prefetched_jobs(entries, start_date, end_date, fetch_concurrency, cache, interval,
+                                batch=fetch_batch)
+    else:
+        jobs = ((entry, None) for entry in entries)
+
+    scheduler = get_fetch_scheduler()
+    fetch_limits = (scheduler.rate / workers if scheduler.rate else None,
+                    max(1, scheduler.bucket.burst // workers))
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_universe_worker,
+                                   initargs=(profile_dir, fetch_limits))
+
+    def submit(job):
+        entry, frame = job
+        return executor.submit(_analyze_universe_entry, entry, start_date, end_date, order, tolerance,
+                               max_levels, cache, pivot_engine, frame, walk_forward, interval, charts,
+                               method)
+
+    def collect(res):
+        nonlocal done_count
+        done_count += 1
+        METRICS.merge(res.get('metrics', {}))
+
+        base = {'symbol': res['symbol'], 'name': res['name'], 'market': res['market'],
+                'bars': res['bars'], 'current_price': res['current_price'],
+                'elapsed_sec': round(res['elapsed'], 4), 'chart': res.get('chart')}
+        if res['error']:
+            failed.append((res['input'], res['error']))
+            rows.append({**base, 'status': 'error', 'error': res['error']})
+        elif not res['rows']:
+            rows.append({**base, 'status': 'ok', 'error': None})
+        else:
+            for level_row in res['rows']:
+                rows.append({**base, 'status': 'ok', 'error': None, **level_row})
+
+    # 워커 프로세스가 죽으면(OOM, segfault) 풀 전체가 깨지므로, 새 풀을 만들고
+    # 그때 진행 중이던 종목(suspects)을 하나씩 다시 실행해 원인 종목만 오류로 기록
+    pending = {}
+    suspects = deque()
+    exhausted = False
+    executor = new_pool()
+    # 중간에 예외가 나도 미리 받기(prefetch) 스레드가 남지 않도록 jobs를 닫음
+    with closing(jobs):
+        try:
+            while pending or suspects or not exhausted:
+                # 동시 작업 수를 제한하며 제출 (의심 종목은 하나씩)
+                limit = 1 if suspects else max_in_flight
+                while len(pending) < limit:
+                    if suspects:
+                        job = suspects.popleft()
+                    elif exhausted:
+                        break
+                    else:
+                        try:
+                            job = next(jobs)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                    try:
+                        pending[submit(job)] = job
+                    except BrokenProcessPool:
+                        suspects.appendleft(job)
+                        break
+                if not pending:
+                    if suspects:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = new_pool()
+                    continue
+
+                in_flight = len(pending)
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in finished:
+                    job = pending.pop(future)
+                    try:
+                        res = future.result()
+                    except BrokenProcessPool as e:
+                        broken = True
+                        if in_flight == 1:
+                            # 혼자 실행하다 죽었으면 이 종목이 원인
+                            collect(_universe_error_result(job[0], f"워커 프로세스 종료: {e}"))
+                        else:
+                            suspects.append(job)
+                        continue
+                    except Exception as e:
+                        res = _universe_error_result(job[0], f"{type(e).__name__}: {e}")
+                    collect(res)
+
+                if broken:
+                    suspects.extend(pending.values())
+                    pending.clear()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_pool()
+
+                now = time.perf_counter()
+                if now - last_report >= progress_every or done_count == total:
+                    elapsed = now - started
+                    rate = done_count / elapsed if elapsed > 0 else 0.0
+                    print(f"  [{done_count:>5}/{total}] {done_count / max(total, 1) * 100:5.1f}% | "
+                          f"{rate:6.1f} 종목/초 | 실패 {len(failed)}")
+                    last_report = now
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    print("\n" + "="*60)
+    print(f"유니버스 분석 완료: {done_count}개 종목, {elapsed:.1f}초 "
+          f"({done_count / elapsed if elapsed > 0 else 0.0:.1f} 종목/초)")
+    print(f"성공: {done_count - len(failed)}개 | 실패: {len(failed)}개")
+    for ticker_input, error in failed[:10]:
+        print(f"  ✗ {ticker_input}: {error}")
+    if len(failed) > 10:
+        print(f"  ... 외 {len(failed) - 10}개")
+    counters = METRICS.since(metrics_before)['counters']
+    if counters.get('throttled') or counters.get('fetch_retries'):
+        print(f"⚠ 원격 요청 {counters.get('remote_calls', 0)}회 중 요청 제한 {counters.get('throttled', 0)}회, "
+              f"재시도 {counters.get('fetch_retries', 0)}회")
+    print("="*60)
+
+    if walk_forward is not None:
+        columns = ['symbol', 'name', 'market', 'status', 'error', 'bars', 'current_price',
+                   'order', 'tolerance', 'kind', 'levels', 'touches', 'bounces', 'breaks',
+                   'hit_rate', 'break_rate', 'elapsed_sec']
+    else:
+        columns = ['symbol', 'name', 'market', 'status', 'error', 'bars', 'current_price',
+                   'kind', 'rank', 'level', 'count', 'distance_pct', 'elapsed_sec']
+        if method == 'volume':
+            columns.insert(columns.index('distance_pct') + 1, 'volume_pct')
+        if charts is not None:
+            columns.append('chart')
+    table = pd.DataFrame(rows).reindex(columns=columns)
+    if walk_forward is None:
+        # 실패 종목 행(레벨 없음)이 있어도 순위/빈도수는 정수로 저장
+        table[['rank', 'count']] = table[['rank', 'count']].astype('Int64')
+    return table
+
+
+def _load_panel_entry(job, start_date, end_date, cache, interval):
+    """패널 분석용 한 종목 종가 수집 (_analyze_universe_entry()와 같은 종목 확인/수집 순서, 분석은 하지 않음)"""
+    import time
+
+    entry, frame = job
+    ticker_input, ticker_name, currency, market = entry
+    started = time.perf_counter()
+    result = {'input': ticker_input, 'symbol': ticker_input, 'name': ticker_name or ticker_input,
+              'market': market, 'close': None, 'error': None}
+    try:
+        if ticker_name is None:
+            symbol, ticker_name, currency = get_ticker_info(ticker_input, start_date, end_date)
+        else:
+            symbol = ticker_input
+        analyzer = SupportResistanceAnalyzer(symbol, start_date, end_date, ticker_name=ticker_name,
+                                             currency=currency, cache=cache, interval=interval)
+        if isinstance(frame, Exception):
+            raise frame
+        if frame is not None:
+            analyzer.use_frame(frame)
+        else:
+            analyzer.fetch_data()
+        result.update(symbol=symbol, name=ticker_name, close=analyzer.df['Close'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+
+def panel_frame(series):
+    """
+    종목별 종가 시리즈를 날짜 합집합 기준으로 맞춘 (종목 수, 봉 수) 행렬로 변환
+
+    Parameters:
+    -----------
+    series : dict
+        {종목 코드: 종가 Series}
+
+    Returns:
+    --------
+    tuple : (날짜 DatetimeIndex (타임존 제거), (종목 수, 봉 수) float64 행렬, 없는 날은 NaN)
+    """
+    import pandas as pd
+
+    if not series:
+        return pd.DatetimeIndex([]), np.empty((0, 0))
+    aligned = {}
+    for symbol, close in series.items():
+        close = pd.Series(close.to_numpy(dtype=np.float64), index=_naive_index(close.index))
+        aligned[symbol] = close[~close.index.duplicated(keep='last')]
+    frame = pd.concat(aligned, axis=1, sort=True)
+    return frame.index, frame.to_numpy(dtype=np.float64).T
+
+
+def run_universe_panel(entries, start_date, end_date=None, order=7, tolerance=0.015, max_levels=5,
+                       workers=None, cache=None, fetch_concurrency=None, fetch_batch=None, interval='1d'):
+    """
+    여러 종목을 패널 엔진으로 분석하여 run_universe()와 같은 결과 테이블로 반환 (method='pivot')
+
+    주가 데이터를 메인 프로세스의 스레드 풀에서 모은 뒤(fetch_concurrency/fetch_batch를 주면 미리 받기)
+    날짜를 맞춘 종가 행렬 하나로 panel_levels()를 한 번 실행합니다.
+    종목마다 워커 프로세스와 분석 객체를 거치지 않으므로 짧은 일봉 시리즈가 많을 때 유리하며,
+    종목별 결과는 run_universe()와 같습니다.
+
+    Parameters:
+    -----------
+    entries : list
+        load_universe()가 반환한 종목 목록
+    start_date, end_date : str
+        분석 기간 (YYYY-MM-DD)
+    order, tolerance, max_levels :
+        analyze() 파라미터
+    workers : int, optional
+        데이터 수집 스레드 수 (기본값: CPU 코어 수 * 2)
+    cache, fetch_concurrency, fetch_batch, interval :
+        run_universe()와 같음
+
+    Returns:
+    --------
+    DataFrame : 종목별 지지/저항선 테이블 (실패 종목은 status='error' 한 줄, elapsed_sec은 수집 시간)
+    """
+    import io
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import closing, redirect_stdout
+    import pandas as pd
+
+    workers = workers or (os.cpu_count() or 1) * 2
+    total = len(entries)
+    print(f"유니버스 패널 분석 시작: {total}개 종목, 수집 스레드 {workers}개")
+
+    metrics_before = METRICS.snapshot()
+    started = time.perf_counter()
+    if fetch_concurrency or fetch_batch:
+        jobs = _prefetched_jobs(entries, start_date, end_date, fetch_concurrency, cache, interval,
+                                batch=fetch_batch)
+    else:
+        jobs = ((entry, None) for entry in entries)
+
+    # 종목별 출력은 버림 (sys.stdout은 프로세스 전체 설정이므로 스레드 풀 전체를 감쌈)
+    with METRICS.stage('panel_fetch'), closing(jobs), redirect_stdout(io.StringIO()), \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(lambda job: _load_panel_entry(job, start_date, end_date, cache, interval), jobs))
+    fetched = time.perf_counter()
+
+    ok = [res for res in loaded if res['error'] is None]
+    failed = [(res['input'], res['error']) for res in loaded if res['error'] is not None]
+    with METRICS.stage('panel_levels'):
+        index, close = panel_frame({res['symbol']: res['close'] for res in ok})
+        # panel_frame()은 같은 종목을 한 행으로 합침
+        symbols = list(dict.fromkeys(res['symbol'] for res in ok))
+        panel = panel_levels(close, order=order, tolerance=tolerance, max_levels=max_levels)
+        levels = panel_table(panel, symbols)
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "="*60)
+    print(f"유니버스 패널 분석 완료: {len(loaded)}개 종목 x {len(index)}개 날짜, {elapsed:.1f}초 "
+          f"(수집 {fetched - started:.1f}초, 분석 {(elapsed - (fetched - started)) * 1000:.0f}ms)")
+    print(f"성공: {len(ok)}개 | 실패: {len(failed)}개")
+    for ticker_input, error in failed[:10]:
+        print(f"  ✗ {ticker_input}: {error}")
+    if len(failed) > 10:
+        print(f"  ... 외 {len(failed) - 10}개")
+    counters = METRICS.since(metrics_before)['counters']
+    if counters.get('throttled') or counters.get('fetch_retries'):
+        print(f"⚠ 원격 요청 {counters.get('remote_calls', 0)}회 중 요청 제한 {counters.get('throttled', 0)}회, "
+              f"재시도 {counters.get('fetch_retries', 0)}회")
+    print("="*60)
+
+    # 레벨이 없는 종목과 실패 종목은 한 줄 (run_universe()와 같은 모양)
+    row_of = {symbol: i for i, symbol in enumerate(symbols)}
+    base = pd.DataFrame([
+        {'symbol': res['symbol'], 'name': res['name'], 'market': res['market'],
+         'status': 'error' if res['error'] else 'ok', 'error': res['error'],
+         'bars': int(panel['bars'][row_of[res['symbol']]]) if res['error'] is None else 0,
+         'current_price': panel['current_price'][row_of[res['symbol']]] if res['error'] is None else np.nan,
+         'elapsed_sec': round(res['elapsed'], 4)}
+        for res in loaded
+    ])
+    columns = ['symbol', 'name', 'market', 'status', 'error', 'bars', 'current_price',
+               'kind', 'rank', 'level', 'count', 'distance_pct', 'elapsed_sec']
+    if base.empty:
+        return pd.DataFrame(columns=columns)
+    levels = levels.drop(columns=['bars', 'current_price'])
+    # 실패 종목과 성공 종목 코드가 겹쳐도 레벨은 성공 행에만 붙임
+    table = pd.concat([
+        base[base['status'] == 'ok'].merge(levels, on='symbol', how='left'),
+        base[base['status'] == 'error'],
+    ], ignore_index=True)
+    # 레벨이 없는 행 때문에 실수형이 된 정수 컬럼을 되돌림 (run_universe()와 같은 정수 컬럼)
+    table[['rank', 'count']] = table[['rank', 'count']].astype('Int64')
+    return table.reindex(columns=columns)
+
+# 전체 종목 레벨 인덱스 (스크리닝)
+LEVEL_KINDS = ('support', 'resistance')
+LEVEL_INDEX_PATH = os.path.join(CACHE_DIR, 'level_index.npy')
+# 문자열 필드는 고정 길이 (종목명은 표시용, 40자까지 보관)
+LEVEL_INDEX_DTYPE = np.dtype([
+    ('symbol', 'U20'), ('name', 'U40'), ('market', 'U16'), ('kind', 'i1'), ('rank', 'i2'),
+    ('level', 'f8'), ('count', 'i4'), ('current_price', 'f8'), ('distance_pct', 'f8'), ('updated', 'f8'),
+])
+
+
+class LevelIndex:
+    """
+    여러 종목의 지지/저항선을 현재가 대비 거리(distance_pct) 순으로 정렬해 둔 인덱스
+
+    레코드는 LEVEL_INDEX_DTYPE 구조화 배열 하나에 보관하며, 거리 구간은 이진 탐색으로
+    잘라낸 뒤 종류/터치 수/시장 조건만 벡터 연산으로 거르므로 재계산 없이 밀리초 안에 답합니다.
+    한 종목이 갱신되면 그 종목 레코드만 빼고 새 레코드를 정렬 위치에 끼워 넣습니다.
+    파일은 .npy 한 개이며 읽을 때 메모리 매핑합니다.
+    """
+
+    def __init__(self, data=None, path=None):
+        """
+        Parameters:
+        -----------
+        data : ndarray, optional
+            LEVEL_INDEX_DTYPE 배열 (distance_pct 오름차순)
+        path : str, optional
+            저장 파일 경로 (기본값: LEVEL_INDEX_PATH)
+        """
+        self.path = path or LEVEL_INDEX_PATH
+        self.data = np.empty(0, dtype=LEVEL_INDEX_DTYPE) if data is None else data
+
+    @classmethod
+    def load(cls, path=None):
+        """저장된 인덱스 읽기 (파일이 없으면 빈 인덱스)"""
+        path = path or LEVEL_INDEX_PATH
+        try:
+            data = np.load(path, mmap_mode='r', allow_pickle=False)
+        except (OSError, ValueError):
+            return cls(path=path)
+        if data.dtype != LEVEL_INDEX_DTYPE:
+            print(f"⚠ 레벨 인덱스 형식이 달라 새로 만듭니다: {path}")
+            return cls(path=path)
+        return cls(data, path)
+
+    def save(self):
+        """인덱스 저장 (임시 파일에 쓴 뒤 교체)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        def write_index(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.data), allow_pickle=False)
+
+        _write_atomic(self.path, write_index)
+
+    def __len__(self):
+        return len(self.data)
+
+    def symbols(self):
+        """인덱스에 있는 종목 코드 배열"""
+        return np.unique(self.data['symbol'])
+
+    def _merge(self, removed, records):
+        """removed 종목의 레코드를 빼고 records를 정렬 위치에 삽입"""
+        kept = self.data
+        removed = list(removed)
+        if len(removed) <= 8:
+            # 몇 종목만 바꿀 때는 비교가 정렬 기반 isin보다 빠름
+            drop = np.zeros(len(kept), dtype=bool)
+            for symbol in removed:
+                drop |= kept['symbol'] == symbol
+        else:
+            drop = np.isin(kept['symbol'], np.asarray(removed, dtype=kept['symbol'].dtype))
+        if drop.any():
+            kept = kept[~drop]
+        records = np.sort(records, order='distance_pct', kind='stable')
+        positions = np.searchsorted(kept['distance_pct'], records['distance_pct'], side='right')
+        self.data = np.insert(np.asarray(kept), positions, records)
+
+    def update(self, symbol, results, name=None, market='', updated=None):
+        """
+        한 종목의 레벨 갱신 (기존 레코드 교체)
+
+        Parameters:
+        -----------
+        symbol : str
+            종목 코드
+        results : dict
+            analyze() 결과
+        name, market : str, optional
+            종목명, 시장 구분 (market 생략 시 기존 레코드의 시장 구분 유지)
+        updated : float, optional
+            갱신 시각 (epoch 초, 기본값: 현재)
+        """
+        if not market:
+            previous = self.data['market'][self.data['symbol'] == symbol]
+            market = str(previous[0]) if len(previous) else ''
+        self._merge([symbol], level_records(results, symbol, name, market, updated))
+
+    def update_table(self, table, updated=None):
+        """
+        run_universe() 결과 테이블로 갱신
+
+        분석에 성공한 종목은 레코드를 교체하고(레벨이 없으면 삭제),
+        실패한 종목은 기존 레코드를 그대로 둡니다.
+
+        Returns:
+        --------
+        int : 갱신한 종목 수
+        """
+        ok = table[table['status'] == 'ok']
+        refreshed = ok['symbol'].astype(str).unique()
+        self._merge(refreshed, table_level_records(ok, updated))
+        return len(refreshed)
+
+    def remove(self, symbols):
+        """종목 레코드 삭제"""
+        self._merge(symbols, np.empty(0, dtype=LEVEL_INDEX_DTYPE))
+
+    def screen(self, kind=None, min_distance=-np.inf, max_distance=np.inf, min_count=1, markets=None):
+        """
+        조건에 맞는 레벨 찾기
+
+        Parameters:
+        -----------
+        kind : str, optional
+            'support' 또는 'resistance' (기본값: 둘 다)
+        min_distance, max_distance : float
+            현재가 대비 레벨 위치 (%) 구간, (레벨 - 현재가) / 현재가 * 100
+        min_count : int
+            최소 터치 횟수
+        markets : list of str, optional
+            시장 구분 접두어 (예: ['KOSDAQ']는 'KOSDAQ GLOBAL' 포함)
+
+        Returns:
+        --------
+        ndarray : LEVEL_INDEX_DTYPE 배열, 현재가에 가까운 순서
+        """
+        if kind is not None and kind not in LEVEL_KINDS:
+            raise ValueError(f"레벨 종류는 {', '.join(LEVEL_KINDS)} 중 하나여야 합니다: {kind}")
+
+        distance = self.data['distance_pct']
+        lo = np.searchsorted(distance, min_distance, side='left')
+        hi = np.searchsorted(distance, max_distance, side='right')
+        part = self.data[lo:hi]
+
+        mask = part['count'] >= min_count
+        if kind is not None:
+            mask &= part['kind'] == LEVEL_KINDS.index(kind)
+        if markets:
+            in_market = np.zeros(len(part), dtype=bool)
+            for market in markets:
+                in_market |= np.char.startswith(part['market'], market.upper())
+            mask &= in_market
+
+        hits = part[mask]
+        return hits[np.argsort(np.abs(hits['distance_pct']), kind='stable')]
+
+    def near(self, kind, within_pct, min_count=1, markets=None):
+        """
+        현재가가 레벨 근처에 있는 종목 찾기
+
+        지지선은 현재가가 지지선 위 within_pct% 이내, 저항선은 현재가가 저항선 아래
+        within_pct% 이내인 레벨을 찾습니다 (예: near('support', 1.5, min_count=3, markets=['KOSDAQ'])).
+        """
+        if kind == 'support':
+            return self.screen(kind, -within_pct, 0.0, min_count, markets)
+        return self.screen(kind, 0.0, within_pct, min_count, markets)
+
+
+def level_index_skip_reason(interval='1d', remote=None, method='pivot'):
+    """
+    레벨 인덱스를 갱신하지 않는 이유 (갱신해도 되면 None)
+
+    인덱스에는 간격/데이터 소스/탐지 방법 구분이 없으므로, 네트워크에서 받은 일봉 피봇 결과만 넣어
+    --screen에 분봉 레벨이나 로컬 재생(--replay) 데이터가 섞이지 않게 합니다.
+    볼륨 프로파일 결과의 count는 터치 수가 아니라 노드의 봉 수이므로 --min-touches와 맞지 않습니다.
+
+    Parameters:
+    -----------
+    interval : str
+        분석한 봉 간격
+    remote : bool, optional
+        네트워크 데이터 소스 여부 (기본값: get_data_provider().remote)
+    method : str
+        레벨 탐지 방법 (LEVEL_METHODS)
+    """
+    if method != 'pivot':
+        return f"--method {method} 결과 (count가 터치 수가 아님)"
+    if interval != '1d':
+        return f"{interval} 봉 결과"
+    if not (get_data_provider().remote if remote is None else remote):
+        return "로컬 재생(--replay) 결과"
+    return None
+
+
+def level_records(results, symbol, name=None, market='', updated=None):
+    """
+    analyze() 결과를 LEVEL_INDEX_DTYPE 구조화 배열로 변환 (레벨당 한 레코드)
+
+    레벨마다 dict를 만드는 대신 고정 길이 레코드 하나로 표현하므로, 여러 종목 결과는
+    np.concatenate()로 이어 붙여 한 번에 저장하거나(write_results()) 인덱스에 넣을 수 있습니다.
+
+    Parameters:
+    -----------
+    results : dict
+        analyze() 결과
+    symbol : str
+        종목 코드
+    name, market : str, optional
+        종목명 (기본값: 종목 코드), 시장 구분
+    updated : float, optional
+        분석 시각 (epoch 초, 기본값: 현재)
+
+    Returns:
+    --------
+    ndarray : LEVEL_INDEX_DTYPE 배열 (저항선 → 지지선, 순위 순)
+    """
+    import time
+
+    rows = level_rows(results)
+    records = np.zeros(len(rows), dtype=LEVEL_INDEX_DTYPE)
+    for field in ('rank', 'level', 'count', 'distance_pct'):
+        records[field] = [row[field] for row in rows]
+    records['kind'] = [LEVEL_KINDS.index(row['kind']) for row in rows]
+    records['symbol'] = symbol
+    records['name'] = name or symbol
+    records['market'] = market or ''
+    records['current_price'] = float(results['current_price'])
+    records['updated'] = time.time() if updated is None else updated
+    return records
+
+
+def table_level_records(table, updated=None):
+    """
+    run_universe() 결과 테이블(또는 read_results()로 읽은 테이블)을 LEVEL_INDEX_DTYPE 배열로 변환
+
+    레벨이 없는 행(실패 종목, 레벨 없음)은 제외합니다.
+    """
+    import time
+
+    if 'status' in table.columns:
+        table = table[table['status'] == 'ok']
+    rows = table[table['level'].notna()]
+    records = np.zeros(len(rows), dtype=LEVEL_INDEX_DTYPE)
+    records['symbol'] = rows['symbol'].astype(str).to_numpy()
+    records['name'] = rows['name'].fillna('').astype(str).to_numpy()
+    records['market'] = rows['market'].fillna('').astype(str).to_numpy()
+    records['kind'] = (rows['kind'] == 'resistance').to_numpy(dtype=np.int8)
+    for field in ('rank', 'level', 'count', 'current_price', 'distance_pct'):
+        records[field] = rows[field].to_numpy()
+    records['updated'] = time.time() if updated is None else updated
+    return records
+
+
+def level_records_frame(records):
+    """LevelIndex 검색 결과를 표시용 DataFrame으로 변환"""
+    import pandas as pd
+
+    df = pd.DataFrame({name: records[name] for name in LEVEL_INDEX_DTYPE.names})
+    df['kind'] = np.asarray(LEVEL_KINDS)[records['kind']]
+    df['updated'] = pd.to_datetime(records['updated'], unit='s').round('s')
+    return df
+
+
+# 분석 결과 파일 (확장자로 형식 결정)
+RESULT_FORMATS = {
+    '.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson',
+    '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow',
+}
+
+
+def result_format(path, fmt=None):
+    """결과 파일 형식 ('csv', 'ndjson', 'parquet', 'arrow') 결정 (fmt 생략 시 확장자로)"""
+    if fmt is None:
+        fmt = RESULT_FORMATS.get(os.path.splitext(path)[1].lower())
+        if fmt is None:
+            raise ValueError(f"결과 파일 확장자를 알 수 없습니다: {path} ({', '.join(RESULT_FORMATS)})")
+    if fmt not in RESULT_FORMATS.values():
+        raise ValueError(f"지원하지 않는 결과 형식입니다: {fmt} ({', '.join(sorted(set(RESULT_FORMATS.values())))})")
+    if fmt in ('parquet', 'arrow'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError(f"{fmt} 형식은 pyarrow가 필요합니다: pip install pyarrow") from None
+    return fmt
+
+
+def _tmp_path(path):
+    """원자적 교체용 임시 파일 경로 (공유 디렉토리에서 여러 서버가 같은 파일을 써도 겹치지 않음)"""
+    import socket
+
+    return f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+
+
+def _write_atomic(path, writer):
+    """
+    임시 파일에 쓴 뒤 교체 (동시 실행 중 깨진 파일 방지, 실패하면 임시 파일 삭제)
+
+    Parameters:
+    -----------
+    path : str
+        저장 경로 (디렉토리는 호출하는 쪽에서 만듦)
+    writer : callable
+        writer(tmp_path) 형태로 임시 파일을 쓰는 함수
+    """
+    tmp_path = _tmp_path(path)
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_results(data, path, fmt=None):
+    """
+    분석 결과를 파일 하나로 저장 (임시 파일에 쓴 뒤 교체)
+
+    Parameters:
+    -----------
+    data : DataFrame or ndarray
+        run_universe() 결과 테이블 또는 LEVEL_INDEX_DTYPE 배열 (level_records())
+    path : str
+        저장 경로
+    fmt : str, optional
+        'csv', 'ndjson'(한 줄에 한 레코드 JSON), 'parquet', 'arrow'(Arrow IPC, 압축 없음)
+        (기본값: 확장자로 결정)
+
+    Returns:
+    --------
+    str : 형식
+    """
+    fmt = result_format(path, fmt)
+    df = level_records_frame(data) if isinstance(data, np.ndarray) else data
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    def write_table(tmp_path):
+        if fmt == 'csv':
+            df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        elif fmt == 'ndjson':
+            df.to_json(tmp_path, orient='records', lines=True, force_ascii=False, date_format='iso',
+                       double_precision=15)
+        else:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if fmt == 'parquet':
+                import pyarrow.parquet as pq
+
+                pq.write_table(table, tmp_path)
+            else:
+                # 압축하지 않아야 메모리 매핑으로 복사 없이 읽을 수 있음
+                with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+    _write_atomic(path, write_table)
+    return fmt
+
+
+def read_results(path, fmt=None, columns=None, arrow=False):
+    """
+    write_results()로 저장한 결과 읽기
+
+    Arrow 파일은 메모리 매핑하여 복사 없이, Parquet 파일은 메모리 매핑으로 한 번에 읽습니다.
+
+    Parameters:
+    -----------
+    path : str
+        결과 파일
+    fmt : str, optional
+        형식 (기본값: 확장자로 결정)
+    columns : list of str, optional
+        읽을 컬럼 (기본값: 전체)
+    arrow : bool
+        True면 pyarrow.Table 반환 (Arrow 파일은 복사 없이 파일을 그대로 참조)
+
+    Returns:
+    --------
+    DataFrame or pyarrow.Table
+    """
+    import pandas as pd
+
+    fmt = result_format(path, fmt)
+    if fmt in ('csv', 'ndjson'):
+        if fmt == 'csv':
+            df = pd.read_csv(path, usecols=columns, encoding='utf-8-sig', float_precision='round_trip')
+        else:
+            df = pd.read_json(path, orient='records', lines=True, dtype=False)
+            if columns is not None:
+                df = df[list(columns)]
+        if not arrow:
+            return df
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    import pyarrow as pa
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        if columns is not None:
+            table = table.select(list(columns))
+    return table if arrow else table.to_pandas()
+
+
+# 여러 서버 분할 실행 (--shard, --merge)
+
+
+def parse_shard(spec):
+    """
+    'i/N' 형식의 샤드 지정 해석 (1 <= i <= N)
+
+    Returns:
+    --------
+    tuple : (i, N)
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', str(spec))
+    if not match:
+        raise ValueError(f"샤드는 i/N 형식이어야 합니다: {spec}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"샤드 번호는 1~{count}이어야 합니다: {spec}")
+    return index, count
+
+
+def shard_of(symbol, count):
+    """종목이 속한 샤드 번호 (1~count, 종목 코드 CRC32 기준이라 서버/실행마다 같음)"""
+    import zlib
+
+    return zlib.crc32(symbol.encode('utf-8')) % count + 1
+
+
+def shard_entries(entries, index, count):
+    """
+    종목 목록에서 index번째 샤드에 속한 항목만 (중복 종목 제거, 원래 순서 유지)
+
+    종목 코드 해시로 나누므로 종목 목록이 조금 바뀌어도 나머지 종목의 샤드는 그대로입니다.
+    """
+    seen = set()
+    selected = []
+    for entry in entries:
+        if entry[0] in seen:
+            continue
+        seen.add(entry[0])
+        if shard_of(entry[0], count) == index:
+            selected.append(entry)
+    return selected
+
+
+def universe_run_id(entries, **params):
+    """
+    종목 목록과 분석 파라미터의 요약값 (같은 실행에 속한 샤드인지 확인용)
+
+    Parameters:
+    -----------
+    entries : list
+        샤드로 나누기 전 전체 종목 목록
+    **params :
+        분석 기간, order 등 결과에 영향을 주는 값 (JSON으로 변환 가능해야 함)
+    """
+    import hashlib
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    for symbol in sorted({entry[0] for entry in entries}):
+        digest.update(symbol.encode('utf-8') + b'\n')
+    return digest.hexdigest()[:16]
+
+
+def shard_path(output, index, count):
+    """샤드 결과 파일 경로 (<이름>.shard-<i>-of-<N><확장자>)"""
+    stem, ext = os.path.splitext(output)
+    return f"{stem}.shard-{index}-of-{count}{ext}"
+
+
+def shard_manifest_path(output, index, count):
+    """샤드 매니페스트 경로 (<이름>.shard-<i>-of-<N>.json)"""
+    stem, _ = os.path.splitext(output)
+    return f"{stem}.shard-{index}-of-{count}.json"
+
+
+def write_shard_manifest(output, manifest):
+    """
+    샤드 매니페스트 저장 (임시 파일에 쓴 뒤 교체, 같은 샤드를 다시 실행하면 덮어씀)
+
+    manifest의 status는 'running'(실행 중 또는 중단됨), 'complete', 'failed' 중 하나
+    """
+    path = shard_manifest_path(output, manifest['shard'], manifest['shards'])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write_manifest(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    _write_atomic(path, write_manifest)
+    return path
+
+
+def merge_shards(output, fmt=None):
+    """
+    샤드 결과를 하나로 합치기 전에 확인하고, 모두 완료되었으면 합친 테이블 반환
+
+    가장 최근에 끝난 샤드의 실행(run_id, 샤드 수)을 기준으로, 매니페스트가 없거나 실행 중/중단된 샤드,
+    실패했거나 결과 파일이 없거나 행 수가 다른 샤드, 다른 실행(종목 목록/기간/파라미터가 다름)의 샤드를
+    다시 실행할 대상으로 보고합니다.
+
+    Parameters:
+    -----------
+    output : str
+        샤드 실행 때 준 --output 경로 (합친 결과도 이 경로에 저장)
+    fmt : str, optional
+        결과 형식 (기본값: 확장자로 결정)
+
+    Returns:
+    --------
+    tuple : (합친 DataFrame 또는 None, 보고 dict)
+            보고 dict: shards, run_id, complete, missing, running, failed({번호: 사유}), stale, rows, errors,
+            interval, remote, method (기준 실행의 봉 간격/네트워크 데이터 소스 여부/레벨 탐지 방법)
+    """
+    import glob
+    import pandas as pd
+
+    stem, _ = os.path.splitext(output)
+    manifests = []
+    for path in glob.glob(f"{glob.escape(stem)}.shard-*-of-*.json"):
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifests.append(manifest)
+        except (OSError, ValueError):
+            continue
+    if not manifests:
+        raise ValueError(f"샤드 매니페스트가 없습니다: {stem}.shard-*-of-*.json")
+
+    latest = max(manifests, key=lambda m: m.get('updated', ''))
+    count, run_id = latest['shards'], latest['run_id']
+    report = {'shards': count, 'run_id': run_id, 'complete': [], 'missing': [], 'running': [],
+              'failed': {}, 'stale': [], 'rows': 0, 'errors': 0,
+              'interval': latest.get('interval', '1d'), 'remote': latest.get('remote', True),
+              'method': latest.get('method', 'pivot')}
+    by_index = {m['shard']: m for m in manifests if m.get('shards') == count}
+
+    tables = []
+    for index in range(1, count + 1):
+        manifest = by_index.get(index)
+        if manifest is None:
+            report['missing'].append(index)
+        elif manifest.get('run_id') != run_id:
+            report['stale'].append(index)
+        elif manifest.get('status') == 'running':
+            report['running'].append(index)
+        elif manifest.get('status') != 'complete':
+            report['failed'][index] = manifest.get('error') or manifest.get('status')
+        else:
+            path = os.path.join(os.path.dirname(os.path.abspath(output)), manifest['output'])
+            try:
+                table = read_results(path, fmt)
+            except (OSError, ValueError) as e:
+                report['failed'][index] = f"결과 파일을 읽을 수 없습니다: {e}"
+                continue
+            if len(table) != manifest['rows']:
+                report['failed'][index] = f"행 수가 다릅니다 ({len(table)} != {manifest['rows']})"
+                continue
+            report['complete'].append(index)
+            report['errors'] += manifest.get('errors', 0)
+            tables.append(table)
+
+    if len(report['complete']) != count:
+        return None, report
+    merged = pd.concat(tables, ignore_index=True) if len(tables) > 1 else tables[0]
+    report['rows'] = len(merged)
+    return merged, report
+
+
+# 실시간 감시 (--watch)
+# 최신 봉을 다시 받는 간격 (초)과 접근 알림 거리 (%)
+WATCH_INTERVAL = 60.0
+WATCH_NEAR_PCT = 0.5
+ALERT_EVENTS = ('break_above', 'break_below', 'approach')
+
+
+def level_events(previous_price, price, support, resistance, near_pct=WATCH_NEAR_PCT):
+    """
+    직전 가격 -> 현재 가격 사이의 지지/저항선 돌파와 접근 판정
+
+    돌파는 직전 가격과 현재 가격이 레벨의 서로 다른 쪽에 있을 때, 접근은 레벨과의 거리가
+    near_pct% 밖에서 안으로 들어왔을 때입니다 (한 번 들어온 뒤에는 다시 알리지 않음).
+
+    Returns:
+    --------
+    list : (이벤트, 종류, 레벨) 목록, 이벤트는 ALERT_EVENTS 중 하나
+    """
+    events = []
+    for kind, levels in (('support', support), ('resistance', resistance)):
+        for level in levels:
+            if (previous_price - level) * (price - level) < 0:
+                events.append(('break_above' if price > level else 'break_below', kind, level))
+            elif (abs(price - level) / level * 100 <= near_pct
+                  and abs(previous_price - level) / level * 100 > near_pct):
+                events.append(('approach', kind, level))
+    return events
+
+
+def print_alert(alert):
+    """알림을 한 줄로 출력"""
+    labels = {'break_above': '상향 돌파', 'break_below': '하향 이탈', 'approach': '접근'}
+    kind = '지지선' if alert['kind'] == 'support' else '저항선'
+    fmt = price_formats(alert['symbol'], alert.get('currency'))[0]
+    print(f"[{alert['time']}] {alert['name']}({alert['symbol']}) {kind} {fmt(alert['level'])} "
+          f"{labels[alert['event']]} | 현재가 {fmt(alert['price'])} ({alert['distance_pct']:+.2f}%)", flush=True)
+
+
+def alert_sink(target):
+    """
+    알림 대상 문자열을 알림 함수로 변환
+
+    Parameters:
+    -----------
+    target : str
+        '-' (화면 출력), 'http://...' 또는 'https://...' (JSON POST 웹훅), 그 외는 NDJSON 파일 경로(이어 쓰기)
+
+    Returns:
+    --------
+    callable : sink(alert dict)
+    """
+    if target == '-':
+        return print_alert
+
+    if target.startswith(('http://', 'https://')):
+        from urllib.request import Request, urlopen
+
+        def post(alert):
+            request = Request(target, data=json.dumps(alert, ensure_ascii=False).encode('utf-8'),
+                              headers={'Content-Type': 'application/json'}, method='POST')
+            try:
+                with urlopen(request, timeout=5) as response:
+                    response.read()
+            except OSError as e:
+                METRICS.count('alert_errors')
+                print(f"⚠ 알림 전송 실패 ({target}): {e}")
+        return post
+
+    directory = os.path.dirname(os.path.abspath(target))
+    os.makedirs(directory, exist_ok=True)
+
+    def append(alert):
+        with open(target, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+    return append
+
+
+class LevelWatcher:
+    """
+    여러 종목의 최신 봉만 주기적으로 받아 지지/저항선을 증분 갱신하고 돌파/접근을 알리는 감시기
+
+    처음에 분석 기간 전체를 한 번 받은 뒤에는 종목마다 마지막 봉의 날짜부터만 요청하고
+    (장중 갱신된 마지막 봉 포함), append_bars()로 바뀐 구간의 피봇/클러스터만 다시 계산합니다.
+    분석 기간(days)을 벗어난 오래된 봉은 매번 버리므로 메모리와 레벨은 새로 analyze()한 것과 같게 유지됩니다.
+    Yahoo 데이터 소스는 AsyncFetcher의 스레드 풀과 HTTP 세션을 계속 재사용하고 (get_fetch_scheduler() 적용),
+    그 밖의 데이터 소스(--replay 등)는 history()로 읽습니다.
+
+    사용 예:
+        watcher = LevelWatcher([('005930.KS', '삼성전자', 'KRW')], sinks=[print_alert])
+        watcher.start()
+        watcher.run()
+    """
+
+    def __init__(self, entries, days=365, order=7, tolerance=0.015, max_levels=5, near_pct=WATCH_NEAR_PCT,
+                 interval='1d', pivot_engine='argrelextrema', sinks=None, concurrency=8, base_url=None,
+                 provider=None):
+        """
+        Parameters:
+        -----------
+        entries : list
+            (종목코드, 종목명, 통화) 목록
+        days : int
+            레벨 계산에 쓰는 기간 (일), 분봉은 INTRADAY_MAX_DAYS까지
+        order, tolerance, max_levels, pivot_engine :
+            analyze() 파라미터
+        near_pct : float
+            접근 알림 거리 (%)
+        interval : str
+            봉 간격
+        sinks : list, optional
+            알림 함수 목록 (기본값: [print_alert])
+        concurrency : int
+            동시 요청 수
+        base_url : str, optional
+            차트 API 주소 (기본값: YAHOO_CHART_URL, 로컬 테스트 서버 등), 주면 데이터 소스와 관계없이 사용
+        provider : DataProvider, optional
+            데이터 소스 (기본값: get_data_provider())
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"지원하지 않는 봉 간격입니다: {interval} ({', '.join(INTERVALS)})")
+        self.entries = list(entries)
+        self.days = min(days, INTRADAY_MAX_DAYS[interval] - 1) if interval in INTRADAY_MAX_DAYS else days
+        self.params = dict(order=order, tolerance=tolerance, max_levels=max_levels, pivot_engine=pivot_engine)
+        self.near_pct = near_pct
+        self.interval = interval
+        self.sinks = [print_alert] if sinks is None else list(sinks)
+        self.provider = provider or get_data_provider()
+        self.fetcher = None
+        if base_url is not None or isinstance(self.provider, YahooProvider):
+            self.fetcher = AsyncFetcher(concurrency=concurrency, base_url=base_url)
+        # {종목코드: {'analyzer', 'price', 'support', 'resistance'}}
+        self.states = {}
+
+    def close(self):
+        if self.fetcher is not None:
+            self.fetcher.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_date(self):
+        return (datetime.now() - timedelta(days=self.days)).strftime('%Y-%m-%d')
+
+    def _end_date(self):
+        # 오늘 봉까지 받도록 종료일은 내일
+        return (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def _fetch(self, requests):
+        """(종목코드, 시작일, 종료일) 요청마다 (종목코드, DataFrame 또는 None, 예외 또는 None) 생성"""
+        if self.fetcher is not None:
+            yield from self.fetcher.iter_fetch_sync(requests, self.interval)
+            return
+        for symbol, start_date, end_date in requests:
+            try:
+                yield symbol, self.provider.history(symbol, start_date, end_date, interval=self.interval), None
+            except Exception as e:
+                yield symbol, None, e
+
+    def start(self):
+        """
+        분석 기간 전체를 받아 종목별 증분 분석 상태 생성
+
+        Returns:
+        --------
+        dict : {종목코드: 오류 메시지} (받지 못해 감시에서 제외한 종목)
+        """
+        names = {symbol: (name, currency) for symbol, name, currency in self.entries}
+        start_date = self._start_date()
+        end_date = self._end_date()
+        failed = {}
+        with METRICS.stage('watch_start'):
+            requests = [(symbol, start_date, end_date) for symbol in names]
+            for symbol, df, error in self._fetch(requests):
+                if error is None and df.empty:
+                    error = ValueError("데이터가 없습니다")
+                if error is not None:
+                    failed[symbol] = f"{type(error).__name__}: {error}"
+                    continue
+                name, currency = names[symbol]
+                analyzer = SupportResistanceAnalyzer(symbol, start_date, ticker_name=name, currency=currency,
+                                                     cache=False, interval=self.interval)
+                results = analyzer.append_bars(df, **self.params)
+                self.states[symbol] = {'analyzer': analyzer, 'price': float(results['current_price']),
+                                       'support': analyzer.support_levels,
+                                       'resistance': analyzer.resistance_levels}
+        return failed
+
+    def poll(self):
+        """
+        모든 종목의 최신 봉을 받아 레벨을 갱신하고 알림 전송
+
+        Returns:
+        --------
+        list : 이번에 보낸 알림 dict 목록
+        """
+        end_date = self._end_date()
+        requests = [(symbol, state['analyzer'].df.index[-1].strftime('%Y-%m-%d'), end_date)
+                    for symbol, state in self.states.items()]
+        alerts = []
+        with METRICS.stage('watch_poll'):
+            for symbol, df, error in self._fetch(requests):
+                if error is not None:
+                    METRICS.count('watch_errors')
+                    continue
+                if df.empty:
+                    continue
+                alerts.extend(self._update(symbol, df))
+        for alert in alerts:
+            for sink in self.sinks:
+                sink(alert)
+        METRICS.count('alerts', len(alerts))
+        return alerts
+
+    def _update(self, symbol, df):
+        """한 종목에 새 봉 반영, 직전 레벨 기준으로 알림 생성"""
+        state = self.states[symbol]
+        analyzer = state['analyzer']
+        old = analyzer.df
+        if (len(df) <= len(old) and df.index.equals(old.index[-len(df):])
+                and np.array_equal(df['Close'].to_numpy(), old['Close'].to_numpy()[-len(df):])):
+            # 장 마감 후 등 바뀐 봉이 없으면 레벨 갱신 생략
+            return []
+        results = analyzer.append_bars(df, keep_from=self._start_date(), **self.params)
+        previous_price, price = state['price'], float(results['current_price'])
+        events = level_events(previous_price, price, state['support'], state['resistance'], self.near_pct)
+        state.update(price=price, support=analyzer.support_levels, resistance=analyzer.resistance_levels)
+
+        now = datetime.now().isoformat(timespec='seconds')
+        return [{'time': now, 'symbol': symbol, 'name': analyzer.ticker_name, 'currency': analyzer.currency,
+                 'event': event, 'kind': kind, 'level': float(level), 'price': price,
+                 'previous_price': previous_price, 'distance_pct': (price - level) / level * 100}
+                for event, kind, level in events]
+
+    def run(self, interval=WATCH_INTERVAL, iterations=None):
+        """
+        interval초마다 poll() 반복 (Ctrl+C 또는 iterations번 후 종료)
+
+        요청/계산 시간을 뺀 나머지는 잠들어 있으므로 감시 중 CPU 사용량은 poll() 비용에 비례합니다.
+        """
+        import time
+
+        count = 0
+        while True:
+            started = time.monotonic()
+            self.poll()
+            count += 1
+            if iterations is not None and count >= iterations:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def run_watch_cli(args):
+    """--watch 실시간 감시 실행"""
+    import io
+    from contextlib import redirect_stdout
+
+    entries = []
+    for spec in args.watch:
+        # 파일은 종목 목록 (KOSPI 등은 지수 이름과 겹치므로 종목명으로 검색)
+        if os.path.isfile(spec):
+            entries.extend(load_universe(spec))
+        else:
+            entries.append((spec, None, None, ''))
+
+    resolved = []
+    for ticker_input, name, currency, _ in entries:
+        if name is None:
+            try:
+                with redirect_stdout(io.StringIO()):
+                    ticker_input, name, currency = get_ticker_info(ticker_input)
+            except Exception as e:
+                print(f"✗ {ticker_input}: {e}")
+                continue
+        resolved.append((ticker_input, name, currency or currency_from_symbol(ticker_input)))
+    if not resolved:
+        print("\n오류: 감시할 종목이 없습니다.")
+        return
+
+    try:
+        sinks = [alert_sink(target) for target in args.alerts]
+    except OSError as e:
+        print(f"\n오류: 알림 대상을 열 수 없습니다: {e}")
+        return
+
+    with LevelWatcher(resolved, days=args.days, order=args.order, tolerance=args.tolerance,
+                      max_levels=args.max_levels, near_pct=args.near, interval=args.interval,
+                      pivot_engine=args.pivot_engine, sinks=sinks,
+                      concurrency=args.fetch_concurrency or 8) as watcher:
+        failed = watcher.start()
+        for symbol, error in failed.items():
+            print(f"✗ {symbol}: {error}")
+        print(f"✓ {len(watcher.states)}개 종목 감시 시작 ({args.watch_interval:g}초 간격, 접근 {args.near:g}%)")
+        try:
+            watcher.run(interval=args.watch_interval)
+        except KeyboardInterrupt:
+            print("\n감시 종료")
+
+
+# 분석 서버 (--serve)
+# 가격 데이터/분석 결과를 메모리에 보관하는 시간 (초) 및 최대 항목 수
+SERVER_TTL = 300
+SERVER_CACHE_ENTRIES = 1024
+SERVER_DEFAULT_ADDRESS = '127.0.0.1:8050'
+
+
+class _TTLCache:
+    """최근 사용 순서로 최대 max_entries개를 ttl초 동안 보관하는 메모리 캐시 (스레드 안전)"""
+
+    def __init__(self, ttl, max_entries=SERVER_CACHE_ENTRIES):
+        import threading
+        from collections import OrderedDict
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """보관 중인 값 (없거나 만료되면 None)"""
+        import time
+
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored, value = item
+            if time.monotonic() - stored > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        import time
+
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _init_server_worker():
+    """분석 서버 워커 초기화: 그래프 템플릿/폰트와 scipy를 미리 불러 둠"""
+    import signal
+
+    # Ctrl+C는 서버(부모 프로세스)가 받아 풀을 정리
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    get_chart_renderer()
+    import scipy.signal  # noqa: F401
+
+
+def _server_analyze(frame, info, interval, order, tolerance, max_levels, pivot_engine, chart=False,
+                    method='pivot'):
+    """
+    분석 서버 워커에서 레벨 계산 (chart=True면 그래프 PNG 바이트 반환)
+    """
+    import io
+    from contextlib import redirect_stdout
+
+    symbol, name, currency = info
+    with redirect_stdout(io.StringIO()):
+        analyzer = SupportResistanceAnalyzer(symbol, str(frame.index[0].date()), ticker_name=name,
+                                             currency=currency, cache=False, interval=interval)
+        analyzer.use_frame(frame)
+        results = analyzer.analyze(order=order, tolerance=tolerance, max_levels=max_levels,
+                                   pivot_engine=pivot_engine, method=method)
+        if chart:
+            # 워커마다 그림 템플릿 하나를 재사용
+            buffer = io.BytesIO()
+            get_chart_renderer(max_levels=max_levels).render(chart_series(analyzer), buffer, 'png')
+            return buffer.getvalue()
+
+    return {
+        'symbol': symbol, 'name': name, 'currency': currency, 'interval': interval,
+        'bars': len(frame), 'current_price': float(results['current_price']),
+        'levels': level_rows(results),
+    }
+
+
+class AnalysisServer:
+    """
+    지지/저항선 HTTP/JSON 서버
+
+    종목 리스트, 종목 검색 결과, 최근 가격 데이터와 분석 결과를 메모리에 두고,
+    같은 종목에 대한 동시 요청은 하나로 합치며(RequestCoalescer),
+    레벨 계산과 그래프 생성은 워커 프로세스 풀에서 실행합니다.
+
+    GET /resolve?q=삼성전자
+    GET /levels?q=삼성전자&days=365&order=7&tolerance=0.015&max_levels=5&interval=1d&engine=argrelextrema
+    GET /chart?q=...  (/levels와 같은 파라미터, PNG 이미지)
+    GET /health
+    """
+
+    def __init__(self, host='127.0.0.1', port=8050, workers=None, cache=None, ttl=SERVER_TTL):
         """
-        비슷한 가격대를 클러스터링하여 주요 지지/저항선 찾기
-        
         Parameters:
         -----------
-        levels : array
-            가격 레벨들
-        tolerance : float
-            클러스터링 허용 오차 (2% = 0.02)
-        
-        Returns:
-        --------
-        clustered_levels : list
-            클러스터링된 주요 레벨과 빈도수
+        host, port : str, int
+            접속 주소 (port=0이면 빈 포트 자동 선택)
+        workers : int, optional
+            분석 워커 프로세스 수 (기본값: CPU 코어 수)
+        cache : OHLCVCache or False, optional
+            주가 데이터 디스크 캐시 (SupportResistanceAnalyzer와 동일)
+        ttl : float
+            가격 데이터/분석 결과를 메모리에 보관하는 시간 (초)
         """
-        if len(levels) == 0:
-            return []
-        
-        levels_sorted = np.sort(levels)
-        clusters = []
-        current_cluster = [levels_sorted[0]]
-        
-        for level in levels_sorted[1:]:
-            # 현재 클러스터의 평균값과 비교
-            cluster_mean = np.mean(current_cluster)
-            if abs(level - cluster_mean) / cluster_mean <= tolerance:
-                current_cluster.append(level)
-            else:
-                clusters.append(current_cluster)
-                current_cluster = [level]
-        
-        clusters.append(current_cluster)
-        
-        # 각 클러스터의 평균값과 빈도수 계산
-        clustered_levels = []
-        for cluster in clusters:
-            avg_level = np.mean(cluster)
-            count = len(cluster)
-            clustered_levels.append((avg_level, count))
-        
-        # 빈도수로 정렬 (많이 나타날수록 강한 지지/저항선)
-        clustered_levels.sort(key=lambda x: x[1], reverse=True)
-        
-        return clustered_levels
-    
-    def analyze(self, order=5, tolerance=0.02, max_levels=5):
+        from concurrent.futures import ProcessPoolExecutor
+        from http.server import ThreadingHTTPServer
+
+        if cache is None:
+            cache = OHLCVCache() if get_data_provider().remote else False
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.frames = _TTLCache(ttl)
+        self.results = _TTLCache(ttl)
+        self.resolved = _TTLCache(RESOLVE_TTL)
+        self.coalescer = RequestCoalescer()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_server_worker)
+
+        self.httpd = ThreadingHTTPServer((host, port), _request_handler_class())
+        self.httpd.daemon_threads = True
+        self.httpd.app = self
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def warm(self):
+        """종목 리스트/검색 결과를 읽고 워커 프로세스를 미리 띄워 첫 요청의 지연을 없앰"""
+        from concurrent.futures import wait
+
+        get_symbol_directory()
+        _load_resolve_memo()
+        wait([self.pool.submit(os.getpid) for _ in range(self.workers)])
+
+    def resolve(self, query):
+        """종목 검색 (ValueError: 찾을 수 없음)"""
+        info = self.resolved.get(query)
+        if info is None:
+            info = self.coalescer.run(('resolve', query), lambda: get_ticker_info(query))
+            self.resolved.put(query, info)
+        return info
+
+    def frame(self, info, interval, start_date):
+        """가격 데이터 (메모리 → 디스크 캐시 → 네트워크 순서)"""
+        key = (info[0], interval, start_date)
+        df = self.frames.get(key)
+        if df is None:
+            def load():
+                analyzer = SupportResistanceAnalyzer(info[0], start_date, ticker_name=info[1],
+                                                     currency=info[2], cache=self.cache,
+                                                     interval=interval)
+                return analyzer.fetch_data()
+
+            df = self.coalescer.run(('frame',) + key, load)
+            self.frames.put(key, df)
+        return df
+
+    def analyze(self, params, chart=False):
+        """/levels, /chart 요청 처리 (params: parse_server_params() 결과)"""
+        info = self.resolve(params['q'])
+        start_date = (datetime.now() - timedelta(days=params['days'])).strftime('%Y-%m-%d')
+        key = ('chart' if chart else 'levels', info[0], start_date, params['interval'], params['order'],
+               params['tolerance'], params['max_levels'], params['engine'], params['method'])
+        result = self.results.get(key)
+        if result is None:
+            def compute():
+                df = self.frame(info, params['interval'], start_date)
+                return self.pool.submit(_server_analyze, df, info, params['interval'], params['order'],
+                                        params['tolerance'], params['max_levels'], params['engine'],
+                                        chart, params['method']).result()
+
+            result = self.coalescer.run(key, compute)
+            self.results.put(key, result)
+        return result
+
+    def handle(self, path, query):
         """
-        지지선/저항선 분석
-        
+        요청 하나 처리
+
         Parameters:
         -----------
-        order : int
-            피봇 찾기 파라미터
-        tolerance : float
-            클러스터링 허용 오차
-        max_levels : int
-            표시할 최대 지지/저항선 개수
+        path : str
+            요청 경로 (/resolve, /levels, /chart, /health)
+        query : dict
+            urllib.parse.parse_qs() 결과
+
+        Returns:
+        --------
+        tuple : (HTTP 상태 코드, Content-Type, 응답 바이트)
+                잘못된 파라미터는 400, 종목/데이터를 찾지 못하면 404
         """
-        if self.df is None:
-            self.fetch_data()
-        
-        print("\n지지선/저항선 분석 중...")
-        
-        # 피봇 포인트 찾기
-        local_min, local_max, min_idx, max_idx = self.find_pivots(order=order)
-        
-        print(f"발견된 지지선 후보: {len(local_min)}개")
-        print(f"발견된 저항선 후보: {len(local_max)}개")
-        
-        # 지지선 클러스터링
-        support_clusters = self.cluster_levels(local_min, tolerance)
-        self.support_levels = [level for level, count in support_clusters[:max_levels]]
-        
-        # 저항선 클러스터링
-        resistance_clusters = self.cluster_levels(local_max, tolerance)
-        self.resistance_levels = [level for level, count in resistance_clusters[:max_levels]]
-        
-        # 현재가
-        current_price = self.df['Close'].iloc[-1]
+        if path == '/health':
+            return _json_response(200, {'status': 'ok', 'frames': len(self.frames),
+                                        'results': len(self.results)})
+        if path not in ('/resolve', '/levels', '/chart'):
+            return _json_response(404, {'error': f"알 수 없는 경로입니다: {path}"})
 
-        # 통화 기호 설정
-        # 지수인지 확인
-        is_index = self.ticker.startswith('^')
+        try:
+            params = parse_server_params(query)
+        except ValueError as e:
+            return _json_response(400, {'error': str(e)})
 
-        if self.currency == 'USD':
-            currency_symbol = '$'
-            price_format = lambda x: f"${x:,.2f}"
-        elif self.currency == 'KRW':
-            if is_index:
-                currency_symbol = 'pt'
-                price_format = lambda x: f"{x:,.2f}pt"
-            else:
-                currency_symbol = '원'
-                price_format = lambda x: f"{x:,.0f}원"
-        else:
-            currency_symbol = self.currency
-            price_format = lambda x: f"{x:,.2f} {self.currency}"
+        try:
+            with METRICS.stage('serve_request'):
+                if path == '/resolve':
+                    symbol, name, currency = self.resolve(params['q'])
+                    return _json_response(200, {'symbol': symbol, 'name': name, 'currency': currency})
+                if path == '/levels':
+                    return _json_response(200, self.analyze(params))
+                return 200, 'image/png', self.analyze(params, chart=True)
+        except ValueError as e:
+            return _json_response(404, {'error': str(e)})
+        except Exception as e:
+            return _json_response(500, {'error': f"{type(e).__name__}: {e}"})
 
-        # 결과 출력
-        print("\n" + "="*60)
-        print(f"종목: {self.ticker_name} ({self.ticker})")
-        print(f"현재가: {price_format(current_price)}")
-        print("="*60)
+    def serve_forever(self):
+        self.httpd.serve_forever()
 
-        print("\n[주요 저항선 (Resistance Levels)]")
-        print("-" * 60)
-        for i, (level, count) in enumerate(resistance_clusters[:max_levels], 1):
-            distance = ((level - current_price) / current_price) * 100
-            strength = "강함" if count >= 3 else "보통" if count >= 2 else "약함"
-            print(f"{i}차 저항선: {price_format(level):>15} | "
-                  f"현재가 대비: {distance:>+6.2f}% | "
-                  f"강도: {strength} (터치 {count}회)")
+    def shutdown(self):
+        """요청 처리를 멈추고 워커 풀과 소켓 정리"""
+        self.httpd.shutdown()
+        self.close()
 
-        print("\n[주요 지지선 (Support Levels)]")
-        print("-" * 60)
-        for i, (level, count) in enumerate(support_clusters[:max_levels], 1):
-            distance = ((level - current_price) / current_price) * 100
-            strength = "강함" if count >= 3 else "보통" if count >= 2 else "약함"
-            print(f"{i}차 지지선: {price_format(level):>15} | "
-                  f"현재가 대비: {distance:>+6.2f}% | "
-                  f"강도: {strength} (터치 {count}회)")
+    def close(self):
+        self.httpd.server_close()
+        self.pool.shutdown(wait=True, cancel_futures=True)
 
-        print("="*60)
-        
-        return {
-            'support': support_clusters[:max_levels],
-            'resistance': resistance_clusters[:max_levels],
-            'current_price': current_price
+
+def parse_server_params(query):
+    """
+    /levels, /chart 쿼리 문자열 검사 및 변환
+
+    Parameters:
+    -----------
+    query : dict
+        urllib.parse.parse_qs() 결과
+
+    Returns:
+    --------
+    dict : q, days, order, tolerance, max_levels, interval, engine, method
+    """
+    def value(name, default=None):
+        values = query.get(name)
+        return values[-1] if values else default
+
+    q = value('q') or value('symbol')
+    if not q:
+        raise ValueError("종목을 지정하세요 (q=종목명 또는 종목 코드)")
+    try:
+        params = {
+            'q': q,
+            'days': int(value('days', 365)),
+            'order': int(value('order', 7)),
+            'tolerance': float(value('tolerance', 0.015)),
+            'max_levels': int(value('max_levels', 5)),
+            'interval': value('interval', '1d'),
+            'engine': value('engine', 'argrelextrema'),
+            'method': value('method', 'pivot'),
         }
-    
-    def plot(self, figsize=(14, 8)):
-        """
-        지지선/저항선 그래프 그리기
+    except ValueError as e:
+        raise ValueError(f"잘못된 파라미터: {e}") from None
+    if params['interval'] not in INTERVALS:
+        raise ValueError(f"지원하지 않는 간격입니다: {params['interval']} ({', '.join(INTERVALS)})")
+    if params['engine'] not in PIVOT_ENGINES:
+        raise ValueError(f"지원하지 않는 피봇 엔진입니다: {params['engine']} ({', '.join(PIVOT_ENGINES)})")
+    if params['method'] not in LEVEL_METHODS:
+        raise ValueError(f"지원하지 않는 레벨 탐지 방법입니다: {params['method']} ({', '.join(LEVEL_METHODS)})")
+    if params['days'] <= 0 or params['order'] <= 0 or params['max_levels'] <= 0 or params['tolerance'] <= 0:
+        raise ValueError("days, order, max_levels, tolerance는 양수여야 합니다")
+    return params
 
-        Parameters:
-        -----------
-        figsize : tuple
-            그래프 크기
-        """
-        if self.df is None:
-            print("데이터가 없습니다. analyze()를 먼저 실행하세요.")
-            return
 
-        fig, ax = plt.subplots(figsize=figsize)
+def _json_response(status, payload):
+    return status, 'application/json; charset=utf-8', json.dumps(payload, ensure_ascii=False).encode('utf-8')
 
-        # 주가 차트
-        ax.plot(self.df.index, self.df['Close'], label='Close Price',
-                linewidth=1.5, color='#2E86AB', alpha=0.8)
 
-        # 현재가
-        current_price = self.df['Close'].iloc[-1]
+_REQUEST_HANDLER = None
 
-        # 통화별 포맷 설정
-        is_index = self.ticker.startswith('^')
 
-        if self.currency == 'USD':
-            price_label_format = lambda x: f'${x:,.2f}'
-            y_axis_format = lambda x, p: f'${x:,.0f}'
-            currency_label = 'USD'
-        elif self.currency == 'KRW':
-            if is_index:
-                price_label_format = lambda x: f'{x:,.2f}pt'
-                y_axis_format = lambda x, p: f'{x:,.1f}'
-                currency_label = 'Points'
-            else:
-                price_label_format = lambda x: f'{x:,.0f}'
-                y_axis_format = lambda x, p: f'{x:,.0f}'
-                currency_label = 'KRW'
-        else:
-            price_label_format = lambda x: f'{x:,.2f}'
-            y_axis_format = lambda x, p: f'{x:,.2f}'
-            currency_label = self.currency
-
-        ax.axhline(y=current_price, color='black', linestyle='--',
-                   linewidth=1, label=f'Current: {price_label_format(current_price)}', alpha=0.7)
-
-        # 저항선 그리기
-        colors_resistance = ['#A23B72', '#C73E1D', '#F18F01', '#8B4513', '#DC143C']
-        for i, level in enumerate(self.resistance_levels):
-            color = colors_resistance[i % len(colors_resistance)]
-            ax.axhline(y=level, color=color, linestyle='-',
-                      linewidth=2, label=f'R{i+1}: {price_label_format(level)}', alpha=0.6)
-
-        # 지지선 그리기
-        colors_support = ['#06A77D', '#2E8B57', '#20B2AA', '#3CB371', '#00CED1']
-        for i, level in enumerate(self.support_levels):
-            color = colors_support[i % len(colors_support)]
-            ax.axhline(y=level, color=color, linestyle='-',
-                      linewidth=2, label=f'S{i+1}: {price_label_format(level)}', alpha=0.6)
-
-        # 그래프 꾸미기
-        ax.set_title(f'{self.ticker_name} - Support & Resistance Levels',
-                    fontsize=16, fontweight='bold', pad=20)
-        ax.set_xlabel('Date', fontsize=12)
-        ax.set_ylabel(f'Price ({currency_label})', fontsize=12)
-        ax.legend(loc='best', fontsize=10, framealpha=0.9)
-        ax.grid(True, alpha=0.3)
+def _request_handler_class():
+    """AnalysisServer.handle()로 요청을 넘기는 HTTP 핸들러 (http.server는 서버를 만들 때 불러옴)"""
+    global _REQUEST_HANDLER
+
+    if _REQUEST_HANDLER is None:
+        from http.server import BaseHTTPRequestHandler
+        from urllib.parse import parse_qs, urlparse
+
+        class AnalysisRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
 
-        # y축 포맷
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(y_axis_format))
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                status, content_type, body = self.server.app.handle(parsed.path, parse_qs(parsed.query))
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
 
-        plt.tight_layout()
-        filename = f'{self.ticker}_support_resistance.png'
-        plt.savefig(filename, dpi=150, bbox_inches='tight')
-        print(f"\n그래프 저장 완료: {filename}")
-        plt.show()
+        _REQUEST_HANDLER = AnalysisRequestHandler
+    return _REQUEST_HANDLER
+
+
+def run_server_cli(args, cache=None):
+    """--serve 분석 서버 실행 (Ctrl+C로 종료)"""
+    host, _, port = args.serve.rpartition(':')
+    try:
+        port = int(port)
+    except ValueError:
+        print(f"\n오류: 잘못된 주소입니다: {args.serve} (예: 8050, 0.0.0.0:8050)")
+        return
 
-        return fig
+    server = AnalysisServer(host or '127.0.0.1', port, workers=args.workers, cache=cache,
+                            ttl=args.serve_ttl)
+    print("분석 서버 준비 중 (종목 리스트, 워커 프로세스)...")
+    server.warm()
+    print(f"✓ 분석 서버 실행 중: {server.url} (워커 {server.workers}개, Ctrl+C로 종료)")
+    print(f"  {server.url}/levels?q=삼성전자")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n분석 서버 종료")
+    finally:
+        server.close()
 
 
 def main():
@@ -736,6 +6201,11 @@ def main():
   %(prog)s AAPL                   # 티커 심볼
   %(prog)s 네이버 -d 180           # 180일 데이터
   %(prog)s TSLA -o 10 -t 0.02     # 민감도 조정
+  %(prog)s --universe KOSPI       # 코스피 전체 종목 배치 분석
+  %(prog)s --universe list.txt -w 8 --output result.csv
+  %(prog)s --serve 8050 -w 4        # HTTP/JSON 분석 서버
+  %(prog)s --screen support --within 1.5 --min-touches 3 --market KOSDAQ
+  %(prog)s 삼성전자 -d 3650 --walk-forward 250 20 20 --orders 5 7 10 --tolerances 0.01 0.02
 
 종목 검색 방식:
   1. 로컬 캐시: 주요 종목은 즉시 검색 (빠름)
@@ -754,7 +6224,8 @@ def main():
         """
     )
 
-    parser.add_argument('ticker', type=str, help='종목명 또는 종목 코드 (예: 삼성전자, 005930.KS, 애플, AAPL)')
+    parser.add_argument('ticker', type=str, nargs='?',
+                        help='종목명 또는 종목 코드 (예: 삼성전자, 005930.KS, 애플, AAPL)')
     parser.add_argument('-d', '--days', type=int, default=365,
                         help='분석 기간 (일) (기본값: 365)')
     parser.add_argument('-o', '--order', type=int, default=7,
@@ -763,34 +6234,298 @@ def main():
                         help='클러스터링 허용 오차 (기본값: 0.015)')
     parser.add_argument('-m', '--max-levels', type=int, default=5,
                         help='표시할 최대 지지/저항선 개수 (기본값: 5)')
+    parser.add_argument('-i', '--interval', choices=INTERVALS, default='1d',
+                        help='봉 간격 (분봉: 1m, 5m, 1h 등, 기본값: 1d)')
+    parser.add_argument('--method', choices=LEVEL_METHODS, default='pivot',
+                        help='레벨 탐지 방법 (volume: 고가~저가 볼륨 프로파일의 고거래량 노드) (기본값: pivot)')
+    parser.add_argument('--pivot-engine', choices=PIVOT_ENGINES, default='argrelextrema',
+                        help='피봇 탐지 엔진 (window: O(n) 슬라이딩 윈도우, 큰 order에 유리) (기본값: argrelextrema)')
+    parser.add_argument('-u', '--universe', type=str,
+                        help='배치 분석 대상: KRX, KOSPI, KOSDAQ 또는 종목 목록 파일')
+    parser.add_argument('--panel', action='store_true',
+                        help='배치 분석을 워커 프로세스 대신 날짜를 맞춘 종가 행렬 하나로 한 번에 계산 '
+                             '(--method pivot 레벨 분석만, -w는 수집 스레드 수)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='배치 분석 워커 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='분석 결과 파일, 확장자로 형식 결정: .csv .ndjson .parquet .arrow '
+                             '(기본값: 배치 분석은 universe_<대상>_<날짜>.csv)')
+    parser.add_argument('--shard', type=str, default=None, metavar='I/N',
+                        help='배치 분석 종목을 N개로 나눈 중 I번째만 실행 (결과는 <output>.shard-I-of-N.*, '
+                             '여러 서버에서 나누어 실행)')
+    parser.add_argument('--merge', type=str, default=None, metavar='OUTPUT',
+                        help='--shard 결과를 OUTPUT 하나로 합치기 (빠지거나 실패한 샤드 확인)')
+    parser.add_argument('--refresh-listing', action='store_true',
+                        help='한국 주식 종목 리스트를 새로 내려받음 (기본: 24시간 동안 로컬 파일 사용)')
+    parser.add_argument('--check-startup', type=float, nargs='?', const=STARTUP_BUDGET_MS, default=None,
+                        metavar='MS', help=f'모듈 import 시간 예산 검사 (기본 예산: {STARTUP_BUDGET_MS}ms)')
+    parser.add_argument('--fetch-concurrency', type=int, default=None, metavar='N',
+                        help='배치 분석 시 주가 데이터를 N개씩 비동기로 동시에 수집')
+    parser.add_argument('--fetch-batch', type=int, default=None, metavar='N',
+                        help='배치 분석 시 주가 데이터를 N개 종목씩 묶어서 수집 (yf.download)')
+    parser.add_argument('--fetch-rate', type=float, default=None, metavar='RATE',
+                        help=f'원격 요청 초당 최대 횟수, 0이면 제한 없음 (기본값: {FETCH_RATE:g})')
+    parser.add_argument('--replay', type=str, default=None, metavar='DIR',
+                        help='네트워크 대신 DIR의 CSV/Parquet/Arrow 파일로 실행 (종목 검색, 종목 리스트 포함)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='주가 데이터 로컬 캐시를 사용하지 않음')
+    parser.add_argument('--cache-max-mb', type=int, default=None,
+                        help='주가 데이터 캐시 최대 크기 (MB) (기본값: 512)')
+    parser.add_argument('--clear-cache', nargs='*', metavar='SYMBOL', default=None,
+                        help='주가 데이터 캐시 삭제 (종목 코드 생략 시 전체 삭제)')
+    parser.add_argument('--metrics', choices=('json', 'text'), default=None,
+                        help='단계별 소요 시간/카운터 출력 (배치 분석은 단계별 백분위수)')
+    parser.add_argument('--metrics-file', type=str, default=None,
+                        help='--metrics 결과를 저장할 파일 (기본값: 화면 출력)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help='주요 단계 cProfile/tracemalloc 결과를 DIR에 저장')
+    parser.add_argument('--walk-forward', type=int, nargs=3, default=None,
+                        metavar=('WINDOW', 'STEP', 'HORIZON'),
+                        help='워크 포워드 평가 (예: 250 20 20 = 250봉으로 계산, 20봉마다, 이후 20봉 평가)')
+    parser.add_argument('--orders', type=int, nargs='+', default=None,
+                        help='워크 포워드 평가할 order 목록 (기본값: -o 값)')
+    parser.add_argument('--tolerances', type=float, nargs='+', default=None,
+                        help='워크 포워드 평가할 tolerance 목록 (기본값: -t 값)')
+    parser.add_argument('--timeframes', type=str, nargs='+', default=None, choices=TIMEFRAME_MINUTES,
+                        metavar='TF', help='다중 시간 프레임 분석 (예: 1d 1wk 1mo, 가장 짧은 봉만 수집)')
+    parser.add_argument('--index', type=str, default=None, metavar='PATH',
+                        help='레벨 인덱스 파일 (기본값: 캐시 디렉토리의 level_index.npy)')
+    parser.add_argument('--screen', choices=LEVEL_KINDS, default=None,
+                        help='레벨 인덱스에서 현재가가 지지선 위/저항선 아래 --within%% 이내인 종목 검색')
+    parser.add_argument('--within', type=float, default=1.5, metavar='PCT',
+                        help='--screen 거리 (%%) (기본값: 1.5)')
+    parser.add_argument('--min-touches', type=int, default=1,
+                        help='--screen 최소 터치 횟수 (기본값: 1)')
+    parser.add_argument('--market', type=str, nargs='+', default=None,
+                        help='--screen 시장 구분 (예: KOSPI KOSDAQ)')
+    parser.add_argument('--charts', type=str, default=None, metavar='DIR',
+                        help='그래프 저장 디렉토리 (배치 분석은 지정 시 워커에서 종목별 렌더링)')
+    parser.add_argument('--chart-format', choices=CHART_FORMATS, default='png',
+                        help='그래프 형식 (json: 프런트엔드용 가격/레벨 데이터) (기본값: png)')
+    parser.add_argument('--chart-dpi', type=int, default=CHART_DPI,
+                        help=f'PNG 그래프 해상도 (기본값: {CHART_DPI})')
+    parser.add_argument('--watch', type=str, nargs='+', default=None, metavar='SYMBOL',
+                        help='실시간 감시: 최신 봉만 주기적으로 받아 지지/저항선 돌파/접근 알림 '
+                             '(종목명/코드 또는 종목 목록 파일)')
+    parser.add_argument('--watch-interval', type=float, default=WATCH_INTERVAL, metavar='SEC',
+                        help=f'--watch 갱신 간격 (초) (기본값: {WATCH_INTERVAL:g})')
+    parser.add_argument('--near', type=float, default=WATCH_NEAR_PCT, metavar='PCT',
+                        help=f'--watch 접근 알림 거리 (%%) (기본값: {WATCH_NEAR_PCT:g})')
+    parser.add_argument('--alerts', type=str, nargs='+', default=['-'], metavar='TARGET',
+                        help="--watch 알림 대상: '-' 화면, NDJSON 파일 경로, http(s):// 웹훅 (기본값: -)")
+    parser.add_argument('--serve', type=str, nargs='?', const=SERVER_DEFAULT_ADDRESS, default=None,
+                        metavar='[HOST:]PORT',
+                        help=f'HTTP/JSON 분석 서버 실행 (기본 주소: {SERVER_DEFAULT_ADDRESS}, 워커 수는 -w)')
+    parser.add_argument('--serve-ttl', type=float, default=SERVER_TTL, metavar='SEC',
+                        help=f'분석 서버가 가격 데이터/결과를 메모리에 보관하는 시간 (초) (기본값: {SERVER_TTL})')
 
     args = parser.parse_args()
 
+    if args.check_startup is not None:
+        raise SystemExit(0 if check_startup_budget(args.check_startup) else 1)
+
+    if args.fetch_rate is not None:
+        if args.fetch_rate < 0:
+            parser.error('--fetch-rate는 0 이상이어야 합니다.')
+        set_fetch_scheduler(FetchScheduler(rate=args.fetch_rate or None))
+
+    if args.panel and (args.method != 'pivot' or args.walk_forward is not None or args.charts):
+        parser.error('--panel은 --method pivot 레벨 분석만 지원합니다 (--walk-forward, --charts 제외).')
+
+    if args.replay:
+        try:
+            set_data_provider(ReplayProvider(args.replay))
+        except ValueError as e:
+            parser.error(str(e))
+        # 워커 프로세스도 같은 디렉토리를 재생
+        os.environ['SR_ANALYZER_REPLAY_DIR'] = os.path.abspath(args.replay)
+        print(f"✓ 로컬 데이터 재생: {args.replay}")
+
+    if args.no_cache or args.replay:
+        cache = False
+    else:
+        cache = OHLCVCache(max_bytes=args.cache_max_mb * 1024 * 1024 if args.cache_max_mb else None)
+
+    if args.refresh_listing:
+        get_krx_stock_list(refresh=True)
+
+    if args.clear_cache is not None:
+        if not args.clear_cache:
+            clear_resolve_memo()
+        removed = OHLCVCache().clear(args.clear_cache)
+        print(f"✓ 캐시 {removed}개 항목 삭제 완료")
+        return
+
+    if args.screen is not None:
+        run_screen_cli(args)
+        return
+
+    if args.merge is not None:
+        run_merge_cli(args)
+        return
+
+    if args.watch:
+        run_watch_cli(args)
+        return
+
+    if not args.universe and not args.ticker and args.serve is None:
+        parser.error('종목명, --universe, --watch 또는 --serve 중 하나를 지정하세요.')
+
+    # 배치 분석은 워커 프로세스에서 각자 프로파일링
+    if args.profile and not args.universe and args.serve is None:
+        METRICS.start_profiling(args.profile)
+    try:
+        if args.serve is not None:
+            run_server_cli(args, cache)
+        elif args.universe:
+            run_universe_cli(args, cache)
+        else:
+            run_ticker_cli(args, cache)
+    finally:
+        report_metrics(args)
+
+
+# 분석 전용 경로(모듈 import)의 시작 시간 예산
+STARTUP_BUDGET_MS = 200
+HEAVY_MODULES = ('pandas', 'matplotlib', 'yfinance', 'scipy', 'FinanceDataReader', 'requests')
+
+
+def measure_import_time(module='support_resistance_analyzer'):
+    """
+    새 인터프리터에서 `python -X importtime`으로 모듈 import 시간 측정
+
+    Parameters:
+    -----------
+    module : str
+        측정할 모듈 이름
+
+    Returns:
+    --------
+    tuple : (모듈 import 누적 시간 (ms), import된 최상위 패키지 집합)
+    """
+    import subprocess
+    import sys
+
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"모듈 import 실패: {proc.stderr.strip().splitlines()[-1:]}")
+
+    total_us = None
+    packages = set()
+    for line in proc.stderr.splitlines():
+        # 형식: "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        packages.add(name.split('.')[0])
+        if name == module:
+            total_us = int(cumulative)
+
+    return (total_us or 0) / 1000, packages
+
+
+def check_startup_budget(budget_ms=STARTUP_BUDGET_MS):
+    """
+    분석 전용 import 경로가 시간 예산 안에 있고 무거운 모듈을 불러오지 않는지 확인
+
+    Parameters:
+    -----------
+    budget_ms : float
+        허용 import 시간 (ms)
+
+    Returns:
+    --------
+    bool : 통과 여부
+    """
+    elapsed_ms, packages = measure_import_time()
+    heavy = [name for name in HEAVY_MODULES if name in packages]
+
+    print(f"모듈 import 시간: {elapsed_ms:.1f}ms (예산 {budget_ms:.0f}ms)")
+    if heavy:
+        print(f"✗ import 시점에 불러오면 안 되는 모듈: {', '.join(heavy)}")
+    passed = elapsed_ms <= budget_ms and not heavy
+    print("✓ 시작 시간 예산 통과" if passed else "✗ 시작 시간 예산 초과")
+    return passed
+
+
+def run_ticker_cli(args, cache=None):
+    """종목 하나 분석 실행 (검색, 데이터 수집, 분석, 그래프)"""
     print("="*60)
     print("주식 지지선/저항선 분석 프로그램")
     print("Support & Resistance Level Analyzer")
     print("="*60)
 
+    start_date = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
+
     try:
         # 종목 정보 가져오기 (코드, 이름, 통화)
-        ticker, ticker_name, currency = get_ticker_info(args.ticker)
+        ticker, ticker_name, currency = get_ticker_info(args.ticker, start_date)
     except ValueError as e:
         print(f"\n오류: {e}")
         return
 
-    start_date = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    interval = args.interval
+    if args.timeframes:
+        # 가장 짧은 시간 프레임만 받고 나머지는 변환
+        interval = min(args.timeframes, key=TIMEFRAME_MINUTES.get)
+        if interval not in INTERVALS:
+            print(f"\n오류: 가장 짧은 시간 프레임은 {', '.join(INTERVALS)} 중 하나여야 합니다: {interval}")
+            return
 
     # 분석기 생성
-    analyzer = SupportResistanceAnalyzer(ticker, start_date, ticker_name=ticker_name, currency=currency)
+    analyzer = SupportResistanceAnalyzer(ticker, start_date, ticker_name=ticker_name, currency=currency,
+                                         cache=cache, interval=interval)
 
     # 데이터 가져오기
     analyzer.fetch_data()
 
+    params = walk_forward_params(args)
+    if params is not None:
+        try:
+            table = analyzer.walk_forward(**params)
+        except ValueError as e:
+            print(f"\n오류: {e}")
+            return
+        print(f"\n워크 포워드 평가 ({table.attrs['windows']}개 구간)")
+        print("-" * 60)
+        print(table.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+        return
+
+    if args.timeframes:
+        print_multi_timeframe(analyzer, analyzer.multi_timeframe(
+            args.timeframes, order=args.order, tolerance=args.tolerance, max_levels=args.max_levels,
+            pivot_engine=args.pivot_engine))
+        return
+
     # 지지선/저항선 분석
-    results = analyzer.analyze(order=args.order, tolerance=args.tolerance, max_levels=args.max_levels)
+    results = analyzer.analyze(order=args.order, tolerance=args.tolerance, max_levels=args.max_levels,
+                               pivot_engine=args.pivot_engine, method=args.method)
+
+    # 레벨 인덱스에 이 종목만 갱신
+    skip = level_index_skip_reason(interval, method=args.method)
+    if skip is None:
+        index = LevelIndex.load(args.index)
+        index.update(ticker, results, name=ticker_name)
+        index.save()
+    else:
+        print(f"레벨 인덱스 갱신 안 함: {skip}")
+
+    if args.output:
+        try:
+            write_results(level_records(results, ticker, ticker_name), args.output)
+            print(f"\n결과 저장 완료: {args.output}")
+        except ValueError as e:
+            print(f"\n오류: {e}")
 
     # 그래프 그리기
-    analyzer.plot()
+    filename = f'{ticker}_support_resistance.{args.chart_format}'
+    if args.charts:
+        os.makedirs(args.charts, exist_ok=True)
+        filename = chart_path(args.charts, ticker, args.chart_format)
+    analyzer.plot(output=filename, dpi=args.chart_dpi)
 
     print("\n매매 판단 가이드:")
     print("-" * 60)
@@ -801,5 +6536,222 @@ def main():
     print("-" * 60)
 
 
+def print_multi_timeframe(analyzer, result):
+    """multi_timeframe() 결과 출력 (시간 프레임별 레벨, 컨플루언스)"""
+    label, _, _ = price_formats(analyzer.ticker, analyzer.currency)
+    print(f"\n현재가: {label(result['current_price'])}")
+    for timeframe, levels in result['timeframes'].items():
+        print(f"\n[{timeframe}] {levels['bars']}봉, order={levels['order']}")
+        for kind, name in (('resistance', '저항선'), ('support', '지지선')):
+            text = ', '.join(f"{label(level)}({count})" for level, count in levels[kind]) or '-'
+            print(f"  {name}: {text}")
+
+    print("\n컨플루언스 (여러 시간 프레임이 겹치는 레벨):")
+    print("-" * 60)
+    if not result['confluence']:
+        print("  없음")
+    for zone in result['confluence']:
+        name = '지지' if zone['kind'] == 'support' else '저항'
+        print(f"  {name} {label(zone['level'])} ({zone['distance_pct']:+.2f}%) "
+              f"- {'/'.join(zone['timeframes'])}, 터치 {zone['touches']}회")
+
+
+def report_metrics(args):
+    """--metrics/--profile 결과 출력 (main() 종료 시)"""
+    if METRICS.profiling:
+        for path in METRICS.stop_profiling():
+            print(f"프로파일 저장: {path}")
+    elif args.profile and args.universe:
+        print(f"프로파일 저장: {args.profile}/worker-<pid>/")
+
+    if args.metrics is None:
+        return
+    if args.metrics == 'json':
+        text = json.dumps(METRICS.summary(), ensure_ascii=False, indent=2)
+    else:
+        text = METRICS.format_summary()
+    if args.metrics_file:
+        with open(args.metrics_file, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"계측 결과 저장: {args.metrics_file}")
+    else:
+        print("\n[단계별 계측]")
+        print(text)
+
+
+def walk_forward_params(args):
+    """--walk-forward 옵션을 walk_forward() 인자 dict로 변환 (옵션이 없으면 None)"""
+    if args.walk_forward is None:
+        return None
+    window, step, horizon = args.walk_forward
+    return {
+        'orders': args.orders or [args.order],
+        'tolerances': args.tolerances or [args.tolerance],
+        'window': window, 'step': step, 'horizon': horizon,
+        'max_levels': args.max_levels,
+    }
+
+
+def run_universe_cli(args, cache=None):
+    """--universe 배치 분석 실행 및 결과 저장"""
+    try:
+        entries = load_universe(args.universe)
+    except ValueError as e:
+        print(f"\n오류: {e}")
+        return
+
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
+
+    output = args.output
+    if output is None:
+        label = os.path.splitext(os.path.basename(args.universe))[0]
+        suffix = '' if args.interval == '1d' else f"_{args.interval}"
+        output = f"universe_{label}{suffix}_{end_date}.csv"
+    try:
+        # 오래 걸리는 분석 전에 결과 형식 확인
+        result_format(output)
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        print(f"\n오류: {e}")
+        return
+
+    manifest = None
+    if shard is not None:
+        import socket
+
+        # 샤드마다 같은 종목 목록/파라미터인지 merge에서 확인할 수 있도록 전체 목록 기준으로 요약
+        index, count = shard
+        run_id = universe_run_id(entries, universe=args.universe, start_date=start_date, end_date=end_date,
+                                 interval=args.interval, order=args.order, tolerance=args.tolerance,
+                                 max_levels=args.max_levels, method=args.method,
+                                 pivot_engine=args.pivot_engine, walk_forward=walk_forward_params(args))
+        total = len({entry[0] for entry in entries})
+        entries = shard_entries(entries, index, count)
+        merged_output, output = output, shard_path(output, index, count)
+        manifest = {'shard': index, 'shards': count, 'run_id': run_id, 'status': 'running',
+                    'universe': args.universe, 'symbols': len(entries), 'universe_symbols': total,
+                    'start_date': start_date, 'end_date': end_date, 'interval': args.interval,
+                    'remote': get_data_provider().remote, 'method': args.method, 'output': os.path.basename(output),
+                    'host': socket.gethostname(), 'updated': datetime.now().isoformat(timespec='seconds')}
+        write_shard_manifest(merged_output, manifest)
+        print(f"샤드 {index}/{count}: 전체 {total}개 중 {len(entries)}개 종목")
+
+    try:
+        if args.panel:
+            table = run_universe_panel(entries, start_date, end_date, order=args.order,
+                                       tolerance=args.tolerance, max_levels=args.max_levels,
+                                       workers=args.workers, cache=cache,
+                                       fetch_concurrency=args.fetch_concurrency, fetch_batch=args.fetch_batch,
+                                       interval=args.interval)
+        else:
+            table = run_universe(entries, start_date, end_date, order=args.order,
+                                 tolerance=args.tolerance, max_levels=args.max_levels,
+                                 workers=args.workers, cache=cache, pivot_engine=args.pivot_engine,
+                                 fetch_concurrency=args.fetch_concurrency, fetch_batch=args.fetch_batch,
+                                 walk_forward=walk_forward_params(args), profile_dir=args.profile,
+                                 interval=args.interval, chart_dir=args.charts,
+                                 chart_format=args.chart_format, chart_dpi=args.chart_dpi, method=args.method)
+        write_results(table, output)
+    except Exception as e:
+        if manifest is not None:
+            manifest.update(status='failed', error=f"{type(e).__name__}: {e}",
+                            updated=datetime.now().isoformat(timespec='seconds'))
+            write_shard_manifest(merged_output, manifest)
+        raise
+    print(f"\n결과 저장 완료: {output} ({len(table)}행)")
+
+    if manifest is not None:
+        # 레벨 인덱스는 --merge에서 합친 결과로 한 번에 갱신
+        manifest.update(status='complete', rows=len(table),
+                        errors=int(table.loc[table['status'] == 'error', 'symbol'].nunique()),
+                        updated=datetime.now().isoformat(timespec='seconds'))
+        path = write_shard_manifest(merged_output, manifest)
+        print(f"샤드 매니페스트 저장: {path}")
+        return
+
+    if args.walk_forward is None:
+        skip = level_index_skip_reason(args.interval, method=args.method)
+        if skip is not None:
+            print(f"레벨 인덱스 갱신 안 함: {skip}")
+            return
+        index = LevelIndex.load(args.index)
+        refreshed = index.update_table(table)
+        index.save()
+        print(f"레벨 인덱스 갱신: {refreshed}개 종목 ({index.path}, 전체 {len(index)}개 레벨)")
+
+
+def run_merge_cli(args):
+    """--merge 샤드 결과 합치기 (빠진/실패한 샤드가 있으면 다시 실행할 샤드를 출력하고 종료 코드 1)"""
+    output = args.merge
+    try:
+        table, report = merge_shards(output)
+    except ValueError as e:
+        print(f"\n오류: {e}")
+        raise SystemExit(1)
+
+    count = report['shards']
+    print(f"샤드 {len(report['complete'])}/{count}개 완료 (실행 {report['run_id']})")
+    if table is None:
+        for label, shards in (('매니페스트 없음', report['missing']), ('실행 중 또는 중단됨', report['running']),
+                              ('다른 실행(종목 목록/기간/파라미터가 다름)', report['stale'])):
+            if shards:
+                print(f"  ✗ {label}: {', '.join(map(str, shards))}")
+        for index, reason in report['failed'].items():
+            print(f"  ✗ 샤드 {index} 실패: {reason}")
+        rerun = sorted(report['missing'] + report['running'] + report['stale'] + list(report['failed']))
+        print("\n다시 실행할 샤드:")
+        for index in rerun:
+            print(f"  --shard {index}/{count}")
+        raise SystemExit(1)
+
+    write_results(table, output)
+    print(f"✓ 결과 저장 완료: {output} ({report['rows']}행, 실패 종목 {report['errors']}개)")
+
+    skip = level_index_skip_reason(report['interval'], report['remote'], report['method'])
+    if skip is not None:
+        print(f"레벨 인덱스 갱신 안 함: {skip}")
+    elif 'kind' in table.columns and 'rank' in table.columns:
+        index = LevelIndex.load(args.index)
+        refreshed = index.update_table(table)
+        index.save()
+        print(f"레벨 인덱스 갱신: {refreshed}개 종목 ({index.path}, 전체 {len(index)}개 레벨)")
+
+
+def run_screen_cli(args):
+    """--screen 레벨 인덱스 검색 결과 출력 (--output 지정 시 파일로 저장)"""
+    import time
+
+    index = LevelIndex.load(args.index)
+    if not len(index):
+        print(f"\n레벨 인덱스가 비어 있습니다: {index.path} (--universe 배치 분석을 먼저 실행하세요)")
+        return
+
+    started = time.perf_counter()
+    hits = index.near(args.screen, args.within, min_count=args.min_touches, markets=args.market)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    side = '위' if args.screen == 'support' else '아래'
+    label = '지지선' if args.screen == 'support' else '저항선'
+    print(f"\n{label} {side} {args.within}% 이내, 터치 {args.min_touches}회 이상"
+          f"{' (' + ', '.join(args.market) + ')' if args.market else ''}: "
+          f"{len(np.unique(hits['symbol']))}개 종목, {len(hits)}개 레벨 ({elapsed_ms:.2f}ms)")
+    if not len(hits):
+        return
+
+    table = level_records_frame(hits)
+    columns = ['symbol', 'name', 'market', 'kind', 'rank', 'level', 'count', 'current_price',
+               'distance_pct', 'updated']
+    if args.output:
+        try:
+            write_results(table[columns], args.output)
+        except ValueError as e:
+            print(f"\n오류: {e}")
+            return
+        print(f"결과 저장 완료: {args.output}")
+    else:
+        print(table[columns].to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,135 @@
+"""
+비동기 데이터 수집 테스트 (로컬 HTTP 서버가 Yahoo 차트 API 응답을 흉내 냄)
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+class ChartStandIn(ThreadingHTTPServer):
+    """/v8/finance/chart/<종목> 요청에 고정된 JSON을 돌려주는 로컬 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.02):
+        super().__init__(('127.0.0.1', 0), _ChartHandler)
+        self.delay = delay
+        self.hits = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _ChartHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        symbol = parsed.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            self.server.hits.append((symbol, self.client_address[1]))
+        time.sleep(self.server.delay)
+
+        if symbol.startswith('BAD'):
+            code, payload = 404, {'chart': {'result': None, 'error': {'code': 'Not Found'}}}
+        else:
+            query = parse_qs(parsed.query)
+            period1, period2 = int(query['period1'][0]), int(query['period2'][0])
+            timestamps = list(range(period1 + 6 * 3600, period2, 86400))
+            close = [100.0 + i for i in range(len(timestamps))]
+            code, payload = 200, {'chart': {'result': [{
+                'meta': {'exchangeTimezoneName': 'Asia/Seoul'},
+                'timestamp': timestamps,
+                'indicators': {
+                    'quote': [{'open': close, 'high': [c + 1 for c in close],
+                               'low': [c - 1 for c in close], 'close': close,
+                               'volume': [1000] * len(close)}],
+                    'adjclose': [{'adjclose': close}],
+                },
+            }], 'error': None}}
+
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class AsyncFetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ChartStandIn()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetch_many_parses_frames_and_reuses_connections(self):
+        symbols = [f'S{i}' for i in range(20)] + ['BAD1']
+        arrived = []
+        results = asyncio.run(sra.fetch_many(
+            symbols, '2024-01-01', '2024-02-01', concurrency=4, base_url=self.server.url,
+            on_frame=lambda symbol, df, error: arrived.append(symbol)))
+
+        self.assertEqual(sorted(arrived), sorted(symbols))
+        self.assertIsInstance(results['BAD1'], Exception)
+        df = results['S0']
+        self.assertEqual(list(df.columns[:5]), ['Open', 'High', 'Low', 'Close', 'Volume'])
+        self.assertEqual(len(df), 31)
+        self.assertEqual(df['Close'].iloc[0], 100.0)
+        # 스레드마다 세션 하나: 연결 수는 동시 요청 수를 넘지 않음
+        self.assertLessEqual(len({port for _, port in self.server.hits}), 4)
+
+    def test_iter_fetch_many_stops_downloading_when_consumer_stalls(self):
+        symbols = [f'S{i}' for i in range(100)]
+        stream = sra.iter_fetch_many(symbols, '2024-01-01', '2024-02-01', concurrency=2,
+                                     base_url=self.server.url, buffer=2)
+        next(stream)
+        time.sleep(0.5)
+        # 진행 중 2개 + 비동기 큐 2개 + 전달 대기 1개 + 동기 큐 2개 + 소비 1개
+        self.assertLessEqual(len(self.server.hits), 8)
+
+        received = 1 + sum(1 for _ in stream)
+        self.assertEqual(received, 100)
+
+    def test_closing_iter_fetch_many_cancels_remaining_downloads(self):
+        symbols = [f'S{i}' for i in range(100)]
+        stream = sra.iter_fetch_many(symbols, '2024-01-01', '2024-02-01', concurrency=2,
+                                     base_url=self.server.url, buffer=2)
+        next(stream)
+        started = time.perf_counter()
+        stream.close()
+        self.assertLess(time.perf_counter() - started, 2.0)
+
+        # 닫을 때 이미 보낸 요청(최대 concurrency개)은 서버에 늦게 도착할 수 있음
+        hits = len(self.server.hits)
+        time.sleep(0.2)
+        settled = len(self.server.hits)
+        self.assertLessEqual(settled, hits + 2)
+        time.sleep(0.3)
+        self.assertEqual(len(self.server.hits), settled)
+        self.assertLess(settled, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
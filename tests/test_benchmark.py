@@ -0,0 +1,64 @@
+"""
+벤치마크(benchmark.py) 테스트 (합성 데이터 재현성, 반복 횟수, 기준 비교)
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark  # noqa: E402
+
+
+def result(name, best, bars=2_500, order=10):
+    return {'name': name, 'bars': bars, 'order': order, 'best': best}
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_synthetic_data_is_seeded(self):
+        df = benchmark.synthetic_ohlcv(5_000, seed=3)
+        pd.testing.assert_frame_equal(df, benchmark.synthetic_ohlcv(5_000, seed=3))
+        self.assertFalse(df.equals(benchmark.synthetic_ohlcv(5_000, seed=4)))
+        self.assertEqual(len(df), 5_000)
+        self.assertTrue(np.isfinite(df.to_numpy()).all())
+        self.assertTrue((df['High'] >= df[['Open', 'Close']].max(axis=1)).all())
+        self.assertTrue((df['Low'] <= df[['Open', 'Close']].min(axis=1)).all())
+        # 횡보 구간 (같은 종가가 이어짐)
+        self.assertTrue((np.diff(df['Close'].to_numpy()) == 0).any())
+
+    def test_time_call_repeats_short_calls(self):
+        calls = []
+        best, median, reps = benchmark.time_call(lambda: calls.append(1), repeat=3, min_total=0.01,
+                                                 max_repeat=50)
+        self.assertEqual(reps, len(calls))
+        self.assertEqual(reps, 50)
+        self.assertLessEqual(best, median)
+
+        _, _, reps = benchmark.time_call(lambda: None, repeat=4, min_total=0.0)
+        self.assertEqual(reps, 4)
+
+    def test_compare_to_baseline(self):
+        baseline = [result('find_pivots', 0.100), result('cluster_levels', 0.005),
+                    result('analyze', 0.011), result('plot', 0.500)]
+        current = [result('find_pivots', 0.130),      # +30%, 30ms 증가: 회귀
+                   result('cluster_levels', 0.010),   # 기준 시간이 noise_floor보다 짧음: 제외
+                   result('analyze', 0.0128),         # +16%지만 증가량 1.8ms (min_delta 이하)
+                   result('plot', 0.520),             # +4%
+                   result('render', 0.300)]           # 기준 없음
+        regressions = benchmark.compare_to_baseline(current, baseline, threshold_pct=15)
+        self.assertEqual([r[0] for r in regressions], ['find_pivots'])
+        self.assertAlmostEqual(regressions[0][-1], 30.0)
+
+        regressions = benchmark.compare_to_baseline(current, baseline, threshold_pct=15, min_delta=0.001)
+        self.assertEqual([r[0] for r in regressions], ['find_pivots', 'analyze'])
+
+
+if __name__ == '__main__':
+    unittest.main()
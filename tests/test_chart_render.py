@@ -0,0 +1,95 @@
+"""
+헤드리스 그래프 렌더링 테스트
+
+    python -m unittest discover tests
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def make_analyzer(symbol, n=400, currency='KRW'):
+    index = pd.date_range('2023-01-02', periods=n, freq='D', tz='Asia/Seoul')
+    close = 50_000 + 4_000 * np.sin(np.arange(n) / 11.0) + np.arange(n) * 5.0
+    analyzer = sra.SupportResistanceAnalyzer(symbol, '2023-01-02', ticker_name=symbol,
+                                             currency=currency, cache=False)
+    analyzer.use_frame(pd.DataFrame({'Close': close, 'High': close + 50, 'Low': close - 50,
+                                     'Volume': 1.0}, index=index))
+    analyzer.support_levels = [46_000.0, 47_500.0]
+    analyzer.resistance_levels = [54_000.0, 55_500.0, 56_000.0]
+    return analyzer
+
+
+class ChartRenderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_renderer_reuses_template_artists(self):
+        renderer = sra.ChartRenderer(dpi=50, max_levels=3)
+        artists = len(renderer.ax.lines)
+        for i, symbol in enumerate(('AAA.KS', 'BBB.KS', 'CCC.KS')):
+            analyzer = make_analyzer(symbol, n=200 + 100 * i)
+            analyzer.support_levels = [45_500.0, 46_000.0, 47_500.0][:i + 1]
+            buffer = io.BytesIO()
+            renderer.render(sra.chart_series(analyzer), buffer)
+            self.assertTrue(buffer.getvalue().startswith(b'\x89PNG'))
+
+        self.assertEqual(len(renderer.ax.lines), artists)
+        visible = [line for line in renderer.level_lines['support'] if line.get_visible()]
+        self.assertEqual(len(visible), 3)
+        self.assertEqual(len(renderer.ax.get_legend().get_texts()), 2 + 3 + 3)
+        # 마지막 종목 가격 범위에 맞춰 축 재조정
+        low, high = renderer.ax.get_ylim()
+        self.assertLess(low, 45_500)
+        self.assertGreater(high, 56_000)
+
+    def test_plot_closes_figure_and_skips_show_when_headless(self):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        path = os.path.join(self.output_dir, 'chart.svg')
+        figure = make_analyzer('AAA.KS').plot(output=path)
+        self.assertIsNotNone(figure)
+        self.assertEqual(plt.get_fignums(), [])
+        with open(path, encoding='utf-8') as f:
+            self.assertIn('<svg', f.read(2000))
+
+    def test_render_charts_in_parallel_and_as_json(self):
+        series = [sra.chart_series(make_analyzer(f'S{i}.KS')) for i in range(6)]
+        paths = sra.render_charts(series, self.output_dir, fmt='png', dpi=40, workers=2)
+        self.assertEqual(len(paths), 6)
+        for path in paths:
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(4), b'\x89PNG')
+
+        (path,) = sra.render_charts(series[:1], self.output_dir, fmt='json')
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        self.assertEqual(payload['symbol'], 'S0.KS')
+        self.assertEqual(len(payload['time']), len(payload['close']), 400)
+        # 현지 시각 기준 자정 (KST 타임존 제거)
+        self.assertEqual(payload['time'][0], int(pd.Timestamp('2023-01-02').value // 1_000_000))
+
+        with self.assertRaises(ValueError):
+            sra.render_charts(series, self.output_dir, fmt='gif')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+레벨 클러스터링 테스트 (기존 이중 반복문 구현과 결과 비교)
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def baseline_cluster_levels(levels, tolerance):
+    """기존 구현: 후보마다 현재 클러스터 전체의 np.mean()과 비교"""
+    if len(levels) == 0:
+        return []
+    levels_sorted = np.sort(levels)
+    clusters = []
+    current_cluster = [levels_sorted[0]]
+    for level in levels_sorted[1:]:
+        cluster_mean = np.mean(current_cluster)
+        if abs(level - cluster_mean) / cluster_mean <= tolerance:
+            current_cluster.append(level)
+        else:
+            clusters.append(current_cluster)
+            current_cluster = [level]
+    clusters.append(current_cluster)
+    clustered_levels = [(np.mean(cluster), len(cluster)) for cluster in clusters]
+    clustered_levels.sort(key=lambda x: x[1], reverse=True)
+    return clustered_levels
+
+
+def random_levels(rng, n_max=400):
+    """호가 단위로 반올림한 레벨 (같은 값이 많고 허용 오차 경계에 정확히 걸리는 경우 포함)"""
+    n = int(rng.integers(1, n_max))
+    tick = rng.choice([0.01, 0.05, 0.1, 1.0, 5.0])
+    base = rng.choice([10.0, 50.0, 100.0, 1000.0])
+    levels = np.round(base * (1 + rng.normal(0, 0.03, n)) / tick) * tick
+    return levels, float(rng.choice([0.005, 0.01, 0.015, 0.02, 0.03]))
+
+
+class ClusterLevelsTest(unittest.TestCase):
+
+    def test_tolerance_boundary_matches_baseline(self):
+        # 누적합 평균과 np.mean()이 마지막 자릿수만 달라 경계 판정이 갈리던 입력
+        values = [9.0, 9.1, 9.200000000000001, 9.3, 9.4, 9.5, 9.600000000000001, 9.700000000000001,
+                  9.8, 9.9, 10.0, 10.100000000000001, 10.200000000000001]
+        counts = [2, 1, 7, 10, 19, 57, 61, 139, 189, 179, 188, 179, 1]
+        levels = np.repeat(values, counts)
+        expected = baseline_cluster_levels(levels, 0.02)
+        self.assertEqual(sra.cluster_levels(levels, 0.02), expected)
+        self.assertEqual(sra.cluster_levels_batch([levels, levels[::-1]], 0.02), [expected, expected])
+
+    def test_random_levels_match_baseline(self):
+        rng = np.random.default_rng(20)
+        cases = [random_levels(rng) for _ in range(200)]
+        for levels, tolerance in cases:
+            self.assertEqual(sra.cluster_levels(levels, tolerance),
+                             baseline_cluster_levels(levels, tolerance))
+
+        # lockstep 배치 (배열마다 다른 허용 오차, 빈 배열 포함)
+        arrays = [levels for levels, _ in cases] + [np.array([])]
+        tolerances = [tolerance for _, tolerance in cases] + [0.02]
+        results = sra.cluster_levels_batch(arrays, tolerances)
+        for levels, tolerance, result in zip(arrays, tolerances, results):
+            self.assertEqual(result, baseline_cluster_levels(levels, tolerance))
+
+
+if __name__ == '__main__':
+    unittest.main()
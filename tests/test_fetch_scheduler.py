@@ -0,0 +1,165 @@
+"""
+원격 요청 스케줄러 테스트 (시각/대기와 yfinance는 가짜로 대체, 네트워크 없음)
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+class FakeClock:
+    """sleep()하면 그만큼 시각이 흐르는 가짜 시계"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class HTTPStatusError(Exception):
+    """requests.HTTPError처럼 response.status_code를 가진 예외"""
+
+    def __init__(self, status):
+        super().__init__(f'HTTP {status}')
+        self.response = mock.Mock(status_code=status)
+
+
+def frame(n, start='2024-01-02', tz='Asia/Seoul'):
+    index = pd.date_range(start, periods=n, freq='D', tz=tz, name='Date')
+    close = np.linspace(100, 110, n)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 1000.0}, index=index)
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_rate_burst_and_throttle(self):
+        clock = FakeClock()
+        bucket = sra.TokenBucket(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertAlmostEqual(bucket.acquire(), 0.5)
+
+        # 요청 제한: 모두 멈추고 속도 절반, 성공하면 조금씩 회복
+        bucket.throttle(3.0)
+        self.assertEqual(bucket.rate, 1.0)
+        self.assertAlmostEqual(bucket.acquire(), 4.0)
+        bucket.success()
+        self.assertAlmostEqual(bucket.rate, 1.1)
+        for _ in range(20):
+            bucket.throttle(0)
+        self.assertAlmostEqual(bucket.rate, 2 * sra.FETCH_MIN_RATE_RATIO)
+
+        unlimited = sra.TokenBucket(rate=None, clock=clock, sleep=clock.sleep)
+        self.assertEqual(sum(unlimited.acquire() for _ in range(1000)), 0)
+
+
+class FetchSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        sra.METRICS.reset()
+        self.clock = FakeClock()
+
+    def scheduler(self, **kwargs):
+        return sra.FetchScheduler(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_retries_with_backoff(self):
+        scheduler = self.scheduler(rate=None, retries=3, backoff=1.0)
+        responses = [HTTPStatusError(429), HTTPStatusError(503), 'ok']
+
+        def request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.assertEqual(scheduler.call(None, request), 'ok')
+        counters = sra.METRICS.counters
+        self.assertEqual((counters['remote_calls'], counters['fetch_retries'], counters['throttled']), (3, 2, 1))
+        # 지터: 지수 백오프의 절반~전체 (1초, 2초)
+        self.assertTrue(0.5 <= self.clock.sleeps[0] <= 1.0)
+        self.assertTrue(1.0 <= self.clock.sleeps[1] <= 2.0)
+
+        # 재시도해도 같은 오류는 바로 전달, 요청 제한이 계속되면 RateLimitError
+        with self.assertRaises(HTTPStatusError):
+            scheduler.call(None, mock.Mock(side_effect=HTTPStatusError(404)))
+        with self.assertRaises(sra.RateLimitError):
+            scheduler.call(None, mock.Mock(side_effect=HTTPStatusError(429)))
+        self.assertEqual(sra.METRICS.counters['throttle_failures'], 1)
+
+    def test_identical_in_flight_requests_are_coalesced(self):
+        scheduler = sra.FetchScheduler(rate=None)
+        release = threading.Event()
+        calls = []
+
+        def request():
+            calls.append(1)
+            release.wait(5)
+            return 'data'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(scheduler.call(('info', 'AAA'), request)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while sra.METRICS.counters.get('coalesced_requests', 0) < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(calls), results), (1, ['data'] * 5))
+
+    def test_rate_limited_lookup_is_not_reported_as_missing(self):
+        provider = mock.Mock(remote=True)
+        provider.history.side_effect = sra.RateLimitError('요청 제한')
+        provider.ticker_info.side_effect = sra.RateLimitError('요청 제한')
+        with mock.patch.object(sra, 'get_data_provider', return_value=provider):
+            with self.assertRaises(sra.RateLimitError):
+                sra.verify_ticker('AAPL')
+            with self.assertRaises(sra.RateLimitError):
+                sra._ticker_info('AAPL', 'AAPL')
+
+    def test_history_many_batches_by_suffix(self):
+        frames = {'A.KS': frame(5), 'B.KS': frame(3, '2024-01-04'), 'C.KS': frame(5),
+                  'AAPL': frame(5, tz='America/New_York')}
+        downloads = []
+
+        def fake_download(tickers, **kwargs):
+            downloads.append(list(tickers))
+            # C.KS는 요청 제한으로 빠짐
+            present = {symbol: frames[symbol] for symbol in tickers if symbol != 'C.KS'}
+            return pd.concat(present, axis=1)
+
+        provider = sra.YahooProvider()
+        sra.set_fetch_scheduler(self.scheduler(rate=100, burst=100))
+        self.addCleanup(sra.set_fetch_scheduler, None)
+        with mock.patch('yfinance.download', fake_download), \
+                mock.patch.object(sra.YahooProvider, 'history', return_value=frames['C.KS']) as history:
+            results = dict(provider.history_many(['A.KS', 'B.KS', 'AAPL', 'C.KS'], '2024-01-01', batch=2))
+
+        self.assertEqual(downloads, [['A.KS', 'B.KS'], ['C.KS'], ['AAPL']])
+        history.assert_called_once_with('C.KS', '2024-01-01', None, interval='1d')
+        self.assertEqual(sra.METRICS.counters['batch_fallbacks'], 1)
+        for symbol, expected in frames.items():
+            pd.testing.assert_frame_equal(results[symbol], expected, check_freq=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+증분 분석(append_bars) 테스트 (매번 analyze()로 다시 계산한 결과와 비교)
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def random_frame(rng, n):
+    """호가 단위로 반올림한 랜덤 일봉 (같은 종가가 자주 나옴)"""
+    close = np.round(100 + np.cumsum(rng.normal(0, 1, n)), 1)
+    index = pd.date_range('2022-01-03', periods=n, freq='D', tz='Asia/Seoul')
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 1000.0}, index=index)
+
+
+def full_analyze(df, **params):
+    analyzer = sra.SupportResistanceAnalyzer('TEST.KS', '2022-01-03', cache=False)
+    analyzer.df = df
+    with redirect_stdout(io.StringIO()):
+        return analyzer.analyze(**params)
+
+
+class AppendBarsTest(unittest.TestCase):
+
+    def test_random_appends_match_full_analyze(self):
+        rng = np.random.default_rng(5)
+        for case in range(20):
+            frame = random_frame(rng, int(rng.integers(30, 300)))
+            params = {'order': int(rng.integers(1, 8)), 'tolerance': float(rng.choice([0.005, 0.01, 0.02])),
+                      'max_levels': int(rng.integers(1, 8)), 'pivot_engine': sra.PIVOT_ENGINES[case % 2]}
+
+            analyzer = sra.SupportResistanceAnalyzer('TEST.KS', '2022-01-03', cache=False)
+            pos = int(rng.integers(1, 20))
+            result = analyzer.append_bars(frame.iloc[:pos], **params)
+            while True:
+                expected = full_analyze(analyzer.df, **params)
+                self.assertEqual(result['support'], expected['support'])
+                self.assertEqual(result['resistance'], expected['resistance'])
+                self.assertEqual(result['current_price'], expected['current_price'])
+                if pos == len(frame):
+                    break
+
+                # 장중 갱신처럼 마지막 몇 봉을 바뀐 가격으로 다시 보내기도 함
+                redo = int(rng.integers(0, min(3, pos) + 1))
+                stop = min(pos + int(rng.integers(1, 15)), len(frame))
+                chunk = frame.iloc[pos - redo:stop].copy()
+                if redo:
+                    chunk.iloc[:redo, chunk.columns.get_loc('Close')] += np.round(rng.normal(0, 2, redo), 1)
+                    frame.iloc[pos - redo:pos] = chunk.iloc[:redo]
+                result = analyzer.append_bars(chunk, **params)
+                pos = stop
+
+    def test_cluster_state_matches_cluster_levels(self):
+        rng = np.random.default_rng(6)
+        for _ in range(50):
+            tolerance = float(rng.choice([0.005, 0.01, 0.02]))
+            levels = list(np.round(100 + rng.normal(0, 3, int(rng.integers(0, 80))), 1))
+            state = sra._LevelClusterState(np.array(levels), tolerance)
+            for _ in range(10):
+                removed = [levels.pop(int(rng.integers(0, len(levels))))
+                           for _ in range(min(int(rng.integers(0, 5)), len(levels)))]
+                added = list(np.round(100 + rng.normal(0, 3, int(rng.integers(0, 5))), 1))
+                levels.extend(added)
+                state.update(removed=removed, added=added)
+                self.assertEqual(state.result(), sra.cluster_levels(np.array(levels), tolerance))
+
+
+if __name__ == '__main__':
+    unittest.main()
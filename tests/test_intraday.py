@@ -0,0 +1,78 @@
+"""
+분봉 모드(--interval) 테스트 (요청 기간 분할, float32 압축, 구간 분할 피봇)
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+class IntradayProvider(sra.DataProvider):
+    """메모리의 분봉 DataFrame을 요청 구간만큼 돌려주는 네트워크 소스 흉내 (요청 구간 기록)"""
+
+    remote = True
+
+    def __init__(self, df):
+        self.df = df
+        self.calls = []
+
+    def history(self, symbol, start_date=None, end_date=None, interval='1d', period=None):
+        self.calls.append((start_date, end_date, interval))
+        return sra.slice_dates(self.df, start_date, end_date)
+
+
+class IntradayTest(unittest.TestCase):
+
+    def test_history_windows_cover_range(self):
+        self.assertEqual(sra.history_windows('2024-01-01', '2024-03-01', '1d'), [('2024-01-01', '2024-03-01')])
+        for interval, max_days in sra.INTRADAY_MAX_DAYS.items():
+            windows = sra.history_windows('2023-01-01', '2024-03-15', interval)
+            self.assertEqual(windows[0][0], '2023-01-01')
+            self.assertEqual(windows[-1][1], '2024-03-15')
+            for (start, end), (next_start, _) in zip(windows, windows[1:]):
+                self.assertEqual(end, next_start)
+            for start, end in windows:
+                self.assertLessEqual((pd.Timestamp(end) - pd.Timestamp(start)).days, max_days)
+
+    def test_fetch_splits_requests_and_compacts(self):
+        rng = np.random.default_rng(11)
+        index = pd.date_range('2024-01-02 09:00', '2024-04-30 15:30', freq='5min', tz='Asia/Seoul')
+        index = index[(index.hour >= 9) & (index.hour < 16)]
+        close = 100 + np.cumsum(rng.normal(0, 0.1, len(index)))
+        df = pd.DataFrame({'Open': close, 'High': close + 0.1, 'Low': close - 0.1, 'Close': close,
+                           'Volume': rng.integers(1, 1000, len(index)).astype(float)}, index=index)
+        provider = IntradayProvider(df)
+
+        analyzer = sra.SupportResistanceAnalyzer('005930.KS', '2024-01-01', '2024-05-01', ticker_name='TEST',
+                                                 currency='KRW', cache=False, interval='5m', provider=provider)
+        with redirect_stdout(io.StringIO()):
+            analyzer.fetch_data()
+        self.assertEqual([call[:2] for call in provider.calls],
+                         sra.history_windows('2024-01-01', '2024-05-01', '5m'))
+        self.assertEqual({call[2] for call in provider.calls}, {'5m'})
+        self.assertEqual(list(analyzer.df.columns), list(sra.COMPACT_COLUMNS))
+        self.assertEqual(set(analyzer.df.dtypes), {np.dtype(np.float32)})
+        self.assertEqual(len(analyzer.df), len(df))
+        self.assertTrue(analyzer.df.index.is_monotonic_increasing)
+
+        # 구간을 나누어 찾은 피봇도 한 번에 찾은 결과와 같음
+        expected = analyzer.find_pivots(order=12)
+        for chunk_size in (7, 500, 1999):
+            got = analyzer.find_pivots(order=12, chunk_size=chunk_size)
+            for a, b in zip(got, expected):
+                np.testing.assert_array_equal(a, b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+레벨 인덱스(LevelIndex) 테스트
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def universe_table(n_symbols=300, seed=0):
+    """run_universe() 결과와 같은 형식의 테이블"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_symbols):
+        symbol = f'{i:06d}.KQ' if i % 2 else f'{i:06d}.KS'
+        market = 'KOSDAQ' if i % 2 else 'KOSPI'
+        price = float(rng.uniform(1_000, 100_000))
+        base = {'symbol': symbol, 'name': f'종목{i}', 'market': market, 'status': 'ok', 'error': None,
+                'bars': 250, 'current_price': price}
+        for kind, sign in (('support', -1), ('resistance', 1)):
+            for rank in range(1, 6):
+                level = price * (1 + sign * rng.uniform(0, 0.1))
+                rows.append({**base, 'kind': kind, 'rank': rank, 'level': level,
+                             'count': int(rng.integers(1, 6)),
+                             'distance_pct': (level - price) / price * 100})
+    rows.append({'symbol': 'BROKEN.KS', 'name': 'broken', 'market': 'KOSPI', 'status': 'error',
+                 'error': 'ValueError: x', 'bars': 0, 'current_price': np.nan})
+    return pd.DataFrame(rows)
+
+
+class LevelIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'index.npy')
+        self.table = universe_table()
+        self.index = sra.LevelIndex(path=self.path)
+        self.index.update_table(self.table)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_near_support_matches_brute_force(self):
+        hits = self.index.near('support', 1.5, min_count=3, markets=['KOSDAQ'])
+
+        ok = self.table[self.table['status'] == 'ok']
+        expected = ok[(ok['kind'] == 'support') & (ok['distance_pct'] >= -1.5) & (ok['distance_pct'] <= 0)
+                      & (ok['count'] >= 3) & ok['market'].str.startswith('KOSDAQ')]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(sorted(zip(hits['symbol'], hits['rank'])),
+                         sorted(zip(expected['symbol'], expected['rank'])))
+        # 현재가에 가까운 순서
+        self.assertTrue(np.all(np.diff(np.abs(hits['distance_pct'])) >= 0))
+
+    def test_update_replaces_one_symbol_and_keeps_order(self):
+        before = len(self.index)
+        results = {'support': [(9_900.0, 4)], 'resistance': [(10_100.0, 2), (10_500.0, 1)],
+                   'current_price': 10_000.0}
+        self.index.update('000001.KQ', results, name='종목1')
+
+        data = self.index.data
+        self.assertTrue(np.all(np.diff(data['distance_pct']) >= 0))
+        self.assertEqual(len(self.index), before - 10 + 3)
+        mine = data[data['symbol'] == '000001.KQ']
+        self.assertEqual(sorted(mine['level'].tolist()), [9_900.0, 10_100.0, 10_500.0])
+        # 시장 구분은 기존 값 유지
+        self.assertEqual(set(mine['market']), {'KOSDAQ'})
+        hits = self.index.near('support', 1.0, min_count=4)
+        self.assertIn('000001.KQ', hits['symbol'])
+
+    def test_save_load_round_trip_and_failed_symbols_keep_levels(self):
+        self.index.save()
+        loaded = sra.LevelIndex.load(self.path)
+        self.assertIsInstance(loaded.data, np.memmap)
+        np.testing.assert_array_equal(loaded.data, self.index.data)
+
+        # 다시 분석한 종목 중 실패한 종목은 기존 레벨 유지, 레벨이 없는 종목은 삭제
+        retry = self.table[self.table['symbol'].isin(['000002.KS', '000004.KS'])].copy()
+        retry.loc[retry['symbol'] == '000002.KS', 'status'] = 'error'
+        empty = retry[retry['symbol'] == '000004.KS'].iloc[:1].copy()
+        empty[['kind', 'rank', 'level', 'count', 'distance_pct']] = np.nan
+        loaded.update_table(pd.concat([retry[retry['symbol'] == '000002.KS'], empty]))
+        self.assertEqual((loaded.data['symbol'] == '000002.KS').sum(), 10)
+        self.assertEqual((loaded.data['symbol'] == '000004.KS').sum(), 0)
+
+        with self.assertRaises(ValueError):
+            loaded.screen(kind='pivot')
+
+
+    def test_only_daily_network_runs_update_index(self):
+        universe = os.path.join(self.tmp, 'list.txt')
+        with open(universe, 'w', encoding='utf-8') as f:
+            f.write('000001.KQ\n')
+        path = os.path.join(self.tmp, 'cli_index.npy')
+
+        def run(*extra, provider=None):
+            argv = ['support_resistance_analyzer.py', '--no-cache', '--universe', universe, '--index', path,
+                    '--output', os.path.join(self.tmp, 'out.csv'), *extra]
+            patches = [mock.patch.object(sys, 'argv', argv),
+                       mock.patch.object(sra, 'run_universe', lambda *a, **k: self.table)]
+            if provider is not None:
+                patches.append(mock.patch.object(sra, 'get_data_provider', lambda: provider))
+            with redirect_stdout(io.StringIO()) as out:
+                for patch in patches:
+                    patch.start()
+                try:
+                    sra.main()
+                finally:
+                    for patch in reversed(patches):
+                        patch.stop()
+            return out.getvalue()
+
+        self.assertIn('갱신 안 함', run('-i', '5m'))
+        self.assertIn('갱신 안 함', run(provider=mock.Mock(remote=False)))
+        self.assertIn('갱신 안 함', run('--method', 'volume'))
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(sra.level_index_skip_reason('1d', remote=True))
+
+        run()
+        self.assertEqual(len(sra.LevelIndex.load(path)), len(self.index))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+단계별 계측(METRICS, 계측 훅, 프로파일) 테스트
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import warnings
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def make_analyzer(n=300, seed=14):
+    close = np.round(100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n)), 1)
+    index = pd.date_range('2022-01-03', periods=n, freq='D', tz='Asia/Seoul')
+    analyzer = sra.SupportResistanceAnalyzer('TEST.KS', '2022-01-03', cache=False)
+    analyzer.df = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                                'Volume': 1000.0}, index=index)
+    return analyzer
+
+
+class StageMetricsTest(unittest.TestCase):
+
+    def test_summary_percentiles_and_merge(self):
+        rng = np.random.default_rng(1)
+        metrics = sra.StageMetrics()
+        samples = rng.random(101)
+        for value in samples[:60]:
+            metrics.record('fetch_data', value)
+        before = metrics.snapshot()
+        for value in samples[60:]:
+            metrics.record('fetch_data', value)
+        metrics.count('rows', 250)
+        metrics.count('bytes', 0.5)
+
+        since = metrics.since(before)
+        self.assertEqual(since['timings'], {'fetch_data': list(samples[60:])})
+        self.assertEqual(since['counters'], {'rows': 250, 'bytes': 0.5})
+
+        other = sra.StageMetrics()
+        other.merge(before)
+        other.merge(since)
+        summary = other.summary()
+        stats = summary['stages']['fetch_data']
+        self.assertEqual(stats['calls'], 101)
+        self.assertAlmostEqual(stats['total_sec'], samples.sum())
+        for q in sra.METRIC_PERCENTILES:
+            self.assertAlmostEqual(stats[f'p{q}_sec'], np.percentile(samples, q))
+        self.assertEqual(stats['max_sec'], samples.max())
+        self.assertEqual(summary['counters'], {'rows': 250, 'bytes': 0.5})
+        self.assertIn('fetch_data', other.format_summary())
+
+    def test_hooks_see_analysis_stages_and_counters(self):
+        events = []
+
+        def record(kind, name, value):
+            events.append((kind, name, value))
+
+        def broken(kind, name, value):
+            raise RuntimeError('hook failed')
+
+        sra.add_metrics_hook(record)
+        sra.add_metrics_hook(broken)
+        try:
+            analyzer = make_analyzer()
+            with redirect_stdout(io.StringIO()), warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                results = analyzer.analyze(order=5, tolerance=0.02, max_levels=3)
+        finally:
+            sra.remove_metrics_hook(record)
+            sra.remove_metrics_hook(broken)
+
+        stages = {name for kind, name, _ in events if kind == 'stage'}
+        self.assertTrue({'find_pivots', 'cluster_levels'} <= stages, stages)
+        counters = {}
+        for kind, name, value in events:
+            if kind == 'count':
+                counters[name] = counters.get(name, 0) + value
+        _, _, min_idx, max_idx = analyzer.find_pivots(order=5)
+        self.assertEqual(counters['pivots'], len(min_idx) + len(max_idx))
+        self.assertGreaterEqual(counters['clusters'], len(results['support']) + len(results['resistance']))
+        # 훅 오류는 경고로만 알리고 분석은 계속
+        self.assertTrue(any('hook failed' in str(w.message) for w in caught))
+
+    def test_profiling_writes_stage_profiles(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        analyzer = make_analyzer()
+        sra.METRICS.start_profiling(directory, stages=('find_pivots',))
+        try:
+            self.assertTrue(sra.METRICS.profiling)
+            analyzer.find_pivots(order=5)
+        finally:
+            written = sra.METRICS.stop_profiling()
+        self.assertFalse(sra.METRICS.profiling)
+        self.assertEqual(sorted(os.path.basename(path) for path in written),
+                         ['find_pivots.prof', 'find_pivots.txt', 'memory.txt'])
+        with open(os.path.join(directory, 'memory.txt'), encoding='utf-8') as f:
+            self.assertIn('find_pivots', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+다중 시간 프레임 분석 테스트 (가격 데이터는 가짜 함수로 대체)
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def make_frame(n=900, freq='D', tz='Asia/Seoul'):
+    index = pd.date_range('2021-01-04', periods=n, freq=freq, tz=tz)
+    rng = np.random.default_rng(7)
+    close = 100 + 12 * np.sin(np.arange(n) / 25.0) + rng.normal(0, 0.8, n)
+    return pd.DataFrame({'Open': close + 0.2, 'High': close + 1, 'Low': close - 1,
+                         'Close': close, 'Volume': rng.integers(1, 1000, n).astype(float)}, index=index)
+
+
+class ResampleTest(unittest.TestCase):
+
+    def test_matches_pandas_groupby(self):
+        df = make_frame(n=24 * 40, freq='h')
+        naive = df.tz_localize(None)
+        agg = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+        keys = {
+            '1d': naive.index.normalize(),
+            '1wk': naive.index.normalize() - pd.to_timedelta(naive.index.dayofweek, unit='D'),
+            '1mo': naive.index.to_period('M'),
+        }
+        for timeframe, key in keys.items():
+            expected = naive.groupby(key).agg(agg)
+            result = sra.resample_ohlcv(df, timeframe)
+            self.assertEqual(len(result), len(expected), timeframe)
+            np.testing.assert_allclose(result[list(agg)].to_numpy(), expected.to_numpy())
+            # 인덱스는 구간의 마지막 봉 시각
+            self.assertEqual(result.index[-1], df.index[-1])
+
+        with self.assertRaises(ValueError):
+            sra.resample_ohlcv(df, '3d')
+
+
+class MultiTimeframeTest(unittest.TestCase):
+
+    def test_single_fetch_and_confluence(self):
+        df = make_frame()
+        fetches = []
+
+        def fake_fetch(analyzer):
+            fetches.append(analyzer.interval)
+            analyzer.df = df
+            return df
+
+        analyzer = sra.SupportResistanceAnalyzer('AAA.KS', '2021-01-04', cache=False)
+        before = sra.METRICS.snapshot()
+        with mock.patch.object(sra.SupportResistanceAnalyzer, 'fetch_data', fake_fetch):
+            result = analyzer.multi_timeframe(('1d', '1wk', '1mo'), order=5, tolerance=0.02)
+
+        self.assertEqual(fetches, ['1d'])
+        timings = sra.METRICS.since(before)['timings']
+        self.assertEqual(len(timings['multi_timeframe']), 1)
+        self.assertNotIn('append_bars', timings)
+        frames = result['timeframes']
+        self.assertEqual(list(frames), ['1d', '1wk', '1mo'])
+        self.assertEqual(frames['1d']['bars'], 900)
+        self.assertEqual(frames['1wk']['order'], sra.MTF_ORDERS['1wk'])
+
+        # 시간 프레임별 결과는 변환한 데이터로 따로 분석한 것과 같음
+        weekly = sra.resample_ohlcv(df, '1wk')['Close'].to_numpy()
+        min_idx, max_idx = sra.find_pivot_indices(weekly, order=sra.MTF_ORDERS['1wk'])
+        self.assertEqual(frames['1wk']['support'], sra.cluster_levels(weekly[min_idx], 0.02)[:5])
+        self.assertEqual(frames['1wk']['resistance'], sra.cluster_levels(weekly[max_idx], 0.02)[:5])
+
+        self.assertTrue(result['confluence'])
+        for zone in result['confluence']:
+            self.assertGreaterEqual(len(zone['timeframes']), 2)
+            self.assertEqual(zone['kind'] == 'support', zone['level'] < result['current_price'])
+
+        with self.assertRaises(ValueError):
+            analyzer.multi_timeframe(('1h', '1d'))
+
+    def test_confluence_levels(self):
+        levels = [(100.0, 4, '1d'), (101.0, 1, '1wk'), (150.0, 3, '1d'), (151.0, 2, '1d'), (80.0, 1, '1mo')]
+        zones = sra.confluence_levels(levels, 0.02, current_price=120.0)
+        self.assertEqual(len(zones), 1)
+        self.assertEqual(zones[0]['timeframes'], ['1d', '1wk'])
+        self.assertAlmostEqual(zones[0]['level'], (100 * 4 + 101) / 5)
+        self.assertEqual((zones[0]['kind'], zones[0]['touches']), ('support', 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+주가 데이터 로컬 캐시(OHLCVCache) 테스트 (다운로드는 가짜 함수로 대체)
+
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+class FakeFetcher:
+    """전체 데이터에서 요청 구간만 잘라 주고 요청 구간을 기록 (fail=True면 빈 데이터)"""
+
+    def __init__(self, df):
+        self.df = df
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        if self.fail:
+            return pd.DataFrame()
+        return sra.slice_dates(self.df, start, end)
+
+
+class OHLCVCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        rng = np.random.default_rng(2)
+        index = pd.date_range('2022-01-03', '2023-12-29', freq='B', tz='Asia/Seoul', name='Date')
+        close = 100 + np.cumsum(rng.normal(0, 1, len(index)))
+        self.df = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                                'Volume': 1000.0}, index=index)
+        self.fetcher = FakeFetcher(self.df)
+        self.cache = sra.OHLCVCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def fetch(self, start, end, symbol='005930.KS'):
+        df = self.cache.fetch(symbol, start, end, self.fetcher)
+        pd.testing.assert_frame_equal(df, sra.slice_dates(self.df, start, end), check_freq=False)
+        calls, self.fetcher.calls = self.fetcher.calls, []
+        return calls
+
+    def test_fetches_only_missing_ranges(self):
+        self.assertEqual(self.fetch('2022-03-01', '2022-09-01'), [('2022-03-01', '2022-09-01')])
+        self.assertEqual(self.fetch('2022-03-01', '2022-09-01'), [])
+        self.assertEqual(self.fetch('2022-04-01', '2022-05-01'), [])
+        self.assertEqual(self.fetch('2022-01-01', '2023-01-01'),
+                         [('2022-01-01', '2022-03-01'), ('2022-09-01', '2023-01-01')])
+        self.assertEqual(self.cache.load_meta('005930.KS'), {'start': '2022-01-01', 'end': '2023-01-01'})
+        # 간격이 다르면 다른 항목
+        self.assertIsNone(self.cache.load_meta('005930.KS', interval='1h'))
+
+    def test_failed_download_is_not_recorded_as_covered(self):
+        self.fetch('2022-03-01', '2022-09-01')
+        self.fetcher.fail = True
+        df = self.cache.fetch('005930.KS', '2022-03-01', '2022-10-01', self.fetcher)
+        self.assertEqual(len(df), len(sra.slice_dates(self.df, '2022-03-01', '2022-09-01')))
+        self.assertEqual(self.cache.load_meta('005930.KS')['end'], '2022-09-01')
+
+        self.fetcher.fail = False
+        self.fetcher.calls = []
+        self.assertEqual(self.fetch('2022-03-01', '2022-10-01'), [('2022-09-01', '2022-10-01')])
+
+    def test_size_limit_evicts_least_recently_used(self):
+        for i, symbol in enumerate(['A.KS', 'B.KS', 'C.KS']):
+            self.fetch('2022-01-01', '2023-01-01', symbol=symbol)
+            meta_path = self.cache._paths(symbol)[1]
+            os.utime(meta_path, (1_000_000 + i, 1_000_000 + i))
+        entry_size = max(size for _, _, _, size, _ in self.cache.entries())
+
+        self.cache.max_bytes = entry_size * 2
+        self.cache.enforce_limit()
+        self.assertEqual(sorted(key for key, *_ in self.cache.entries()),
+                         sorted([self.cache._key('B.KS'), self.cache._key('C.KS')]))
+        self.assertEqual(self.cache.clear(), 2)
+        self.assertEqual(self.cache.entries(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
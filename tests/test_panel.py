@@ -0,0 +1,108 @@
+"""
+패널 엔진(여러 종목 2차원 배열 분석) 테스트 (가격 데이터는 가짜 함수로 대체)
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def make_panel(n_symbols=60, n_bars=300, seed=3):
+    """상장 전/거래 정지/상장 폐지 구간이 섞인 가격 행렬 (가격은 소수점 한 자리로 반올림해 동일 값 포함)"""
+    rng = np.random.default_rng(seed)
+    close = np.round(100 + np.cumsum(rng.normal(0, 1, (n_symbols, n_bars)), axis=1), 1)
+    for row in close:
+        row[:rng.integers(0, 80)] = np.nan
+        row[n_bars - rng.integers(0, 40):] = np.nan
+        row[rng.integers(0, n_bars, 6)] = np.nan
+    close[5] = np.nan
+    close[6, :-3] = np.nan
+    return close
+
+
+class PanelEngineTest(unittest.TestCase):
+
+    def test_matches_per_symbol_pivots_and_clusters(self):
+        close = make_panel()
+        for order in (1, 5, 12):
+            is_min, is_max = sra.panel_pivot_masks(close, order, chunk_size=close.shape[1] * 7)
+            panel = sra.panel_levels(close, order=order, tolerance=0.02, max_levels=4)
+            for r, row in enumerate(close):
+                columns = np.flatnonzero(~np.isnan(row))
+                values = row[columns]
+                min_idx, max_idx = sra.find_pivot_indices(values, order)
+                np.testing.assert_array_equal(np.flatnonzero(is_min[r]), columns[min_idx])
+                np.testing.assert_array_equal(np.flatnonzero(is_max[r]), columns[max_idx])
+
+                for kind, idx in (('support', min_idx), ('resistance', max_idx)):
+                    rows, ranks, levels, counts = panel[kind]
+                    selected = rows == r
+                    expected = sra.cluster_levels(values[idx], 0.02)[:4]
+                    self.assertEqual(list(zip(levels[selected], counts[selected])), expected)
+                    self.assertEqual(list(ranks[selected]), list(range(1, len(expected) + 1)))
+
+                self.assertEqual(panel['bars'][r], len(values))
+                if len(values):
+                    self.assertEqual(panel['current_price'][r], values[-1])
+                else:
+                    self.assertTrue(np.isnan(panel['current_price'][r]))
+
+        with self.assertRaises(ValueError):
+            sra.panel_pivot_masks(close[0], 5)
+
+    def test_run_universe_panel_matches_run_universe_rows(self):
+        rng = np.random.default_rng(11)
+        frames = {}
+        for i in range(8):
+            # 종목마다 상장일/거래일이 다름
+            index = pd.date_range('2023-01-02', periods=400, freq='D', tz='Asia/Seoul')[i * 10:]
+            index = index.delete([50, 51, 120])
+            close = 100 + np.cumsum(rng.normal(0, 1, len(index)))
+            frames[f'S{i}.KS'] = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                                                'Close': close, 'Volume': 1000.0}, index=index)
+
+        def fake_fetch(analyzer):
+            if analyzer.ticker not in frames:
+                raise ValueError(f"데이터가 없습니다: {analyzer.ticker}")
+            analyzer.df = frames[analyzer.ticker]
+            return analyzer.df
+
+        entries = [(symbol, symbol, 'KRW', 'KOSPI') for symbol in frames] + [('NOPE.KS', 'NOPE', 'KRW', '')]
+        with mock.patch.object(sra.SupportResistanceAnalyzer, 'fetch_data', fake_fetch), \
+                redirect_stdout(io.StringIO()):
+            table = sra.run_universe_panel(entries, '2023-01-02', order=5, tolerance=0.02, max_levels=3,
+                                           workers=4, cache=False)
+
+        # 실패 종목 행이 있어도 순위/빈도수는 정수 (run_universe()와 같은 결과 파일)
+        self.assertEqual([str(dtype) for dtype in table[['rank', 'count']].dtypes], ['Int64', 'Int64'])
+        first = table.iloc[0]
+        self.assertIn(f",{first['kind']},{first['rank']},{float(first['level'])!r},{first['count']},",
+                      table.to_csv(index=False))
+
+        errors = table[table['status'] == 'error']
+        self.assertEqual(list(errors['symbol']), ['NOPE.KS'])
+        self.assertIn('ValueError', errors['error'].iloc[0])
+
+        for symbol, df in frames.items():
+            analyzer = sra.SupportResistanceAnalyzer(symbol, '2023-01-02', ticker_name=symbol, cache=False)
+            analyzer.use_frame(df)
+            expected = pd.DataFrame(sra.level_rows(analyzer.analyze(order=5, tolerance=0.02, max_levels=3)))
+            got = table[table['symbol'] == symbol].reset_index(drop=True)
+            self.assertEqual(set(got['bars']), {len(df)})
+            pd.testing.assert_frame_equal(got[list(expected)], expected, check_dtype=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
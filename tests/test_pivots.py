@@ -0,0 +1,73 @@
+"""
+피봇 탐지 엔진 테스트 (슬라이딩 윈도우/구간 분할 결과를 argrelextrema와 비교)
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+from scipy.signal import argrelextrema
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def baseline_pivots(values, order):
+    """기존 구현: argrelextrema를 최소/최대로 두 번 실행"""
+    return (argrelextrema(values, np.less_equal, order=order)[0],
+            argrelextrema(values, np.greater_equal, order=order)[0])
+
+
+def random_prices(rng):
+    """같은 값이 이어지는 구간(plateau), NaN, 정수 가격이 섞인 랜덤 가격 배열"""
+    n = int(rng.integers(0, 600))
+    values = 100 + np.cumsum(rng.normal(0, 1, n))
+    kind = rng.integers(0, 4)
+    if kind == 0:
+        values = np.round(values)
+    elif kind == 1:
+        values = np.repeat(np.round(values[:n // 3 + 1], 1), 3)[:n]
+    elif kind == 2 and n:
+        values[rng.integers(0, n, 1 + n // 50)] = np.nan
+    if rng.random() < 0.2:
+        values = np.nan_to_num(values).astype(np.int64)
+    return values
+
+
+class PivotEngineTest(unittest.TestCase):
+
+    def test_window_engine_matches_argrelextrema(self):
+        rng = np.random.default_rng(4)
+        for _ in range(300):
+            values = random_prices(rng)
+            order = int(rng.integers(1, 60))
+            expected = baseline_pivots(values, order)
+            for engine in sra.PIVOT_ENGINES:
+                got = sra.find_pivot_indices(values, order=order, engine=engine)
+                np.testing.assert_array_equal(got[0], expected[0])
+                np.testing.assert_array_equal(got[1], expected[1])
+
+        with self.assertRaises(ValueError):
+            sra.find_pivot_indices(np.arange(10.0), order=0, engine='window')
+        with self.assertRaises(ValueError):
+            sra.find_pivot_indices(np.arange(10.0), engine='deque')
+
+    def test_chunked_matches_single_pass(self):
+        rng = np.random.default_rng(7)
+        for _ in range(200):
+            values = random_prices(rng)
+            order = int(rng.integers(1, 30))
+            chunk_size = int(rng.integers(1, 200))
+            expected = baseline_pivots(values, order)
+            for engine in sra.PIVOT_ENGINES:
+                got = sra.find_pivot_indices_chunked(values, order=order, engine=engine, chunk_size=chunk_size)
+                np.testing.assert_array_equal(got[0], expected[0])
+                np.testing.assert_array_equal(got[1], expected[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+로컬 재생 데이터 소스(ReplayProvider) 테스트 (네트워크 없음)
+
+    python -m unittest discover tests
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def make_frame(n, tz, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2023-01-02', periods=n, freq='B', tz=tz, name='Date')
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': rng.integers(1, 1000, n).astype(float)}, index=index)
+
+
+class ReplayProviderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.kr = make_frame(300, 'Asia/Seoul', 1)
+        self.us = make_frame(300, 'America/New_York', 2)
+        self.kr.to_parquet(os.path.join(self.directory, '005930.KS.parquet'))
+        # 서머타임으로 오프셋이 섞인 CSV
+        self.us.to_csv(os.path.join(self.directory, 'AAPL.csv'))
+        pd.DataFrame({'Code': ['005930'], 'Name': ['삼성전자'], 'Market': ['KOSPI']}).to_csv(
+            os.path.join(self.directory, 'listing.csv'), index=False)
+        with open(os.path.join(self.directory, 'info.json'), 'w', encoding='utf-8') as f:
+            json.dump({'AAPL': {'name': 'Apple Inc.', 'currency': 'USD'}}, f)
+
+        self.patches = [mock.patch.object(sra, 'CACHE_DIR', self.cache_dir),
+                        mock.patch.object(sra, '_RESOLVE_MEMO', None)]
+        for patch in self.patches:
+            patch.start()
+        self.provider = sra.ReplayProvider(self.directory)
+        sra.set_data_provider(self.provider)
+
+    def tearDown(self):
+        sra.set_data_provider(None)
+        for patch in reversed(self.patches):
+            patch.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_history_matches_files(self):
+        self.assertEqual(self.provider.symbols(), ['005930.KS', 'AAPL'])
+        self.assertEqual(self.provider.preload(), 2)
+
+        df = self.provider.history('005930.KS', '2023-02-01', '2023-03-01')
+        expected = self.kr[(self.kr.index >= '2023-02-01') & (self.kr.index < '2023-03-01')]
+        np.testing.assert_array_equal(df['Close'].to_numpy(), expected['Close'].to_numpy())
+
+        us = self.provider.history('AAPL')
+        self.assertIsInstance(us.index, pd.DatetimeIndex)
+        self.assertEqual(len(us), 300)
+        self.assertEqual(str(us.index[0].date()), '2023-01-02')
+        np.testing.assert_allclose(us['Close'].to_numpy(), self.us['Close'].to_numpy())
+        self.assertEqual(len(self.provider.history('AAPL', period='5d')), 5)
+        self.assertTrue(self.provider.history('MSFT', '2023-01-01').empty)
+
+    def test_resolution_and_analysis_without_network(self):
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(sra.get_ticker_info('005930'), ('005930.KS', '삼성전자', 'KRW'))
+            self.assertEqual(sra.get_ticker_info('apple'), ('AAPL', 'Apple Inc.', 'USD'))
+            with self.assertRaises(ValueError):
+                sra.get_ticker_info('NOPE')
+
+            analyzer = sra.SupportResistanceAnalyzer('AAPL', '2023-01-01', '2024-01-01')
+            results = analyzer.analyze(order=5)
+        self.assertIs(analyzer.cache, False)
+        self.assertEqual(len(analyzer.df), len(self.us[self.us.index.year == 2023]))
+        self.assertTrue(results['support'])
+        # 재생 결과는 검색 결과/종목 리스트 파일에 저장하지 않음
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+종목 검색 결과 저장(resolve.json) 테스트 (yfinance 대신 가짜 모듈 사용)
+
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+class _FakeTicker:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        if self.symbol.startswith('QZX'):
+            raise ConnectionError('info unavailable')
+        return {'longName': f'{self.symbol} Corp', 'currency': 'EUR'}
+
+    def history(self, **kwargs):
+        return pd.DataFrame({'Close': [1.0]})
+
+
+class ResolveMemoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        fake = types.ModuleType('yfinance')
+        fake.Ticker = _FakeTicker
+        self.patches = [mock.patch.object(sra, 'CACHE_DIR', self.cache_dir),
+                        mock.patch.object(sra, '_RESOLVE_MEMO', None),
+                        mock.patch.dict(sys.modules, {'yfinance': fake})]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def read_memo(self):
+        with open(sra._resolve_memo_path(), encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_fallback_currency_is_not_memoized(self):
+        self.assertEqual(sra.get_ticker_info('QZXY'), ('QZXY', 'QZXY', 'USD'))
+        self.assertEqual(sra.get_ticker_info('ACME'), ('ACME', 'ACME Corp', 'EUR'))
+        self.assertEqual(set(self.read_memo()), {'ACME'})
+
+    def test_save_merges_entries_written_by_other_processes(self):
+        sra.get_ticker_info('ACME')
+        memo = self.read_memo()
+        memo['OTHER'] = {'symbol': 'OTHER', 'name': 'Other', 'currency': 'USD',
+                         'time': memo['ACME']['time'] + 1}
+        with open(sra._resolve_memo_path(), 'w', encoding='utf-8') as f:
+            json.dump(memo, f)
+
+        sra.get_ticker_info('005930.KS')
+        self.assertEqual(set(self.read_memo()), {'ACME', 'OTHER', '005930.KS'})
+
+    def test_six_digit_code_resolves_through_krx_listing(self):
+        listing = pd.DataFrame({'Code': ['005930', '035720', '247540'],
+                                'Name': ['삼성전자', '카카오', '에코프로비엠'],
+                                'Market': ['KOSPI', 'KOSPI', 'KOSDAQ']})
+        with mock.patch.object(sra, '_KRX_DIRECTORY', sra.KRXSymbolDirectory(listing)):
+            self.assertEqual(sra.get_ticker_info('247540'), ('247540.KQ', '에코프로비엠', 'KRW'))
+            self.assertEqual(sra.get_ticker_info('005930'), ('005930.KS', '삼성전자', 'KRW'))
+
+
+    def test_verified_history_is_handed_off_once(self):
+        index = pd.date_range('2024-01-01', periods=10, freq='D')
+        df = pd.DataFrame({'Close': range(10)}, index=index, dtype=float)
+        with mock.patch.dict(sra._VERIFIED_HISTORY, {'ACME': ('2024-01-01', '2024-01-11', df)}):
+            taken = sra.take_verified_history('ACME', '2024-01-03', '2024-01-06')
+            self.assertEqual(len(taken), 3)
+            self.assertNotIn('ACME', sra._VERIFIED_HISTORY)
+            self.assertIsNone(sra.take_verified_history('ACME', '2024-01-03', '2024-01-06'))
+
+
+if __name__ == '__main__':
+    unittest.main()
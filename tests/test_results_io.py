@@ -0,0 +1,99 @@
+"""
+분석 결과 구조화 배열/파일 저장 테스트
+
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def fake_results(base):
+    return {'support': [(base * 0.95, 3), (base * 0.9, 1)],
+            'resistance': [(base * 1.05, 2)],
+            'current_price': base}
+
+
+def universe_table():
+    rows = []
+    for i in range(50):
+        symbol = f'{i:06d}.KS'
+        base = {'symbol': symbol, 'name': f'종목{i}', 'market': 'KOSPI', 'bars': 250,
+                'current_price': 100.0 + i, 'elapsed_sec': 0.01}
+        if i == 7:
+            rows.append({**base, 'status': 'error', 'error': 'no data'})
+            continue
+        for row in sra.level_rows(fake_results(100.0 + i)):
+            rows.append({**base, 'status': 'ok', 'error': None, **row})
+    columns = ['symbol', 'name', 'market', 'status', 'error', 'bars', 'current_price',
+               'kind', 'rank', 'level', 'count', 'distance_pct', 'elapsed_sec']
+    return pd.DataFrame(rows).reindex(columns=columns)
+
+
+class ResultsIOTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_level_records_match_level_rows(self):
+        results = fake_results(200.0)
+        records = sra.level_records(results, 'AAA.KS', '에이', 'KOSDAQ', updated=1.0)
+        rows = sra.level_rows(results)
+        self.assertEqual(records.dtype, sra.LEVEL_INDEX_DTYPE)
+        self.assertEqual(list(records['level']), [row['level'] for row in rows])
+        self.assertEqual(list(np.asarray(sra.LEVEL_KINDS)[records['kind']]), [row['kind'] for row in rows])
+        self.assertTrue((records['market'] == 'KOSDAQ').all())
+
+    def test_table_round_trip_in_every_format(self):
+        table = universe_table()
+        expected = sra.table_level_records(table, updated=1.0)
+        self.assertEqual(len(expected), 49 * 3)
+
+        for ext in ('.csv', '.ndjson', '.parquet', '.arrow'):
+            path = os.path.join(self.output_dir, 'universe' + ext)
+            sra.write_results(table, path)
+            loaded = sra.read_results(path)
+            self.assertEqual(len(loaded), len(table), ext)
+            self.assertEqual(list(loaded.columns), list(table.columns), ext)
+            records = sra.table_level_records(loaded, updated=1.0)
+            for field in sra.LEVEL_INDEX_DTYPE.names:
+                if records.dtype[field].kind == 'f':
+                    # NDJSON은 유효숫자 15자리
+                    np.testing.assert_allclose(records[field], expected[field], rtol=1e-13, err_msg=ext)
+                else:
+                    np.testing.assert_array_equal(records[field], expected[field], err_msg=ext)
+            self.assertEqual(loaded.loc[loaded['status'] == 'error', 'error'].tolist(), ['no data'])
+
+        with self.assertRaises(ValueError):
+            sra.write_results(table, os.path.join(self.output_dir, 'universe.xlsx'))
+
+    def test_arrow_read_is_memory_mapped(self):
+        import pyarrow as pa
+
+        records = np.concatenate([sra.level_records(fake_results(100.0 + i), f'S{i}', updated=1.0)
+                                  for i in range(100)])
+        path = os.path.join(self.output_dir, 'levels.arrow')
+        sra.write_results(records, path)
+
+        allocated = pa.total_allocated_bytes()
+        table = sra.read_results(path, columns=['symbol', 'level'], arrow=True)
+        self.assertEqual(pa.total_allocated_bytes(), allocated)
+        self.assertEqual(table.num_rows, 300)
+        np.testing.assert_array_equal(table.column('level').to_numpy(), records['level'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+분석 서버(--serve) 테스트 (종목 검색/가격 데이터는 가짜 함수로 대체)
+
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def fake_frame(n=300):
+    index = pd.date_range('2024-01-01', periods=n, freq='D')
+    close = 100 + 10 * np.sin(np.arange(n) / 8.0)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                         'Close': close, 'Volume': 1000.0}, index=index)
+
+
+class AnalysisServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fetches = []
+        cls.lock = threading.Lock()
+
+        def fake_ticker_info(query, *args, **kwargs):
+            if query == 'NOPE':
+                raise ValueError(f"종목을 찾을 수 없습니다: {query}")
+            return f'{query}.KS', query, 'KRW'
+
+        def fake_fetch(analyzer):
+            with cls.lock:
+                cls.fetches.append(analyzer.ticker)
+            time.sleep(0.3)
+            analyzer.df = fake_frame()
+            return analyzer.df
+
+        cls.patches = [mock.patch.object(sra, 'get_ticker_info', fake_ticker_info),
+                       mock.patch.object(sra.SupportResistanceAnalyzer, 'fetch_data', fake_fetch)]
+        for patch in cls.patches:
+            patch.start()
+        cls.server = sra.AnalysisServer(port=0, workers=1, cache=False)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        for patch in reversed(cls.patches):
+            patch.stop()
+
+    def get(self, path):
+        with urlopen(self.server.url + path, timeout=30) as response:
+            return response.status, response.headers['Content-Type'], response.read()
+
+    def test_concurrent_level_requests_share_one_fetch(self):
+        with ThreadPoolExecutor(8) as pool:
+            responses = list(pool.map(lambda _: self.get('/levels?q=AAA&order=5'), range(8)))
+
+        self.assertEqual(self.fetches.count('AAA.KS'), 1)
+        bodies = {body for _, _, body in responses}
+        self.assertEqual(len(bodies), 1)
+        payload = json.loads(bodies.pop())
+        self.assertEqual(payload['symbol'], 'AAA.KS')
+        self.assertEqual(payload['bars'], 300)
+        self.assertTrue(any(row['kind'] == 'support' for row in payload['levels']))
+
+        # 다른 파라미터도 메모리의 가격 데이터를 재사용
+        self.get('/levels?q=AAA&order=9&tolerance=0.02')
+        self.assertEqual(self.fetches.count('AAA.KS'), 1)
+
+    def test_chart_returns_png(self):
+        status, content_type, body = self.get('/chart?q=BBB')
+        self.assertEqual((status, content_type), (200, 'image/png'))
+        self.assertTrue(body.startswith(b'\x89PNG'))
+
+    def test_errors_map_to_status_codes(self):
+        for path, expected in (('/levels?q=NOPE', 404), ('/levels?q=AAA&days=x', 400),
+                               ('/levels', 400), ('/levels?q=AAA&interval=7m', 400), ('/nope', 404)):
+            with self.assertRaises(HTTPError) as caught:
+                self.get(path)
+            self.assertEqual(caught.exception.code, expected, path)
+            self.assertIn('error', json.loads(caught.exception.read()))
+
+        status, _, body = self.get('/resolve?q=CCC')
+        self.assertEqual(json.loads(body)['symbol'], 'CCC.KS')
+
+
+if __name__ == '__main__':
+    unittest.main()
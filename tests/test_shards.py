@@ -0,0 +1,134 @@
+"""
+여러 서버 분할 실행(--shard, --merge) 테스트 (종목 분석은 가짜 함수로 대체)
+
+    python -m unittest discover tests
+"""
+
+import glob
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def fake_run_universe(entries, start_date, end_date=None, **kwargs):
+    rows = []
+    for i, (symbol, name, currency, market) in enumerate(entries):
+        status = 'error' if symbol.startswith('ERR') else 'ok'
+        rows.append({'symbol': symbol, 'name': name, 'market': market, 'status': status,
+                     'error': 'boom' if status == 'error' else None, 'bars': 250, 'current_price': 100.0 + i,
+                     'kind': 'support', 'rank': 1, 'level': 95.0 + i, 'count': 3, 'distance_pct': -5.0,
+                     'elapsed_sec': 0.1})
+    return pd.DataFrame(rows)
+
+
+class ShardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.universe = os.path.join(self.dir, 'list.txt')
+        self.symbols = [f'{i:06d}.KS' for i in range(60)] + ['ERR1.KS']
+        with open(self.universe, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.symbols + self.symbols[:5]) + '\n')
+        self.output = os.path.join(self.dir, 'shared', 'krx.csv')
+        self.index = os.path.join(self.dir, 'level_index.npy')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def main(self, *argv, run_universe=fake_run_universe):
+        argv = ['support_resistance_analyzer.py', '--no-cache', '--index', self.index, *argv]
+        with mock.patch.object(sys, 'argv', argv), mock.patch.object(sra, 'run_universe', run_universe), \
+                redirect_stdout(io.StringIO()) as out:
+            try:
+                sra.main()
+                code = 0
+            except SystemExit as e:
+                code = e.code
+        return code, out.getvalue()
+
+    def shard(self, spec, *extra, **kwargs):
+        return self.main('--universe', self.universe, '--shard', spec, '--output', self.output, *extra,
+                         **kwargs)
+
+    def test_partition_is_deterministic_and_complete(self):
+        entries = [(symbol, symbol, 'KRW', '') for symbol in self.symbols] * 2
+        shards = [sra.shard_entries(entries, i, 4) for i in range(1, 5)]
+        symbols = [entry[0] for shard in shards for entry in shard]
+        self.assertEqual(sorted(symbols), sorted(self.symbols))
+        self.assertEqual(shards[1], sra.shard_entries(entries[::-1], 2, 4)[::-1])
+        self.assertTrue(all(shards))
+
+        self.assertEqual(sra.parse_shard(' 2/4 '), (2, 4))
+        for spec in ('0/4', '5/4', '2', 'a/b'):
+            with self.assertRaises(ValueError):
+                sra.parse_shard(spec)
+
+    def test_merge_detects_missing_failed_and_stale_shards(self):
+        self.assertEqual(self.shard('1/3')[0], 0)
+        self.assertEqual(self.shard('3/3')[0], 0)
+        code, out = self.main('--merge', self.output)
+        self.assertEqual(code, 1)
+        self.assertIn('--shard 2/3', out)
+        self.assertFalse(os.path.exists(self.output))
+
+        def crash(*args, **kwargs):
+            raise RuntimeError('node lost')
+
+        with self.assertRaises(RuntimeError):
+            self.shard('2/3', run_universe=crash)
+        table, report = sra.merge_shards(self.output)
+        self.assertIsNone(table)
+        self.assertIn('node lost', report['failed'][2])
+
+        # 다시 실행한 샤드는 결과와 매니페스트를 덮어씀
+        self.assertEqual(self.shard('2/3')[0], 0)
+        self.assertEqual(self.shard('2/3')[0], 0)
+        code, out = self.main('--merge', self.output)
+        self.assertEqual(code, 0, out)
+        merged = sra.read_results(self.output)
+        self.assertEqual(sorted(merged['symbol']), sorted(self.symbols))
+        self.assertEqual(len(glob.glob(os.path.join(self.dir, 'shared', '*.tmp'))), 0)
+        self.assertIn('실패 종목 1개', out)
+        self.assertEqual(set(sra.LevelIndex.load(self.index).symbols()), set(self.symbols) - {'ERR1.KS'})
+
+        with open(sra.shard_manifest_path(self.output, 2, 3), encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual((manifest['status'], manifest['universe_symbols']), ('complete', len(self.symbols)))
+
+        # 파라미터가 바뀐 실행이 가장 최근이면 이전 샤드는 다시 실행 대상
+        with mock.patch.object(sra, 'datetime', wraps=sra.datetime) as clock:
+            clock.now.return_value = sra.datetime.now() + sra.timedelta(seconds=5)
+            self.assertEqual(self.shard('3/3', '-o', '9')[0], 0)
+        table, report = sra.merge_shards(self.output)
+        self.assertIsNone(table)
+        self.assertEqual(report['stale'], [1, 2])
+
+    def test_failed_write_keeps_previous_file(self):
+        path = os.path.join(self.dir, 'manifest.json')
+        sra._write_atomic(path, lambda tmp_path: open(tmp_path, 'w').close())
+
+        def broken(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('{')
+            raise OSError('disk full')
+
+        with self.assertRaises(OSError):
+            sra._write_atomic(path, broken)
+        self.assertEqual(os.path.getsize(path), 0)
+        self.assertEqual(glob.glob(os.path.join(self.dir, '*.tmp')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
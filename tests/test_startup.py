@@ -0,0 +1,52 @@
+"""
+시작 시간 테스트 (새 인터프리터에서 모듈 import 후 불러온 모듈 확인)
+
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import json, sys
+import numpy as np
+import support_resistance_analyzer as sra
+
+loaded = {'import': [name for name in sra.HEAVY_MODULES if name in sys.modules]}
+sra.cluster_levels(np.array([1.0, 1.01, 2.0]), 0.02)
+loaded['cluster_levels'] = [name for name in sra.HEAVY_MODULES if name in sys.modules]
+print(json.dumps(loaded))
+"""
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_analysis_path_does_not_load_heavy_modules(self):
+        proc = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+        # 폰트 설정(matplotlib)도 import 시점에 하지 않음
+        self.assertEqual(loaded, {'import': [], 'cluster_levels': []})
+
+    def test_measure_import_time_reports_packages(self):
+        elapsed_ms, packages = sra.measure_import_time()
+        self.assertGreater(elapsed_ms, 0)
+        self.assertIn('numpy', packages)
+        self.assertFalse(set(sra.HEAVY_MODULES) & packages)
+
+        with self.assertRaises(RuntimeError):
+            sra.measure_import_time('no_such_module_here')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+파라미터 스윕(sweep) 테스트 (order/tolerance 조합마다 따로 분석한 결과와 비교)
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def random_values(rng):
+    """같은 값과 NaN이 섞인 랜덤 가격 배열"""
+    n = int(rng.integers(0, 500))
+    values = np.round(100 + np.cumsum(rng.normal(0, 1, n)), int(rng.integers(0, 2)))
+    if n and rng.random() < 0.3:
+        values[rng.integers(0, n, 1 + n // 60)] = np.nan
+    return values
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_sweep_pivots_match_per_order(self):
+        rng = np.random.default_rng(10)
+        for _ in range(150):
+            values = random_values(rng)
+            orders = list(rng.integers(1, 40, int(rng.integers(1, 8))))
+            result = sra.sweep_pivot_indices(values, orders)
+            self.assertEqual(sorted(result), sorted(set(int(order) for order in orders)))
+            for order, (min_idx, max_idx) in result.items():
+                expected = sra.find_pivot_indices(values, order=order)
+                np.testing.assert_array_equal(min_idx, expected[0])
+                np.testing.assert_array_equal(max_idx, expected[1])
+
+        with self.assertRaises(ValueError):
+            sra.sweep_pivot_indices(np.arange(10.0), [0, 3])
+
+    def test_sweep_table_matches_analyze(self):
+        rng = np.random.default_rng(11)
+        for _ in range(5):
+            close = np.round(100 + np.cumsum(rng.normal(0, 1, int(rng.integers(50, 400)))), 1)
+            index = pd.date_range('2022-01-03', periods=len(close), freq='D', tz='Asia/Seoul')
+            analyzer = sra.SupportResistanceAnalyzer('TEST.KS', '2022-01-03', cache=False)
+            analyzer.df = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                                        'Volume': 1000.0}, index=index)
+            orders = sorted(set(int(order) for order in rng.integers(1, 20, 4)))
+            tolerances = [0.005, 0.01, 0.02, 0.03]
+            table = analyzer.sweep(orders, tolerances, max_levels=4)
+
+            for order in orders:
+                for tolerance in tolerances:
+                    with redirect_stdout(io.StringIO()):
+                        expected = analyzer.analyze(order=order, tolerance=tolerance, max_levels=4)
+                    for kind in ('support', 'resistance'):
+                        rows = table[(table['order'] == order) & (table['tolerance'] == tolerance)
+                                     & (table['kind'] == kind)]
+                        self.assertEqual(list(rows['rank']), list(range(1, len(expected[kind]) + 1)))
+                        self.assertEqual(list(zip(rows['level'], rows['count'])), expected[kind])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+한국 주식 종목 검색 인덱스(KRXSymbolDirectory) 테스트 (기존 str.contains 검색과 결과 비교)
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+SYLLABLES = list('삼성전자현대차기아엘지화학에스케이') + ['A', 'b', 'C', 'Ab']
+
+
+def baseline_search(krx, query, limit=5):
+    """기존 구현: 종목명 부분 일치(대소문자 무시) 후 종목코드 일치를 붙여 앞에서 limit개"""
+    matched = krx[krx['Name'].str.contains(query, na=False, case=False, regex=False)]
+    if query.isdigit():
+        matched = pd.concat([matched, krx[krx['Code'] == query]]).drop_duplicates()
+    return [{'symbol': sra.krx_to_yahoo_symbol(code, market), 'name': name, 'code': code, 'market': market}
+            for code, name, market in zip(matched['Code'], matched['Name'], matched['Market'])][:limit]
+
+
+def random_listing(rng, n=400):
+    names = [''.join(rng.choice(SYLLABLES, int(rng.integers(1, 6)))) for _ in range(n)]
+    codes = [f'{code:06d}' for code in rng.choice(1_000_000, n, replace=False)]
+    markets = list(rng.choice(['KOSPI', 'KOSDAQ', 'KOSDAQ GLOBAL', 'KONEX'], n))
+    return pd.DataFrame({'Code': codes, 'Name': names, 'Market': markets})
+
+
+class SymbolDirectoryTest(unittest.TestCase):
+
+    def test_random_queries_match_baseline(self):
+        rng = np.random.default_rng(6)
+        krx = random_listing(rng)
+        directory = sra.KRXSymbolDirectory(krx)
+        self.assertEqual(len(directory), len(krx))
+
+        for _ in range(500):
+            kind = rng.integers(0, 3)
+            if kind == 0:
+                name = krx['Name'].iloc[int(rng.integers(0, len(krx)))]
+                start = int(rng.integers(0, len(name)))
+                query = name[start:start + int(rng.integers(1, 4))].swapcase()
+            elif kind == 1:
+                query = ''.join(rng.choice(SYLLABLES, int(rng.integers(1, 4))))
+            else:
+                query = krx['Code'].iloc[int(rng.integers(0, len(krx)))]
+            limit = int(rng.integers(1, 8))
+            self.assertEqual(directory.search(query, limit=limit), baseline_search(krx, query, limit), query)
+
+    def test_choseong_queries(self):
+        rng = np.random.default_rng(7)
+        krx = random_listing(rng)
+        directory = sra.KRXSymbolDirectory(krx)
+        choseong = [sra.to_choseong(name.lower()) for name in krx['Name']]
+        self.assertEqual(sra.to_choseong('삼성전자'), 'ㅅㅅㅈㅈ')
+
+        for _ in range(200):
+            text = choseong[int(rng.integers(0, len(krx)))]
+            start = int(rng.integers(0, len(text)))
+            query = text[start:start + int(rng.integers(1, 4))]
+            if not sra.is_choseong_query(query):
+                continue
+            expected = [row for row, text in enumerate(choseong) if query in text][:5]
+            self.assertEqual([result['code'] for result in directory.search(query)],
+                             [krx['Code'].iloc[row] for row in expected], query)
+
+    def test_listing_is_persisted(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        listing = random_listing(np.random.default_rng(8), n=20)
+        provider = mock.Mock(remote=True)
+        provider.stock_listing.return_value = listing
+
+        with mock.patch.object(sra, 'CACHE_DIR', cache_dir), mock.patch.object(sra, '_KRX_STOCK_LIST', None), \
+                mock.patch.object(sra, 'get_data_provider', return_value=provider), \
+                redirect_stdout(io.StringIO()):
+            pd.testing.assert_frame_equal(sra.get_krx_stock_list(), listing)
+            sra._KRX_STOCK_LIST = None
+            pd.testing.assert_frame_equal(sra.get_krx_stock_list(), listing)
+        self.assertEqual(provider.stock_listing.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+유니버스 배치 분석(--universe) 테스트 (로컬 재생 데이터 소스 사용, 네트워크 없음)
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+class UniverseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(1)
+        self.frames = {}
+        for i in range(6):
+            index = pd.date_range('2023-01-02', periods=300, freq='B', tz='Asia/Seoul', name='Date')
+            close = np.round(100 + np.cumsum(rng.normal(0, 1, len(index))), 1)
+            df = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                               'Volume': 1000.0}, index=index)
+            symbol = f'{i:06d}.KS'
+            df.to_parquet(os.path.join(self.directory, f'{symbol}.parquet'))
+            self.frames[symbol] = df
+
+        self.patches = [mock.patch.object(sra, 'CACHE_DIR', self.cache_dir),
+                        mock.patch.object(sra, '_RESOLVE_MEMO', None)]
+        for patch in self.patches:
+            patch.start()
+        sra.set_data_provider(sra.ReplayProvider(self.directory))
+
+    def tearDown(self):
+        sra.set_data_provider(None)
+        for patch in reversed(self.patches):
+            patch.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_load_universe_file(self):
+        path = os.path.join(self.directory, 'list.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('# 관심 종목\n005930.KS\n\n^KS11\n삼성전자\n005930\n')
+        self.assertEqual(sra.load_universe(path), [
+            ('005930.KS', '005930.KS', 'KRW', ''),
+            ('^KS11', '^KS11', sra.currency_from_symbol('^KS11'), ''),
+            ('삼성전자', None, None, ''),
+            ('005930', None, None, ''),
+        ])
+        with self.assertRaises(ValueError):
+            sra.load_universe(os.path.join(self.directory, 'missing.txt'))
+
+    def test_parallel_rows_match_single_runs_and_isolate_errors(self):
+        entries = [(symbol, symbol, 'KRW', 'KOSPI') for symbol in self.frames]
+        entries.insert(2, ('999999.KS', '999999.KS', 'KRW', 'KOSPI'))
+        with redirect_stdout(io.StringIO()):
+            table = sra.run_universe(entries, '2023-01-02', '2024-01-01', order=5, tolerance=0.02,
+                                     max_levels=3, workers=2, max_in_flight=2, cache=False)
+
+        errors = table[table['status'] == 'error']
+        self.assertEqual(list(errors['symbol']), ['999999.KS'])
+        self.assertEqual(sorted(set(table['symbol'])), sorted(set(self.frames) | {'999999.KS'}))
+
+        for symbol in self.frames:
+            analyzer = sra.SupportResistanceAnalyzer(symbol, '2023-01-02', '2024-01-01', ticker_name=symbol)
+            with redirect_stdout(io.StringIO()):
+                expected = pd.DataFrame(sra.level_rows(analyzer.analyze(order=5, tolerance=0.02,
+                                                                        max_levels=3)))
+            got = table[table['symbol'] == symbol].reset_index(drop=True)
+            self.assertEqual(set(got['status']), {'ok'})
+            self.assertEqual(set(got['bars']), {len(analyzer.df)})
+            pd.testing.assert_frame_equal(got[list(expected)], expected, check_dtype=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+볼륨 프로파일 레벨 탐지 테스트
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def brute_force_profile(high, low, volume, edges):
+    """봉마다 겹치는 길이 비율로 거래량을 나누는 기준 구현"""
+    bins = len(edges) - 1
+    hist = np.zeros(bins)
+    for hi, lo, vol in zip(high, low, volume):
+        if hi == lo:
+            k = min(int((lo - edges[0]) / (edges[1] - edges[0])), bins - 1)
+            hist[k] += vol
+            continue
+        overlap = np.clip(np.minimum(edges[1:], hi) - np.maximum(edges[:-1], lo), 0, None)
+        hist += vol * overlap / (hi - lo)
+    return hist
+
+
+class VolumeProfileTest(unittest.TestCase):
+
+    def test_matches_per_bar_distribution(self):
+        rng = np.random.default_rng(3)
+        close = 100 + np.cumsum(rng.normal(0, 1, 3000))
+        high = close + rng.uniform(0, 2, 3000)
+        low = close - rng.uniform(0, 2, 3000)
+        high[::40] = low[::40]
+        volume = rng.uniform(1, 100, 3000)
+
+        edges, hist, touches = sra.volume_profile(high, low, volume, bins=64)
+        np.testing.assert_allclose(hist, brute_force_profile(high, low, volume, edges), atol=1e-6)
+        self.assertAlmostEqual(hist.sum(), volume.sum(), places=6)
+        # 구간별 거래된 봉 수: 저가~고가 범위가 구간에 걸친 봉
+        expected = [((low < edges[k + 1]) & (high >= edges[k])).sum() for k in range(64)]
+        np.testing.assert_array_equal(touches, expected)
+
+    def test_analyze_volume_method_finds_high_volume_nodes(self):
+        # 90, 110 근처에서 거래량이 몰리는 횡보 구간, 현재가 100
+        rng = np.random.default_rng(5)
+        close = np.concatenate([rng.normal(90, 0.3, 300), np.linspace(90, 110, 100),
+                                rng.normal(110, 0.3, 300), np.linspace(110, 100, 50)])
+        df = pd.DataFrame({'Close': close, 'High': close + 0.5, 'Low': close - 0.5,
+                           'Volume': 1000.0}, index=pd.date_range('2022-01-03', periods=len(close)))
+        analyzer = sra.SupportResistanceAnalyzer('VOL', '2022-01-03', cache=False)
+        analyzer.use_frame(df)
+        with redirect_stdout(io.StringIO()):
+            results = analyzer.analyze(tolerance=0.02, max_levels=3, method='volume')
+
+        self.assertAlmostEqual(results['support'][0][0], 90, delta=1)
+        self.assertAlmostEqual(results['resistance'][0][0], 110, delta=1)
+        self.assertEqual(analyzer.support_levels[0], results['support'][0][0])
+        rows = sra.level_rows(results)
+        self.assertTrue(all(0 < row['volume_pct'] <= 100 for row in rows))
+
+        with self.assertRaises(ValueError):
+            analyzer.analyze(method='nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
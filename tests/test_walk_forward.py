@@ -0,0 +1,89 @@
+"""
+워크 포워드 평가(walk_forward) 테스트 (구간마다 다시 계산하는 단순 반복문과 비교)
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def baseline_walk_forward(df, orders, tolerances, window, step, horizon, max_levels, band):
+    """구간마다 피봇/클러스터를 처음부터 계산하고 레벨마다 이후 봉을 하나씩 검사"""
+    values = df['Close'].values
+    counts = {}
+    for stop in range(window, len(values) - horizon + 1, step):
+        part = values[stop - window:stop]
+        future = df.iloc[stop:stop + horizon]
+        for order in orders:
+            min_idx, max_idx = sra.find_pivot_indices(part, order=order)
+            for kind, idx in (('resistance', max_idx), ('support', min_idx)):
+                for tolerance in tolerances:
+                    total = counts.setdefault((order, tolerance, kind), [0, 0, 0, 0])
+                    for level, _ in sra.cluster_levels(part[idx], tolerance)[:max_levels]:
+                        if kind == 'support':
+                            touched = any(low <= level * (1 + band) for low in future['Low'])
+                            broken = any(close < level * (1 - band) for close in future['Close'])
+                        else:
+                            touched = any(high >= level * (1 - band) for high in future['High'])
+                            broken = any(close > level * (1 + band) for close in future['Close'])
+                        total[0] += 1
+                        total[1] += touched
+                        total[2] += touched and not broken
+                        total[3] += broken
+    return counts
+
+
+class WalkForwardTest(unittest.TestCase):
+
+    def test_window_pivots_match_sliced_pivots(self):
+        rng = np.random.default_rng(12)
+        for _ in range(300):
+            n = int(rng.integers(1, 400))
+            values = np.round(100 + np.cumsum(rng.normal(0, 1, n)), int(rng.integers(0, 2)))
+            order = int(rng.integers(1, 25))
+            start = int(rng.integers(0, n))
+            stop = int(rng.integers(start + 1, n + 1))
+            pivots = sra.find_pivot_indices(values, order=order)
+            for engine in sra.PIVOT_ENGINES:
+                got = sra.window_pivot_indices(values, pivots, start, stop, order, engine=engine)
+                expected = sra.find_pivot_indices(values[start:stop], order=order)
+                np.testing.assert_array_equal(got[0], expected[0] + start)
+                np.testing.assert_array_equal(got[1], expected[1] + start)
+
+    def test_matches_per_window_loop(self):
+        rng = np.random.default_rng(13)
+        close = np.round(100 + np.cumsum(rng.normal(0, 1, 420)), 1)
+        index = pd.date_range('2022-01-03', periods=len(close), freq='D', tz='Asia/Seoul')
+        df = pd.DataFrame({'Open': close, 'High': close + rng.random(len(close)),
+                           'Low': close - rng.random(len(close)), 'Close': close, 'Volume': 1000.0},
+                          index=index)
+        analyzer = sra.SupportResistanceAnalyzer('TEST.KS', '2022-01-03', cache=False)
+        analyzer.df = df
+
+        params = {'window': 120, 'step': 17, 'horizon': 15, 'max_levels': 4, 'band': 0.005}
+        orders, tolerances = [2, 5, 9], [0.01, 0.02]
+        table = analyzer.walk_forward(orders, tolerances, **params)
+        expected = baseline_walk_forward(df, orders, tolerances, **params)
+
+        self.assertEqual(table.attrs['windows'], len(range(120, 420 - 15 + 1, 17)))
+        self.assertEqual(len(table), len(expected))
+        for row in table.itertuples():
+            levels, touches, bounces, breaks = expected[(row.order, row.tolerance, row.kind)]
+            self.assertEqual((row.levels, row.touches, row.bounces, row.breaks),
+                             (levels, touches, bounces, breaks))
+
+        with self.assertRaises(ValueError):
+            analyzer.walk_forward(orders, tolerances, window=400, horizon=30)
+
+
+if __name__ == '__main__':
+    unittest.main()
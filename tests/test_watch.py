@@ -0,0 +1,200 @@
+"""
+실시간 감시(--watch) 테스트 (로컬 HTTP 서버가 Yahoo 차트 API와 웹훅 수신기를 흉내 냄)
+
+    python -m unittest discover tests
+"""
+
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import support_resistance_analyzer as sra  # noqa: E402
+
+
+def today_timestamp():
+    """오늘 봉의 시각 (UTC 06:00 = 서울 15:00)"""
+    midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(midnight.timestamp()) + 6 * 3600
+
+
+class FeedStandIn(ThreadingHTTPServer):
+    """일봉 차트 API + 웹훅 수신 로컬 서버, last_price로 오늘 봉 가격을 바꿀 수 있음"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _FeedHandler)
+        self.last_price = {}
+        self.requests = []
+        self.hooks = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with self.server.lock:
+            self.server.hooks.append(json.loads(body))
+        self.reply({})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        symbol = parsed.path.rsplit('/', 1)[-1]
+        query = parse_qs(parsed.query)
+        period1, period2 = int(query['period1'][0]), int(query['period2'][0])
+        with self.server.lock:
+            self.server.requests.append((symbol, period1))
+        timestamps = list(range(period1 + 6 * 3600, period2, 86400))
+        close = [100.0 + 10 * math.sin(ts // 86400 / 6.0) for ts in timestamps]
+        if timestamps and timestamps[-1] == today_timestamp() and symbol in self.server.last_price:
+            close[-1] = self.server.last_price[symbol]
+        self.reply({'chart': {'result': [{
+            'meta': {'exchangeTimezoneName': 'Asia/Seoul'},
+            'timestamp': timestamps,
+            'indicators': {'quote': [{'open': close, 'high': close, 'low': close, 'close': close,
+                                      'volume': [1000] * len(close)}]},
+        }], 'error': None}})
+
+
+class LevelEventsTest(unittest.TestCase):
+
+    def test_breaks_and_approach_once(self):
+        events = sra.level_events(98.0, 101.0, support=[90.0], resistance=[100.0, 105.0], near_pct=0.5)
+        self.assertEqual(events, [('break_above', 'resistance', 100.0)])
+        self.assertEqual(sra.level_events(101.0, 89.0, [90.0], []), [('break_below', 'support', 90.0)])
+
+        self.assertEqual(sra.level_events(95.0, 99.7, [], [100.0], near_pct=0.5),
+                         [('approach', 'resistance', 100.0)])
+        # 이미 가까이 있으면 다시 알리지 않음
+        self.assertEqual(sra.level_events(99.7, 99.8, [], [100.0], near_pct=0.5), [])
+
+
+class LevelWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FeedStandIn()
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_poll_fetches_latest_bars_and_emits_alerts(self):
+        received = []
+        ndjson = os.path.join(self.output_dir, 'alerts.ndjson')
+        sinks = [received.append, sra.alert_sink(ndjson), sra.alert_sink(self.server.url + '/hook')]
+        with sra.LevelWatcher([('AAA.KS', 'AAA', 'KRW'), ('BBB.KS', 'BBB', 'KRW')], days=200, order=5,
+                              tolerance=0.02, base_url=self.server.url, sinks=sinks) as watcher:
+            self.assertEqual(watcher.start(), {})
+            state = watcher.states['AAA.KS']
+            bars = len(state['analyzer'].df)
+            resistance = max(state['resistance'])
+            self.assertGreater(resistance, state['price'])
+
+            # 가격 변화가 없으면 알림 없음, 요청은 마지막 봉 날짜부터만
+            self.server.requests.clear()
+            self.assertEqual(watcher.poll(), [])
+            today = datetime.fromtimestamp(today_timestamp(), timezone.utc).replace(hour=0)
+            self.assertEqual(sorted(self.server.requests),
+                             [('AAA.KS', int(today.timestamp())), ('BBB.KS', int(today.timestamp()))])
+
+            # 오늘 봉이 모든 저항선 위로: 장중 갱신된 봉은 교체되고 봉 수는 그대로
+            self.server.last_price['AAA.KS'] = resistance * 1.1
+            alerts = watcher.poll()
+            self.assertEqual(len(state['analyzer'].df), bars)
+            self.assertIn(('break_above', 'resistance', resistance),
+                          [(a['event'], a['kind'], a['level']) for a in alerts])
+            self.assertTrue(all(a['symbol'] == 'AAA.KS' for a in alerts))
+            self.assertEqual(watcher.poll(), [])
+
+            # 레벨은 같은 데이터로 analyze()를 다시 실행한 것과 같음
+            fresh = sra.SupportResistanceAnalyzer('AAA.KS', '2020-01-01', cache=False)
+            fresh.use_frame(state['analyzer'].df)
+            fresh.analyze(order=5, tolerance=0.02)
+            self.assertEqual(state['resistance'], fresh.resistance_levels)
+
+        self.assertEqual(received, alerts)
+        with open(ndjson, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line) for line in f], alerts)
+        self.assertEqual(self.server.hooks, alerts)
+
+
+
+class FrameProvider(sra.DataProvider):
+    """메모리의 일봉 DataFrame을 돌려주는 로컬 데이터 소스 (--replay 대신)"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = 0
+
+    def history(self, symbol, start_date=None, end_date=None, interval='1d', period=None):
+        self.calls += 1
+        return sra.slice_dates(self.frames[symbol], start_date, end_date)
+
+
+class LevelWatcherWindowTest(unittest.TestCase):
+
+    def test_local_provider_and_window_trimming(self):
+        index = pd.date_range(end=datetime.now().strftime('%Y-%m-%d'), periods=400, freq='D')
+        close = np.round(100 + np.cumsum(np.random.default_rng(5).normal(0, 1, len(index))))
+        frame = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0},
+                             index=index)
+        provider = FrameProvider({'AAA.KS': frame})
+
+        with sra.LevelWatcher([('AAA.KS', 'AAA', 'KRW')], days=200, order=5, tolerance=0.02,
+                              provider=provider, sinks=[]) as watcher:
+            self.assertIsNone(watcher.fetcher)
+            self.assertEqual(watcher.start(), {})
+            analyzer = watcher.states['AAA.KS']['analyzer']
+            self.assertEqual(len(analyzer.df), 201)
+
+            # 30일 뒤: 새 봉이 들어오면 기간을 벗어난 봉은 버리고 레벨은 새로 분석한 것과 같음
+            later = (datetime.now() - timedelta(days=170)).strftime('%Y-%m-%d')
+            frame.iloc[-1, frame.columns.get_loc('Close')] += 5
+            with mock.patch.object(watcher, '_start_date', lambda: later):
+                watcher.poll()
+            self.assertEqual(provider.calls, 2)
+            self.assertEqual(analyzer.df.index[0], pd.Timestamp(later))
+
+            fresh = sra.SupportResistanceAnalyzer('AAA.KS', later, cache=False, provider=provider)
+            fresh.use_frame(sra.slice_dates(frame, later, watcher._end_date()))
+            fresh.analyze(order=5, tolerance=0.02)
+            self.assertEqual(watcher.states['AAA.KS']['support'], fresh.support_levels)
+            self.assertEqual(watcher.states['AAA.KS']['resistance'], fresh.resistance_levels)
+
+
+if __name__ == '__main__':
+    unittest.main()